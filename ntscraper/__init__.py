@@ -1 +1,10 @@
-from .nitter import Nitter
\ No newline at end of file
+from .nitter import Nitter
+
+
+def __getattr__(name):
+    # The asyncio scraper is imported on first use, since asyncio is slow to import
+    if name == "AsyncNitter":
+        from .async_nitter import AsyncNitter
+
+        return AsyncNitter
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,667 @@
+import asyncio
+import logging
+from functools import partial
+from re import sub
+from time import perf_counter
+from .nitter import Nitter
+from .records import check_result_type, convert
+from .checkpoint import get_checkpoint_store
+from .paging import FollowPages, SearchPages
+from .seen import get_seen_index
+from .sinks import Sink, get_sink
+from .tables import TweetTable, table_types
+
+
+class AsyncNitter:
+    def __init__(
+        self,
+        instances=None,
+        log_level=1,
+        skip_instance_check=False,
+        concurrency=100,
+        **kwargs
+    ):
+        """
+        Asyncio Nitter scraper. Every page fetch runs in a single event loop, so many terms,
+        users and tweets can be scraped concurrently without spawning processes.
+        The pages are parsed by a Nitter scraper, which also holds the instances, the rate
+        limiter, the cache and the metrics. Building it fetches the list of instances and checks
+        them with blocking requests, so use 'await AsyncNitter.create(...)' in a running event loop.
+
+        :param instances: accepts a list of instances or a single instance in this format: "https://{host}:{port}", e.g. "http://localhost:8080
+        :param log_level: logging level. 0 shows warnings, 1 shows info messages too, None leaves the logging configuration untouched. Default is 1
+        :param skip_instance_check: True if the health check of all instances and the instance change during execution should be skipped
+        :param concurrency: max number of page fetches running at the same time. Default is 100
+        :param kwargs: other parameters of Nitter
+        """
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+        self._nitter = Nitter(
+            instances=instances,
+            log_level=log_level,
+            skip_instance_check=skip_instance_check,
+            **kwargs
+        )
+        self.concurrency = concurrency
+        self._client = None
+        self._semaphore = None
+
+    @classmethod
+    async def create(
+        cls,
+        instances=None,
+        log_level=1,
+        skip_instance_check=False,
+        concurrency=100,
+        **kwargs
+    ):
+        """
+        Create an asyncio scraper without blocking the event loop: the list of instances is
+        fetched and the instances are checked in a thread of the default executor of the loop
+
+        :param instances: accepts a list of instances or a single instance in this format: "https://{host}:{port}", e.g. "http://localhost:8080
+        :param log_level: logging level. 0 shows warnings, 1 shows info messages too, None leaves the logging configuration untouched. Default is 1
+        :param skip_instance_check: True if the health check of all instances and the instance change during execution should be skipped
+        :param concurrency: max number of page fetches running at the same time. Default is 100
+        :param kwargs: other parameters of Nitter
+        :return: AsyncNitter
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            None,
+            partial(cls, instances, log_level, skip_instance_check, concurrency, **kwargs),
+        )
+
+    @property
+    def instances(self):
+        return self._nitter.instances
+
+    @property
+    def working_instances(self):
+        return self._nitter.working_instances
+
+    @property
+    def metrics(self):
+        return self._nitter.metrics
+
+    @property
+    def cache(self):
+        return self._nitter.cache
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """
+        Close the underlying HTTP client and the sessions of all the instances
+        """
+        self._nitter.close()
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+            self._semaphore = None
+
+    def get_random_instance(self):
+        """
+        Get a random Nitter instance. Fast and healthy instances are more likely to be picked
+
+        :return: URL of random Nitter instance
+        """
+        return self._nitter.get_random_instance()
+
+    def _unsupported(self, name):
+        """
+        Raise the error of a Nitter method the asyncio scraper does not have
+
+        :param name: name of the method
+        """
+        raise TypeError(f"AsyncNitter does not support {name}, use Nitter instead")
+
+    def iter_tweets(self, *args, **kwargs):
+        """
+        Not supported by the asyncio scraper, see Nitter.iter_tweets
+        """
+        self._unsupported("iter_tweets")
+
+    def iter_follow_list(self, *args, **kwargs):
+        """
+        Not supported by the asyncio scraper, see Nitter.iter_follow_list
+        """
+        self._unsupported("iter_follow_list")
+
+    def iter_follow_graph(self, *args, **kwargs):
+        """
+        Not supported by the asyncio scraper, see Nitter.iter_follow_graph
+        """
+        self._unsupported("iter_follow_graph")
+
+    def _get_client(self):
+        """
+        Get the HTTP client, creating it in the running event loop if needed
+
+        :return: aiohttp client session
+        """
+        if self._client is None:
+            try:
+                import aiohttp
+            except ImportError:
+                raise ImportError(
+                    "AsyncNitter requires aiohttp. Install it with 'pip install ntscraper[async]'"
+                )
+            self._client = aiohttp.ClientSession(
+                headers={
+                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:129.0) Gecko/20100101 Firefox/129.0",
+                },
+                timeout=aiohttp.ClientTimeout(total=10),
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._client
+
+    def _pick_instance(self, instance):
+        """
+        Pick the instance to use for a scrape
+
+        :param instance: instance requested by the user, or None
+        :return: instance to use
+        """
+        if instance is not None:
+            return instance
+        if self._nitter.skip_instance_check:
+            raise ValueError("No instance specified and instance check skipped")
+        instance = self.get_random_instance()
+        logging.info(f"No instance specified, using random instance {instance}")
+        return instance
+
+    async def _get_page(self, endpoint, instance, max_retries=5):
+        """
+        Download page from Nitter instance
+
+        :param endpoint: endpoint to use
+        :param instance: instance to download the page from
+        :param max_retries: max number of retries, default 5
+        :return: page content, or None if max retries reached, and the instance that served the page
+        """
+        if self._nitter.cache is not None:
+            soup = self._nitter._get_cached_page(endpoint, instance)
+            if soup is not False:
+                return soup, instance
+        client = self._get_client()
+        retry_count = 0
+        while retry_count < max_retries:
+            if not self._nitter.skip_instance_check and not self._nitter.scheduler.is_available(instance):
+                instance = self._nitter._get_new_instance(
+                    f"{instance} is out of service", instance
+                )
+            delay = self._nitter.rate_limiter.reserve(instance)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                async with self._semaphore:
+                    start = perf_counter()
+                    async with client.get(
+                        instance + endpoint,
+                        cookies={"hlsPlayback": "on", "infiniteScroll": ""},
+                    ) as r:
+                        content = await r.read()
+                        ok = r.status < 400
+                        retry = r.status == 429 or r.status >= 500
+                    self._nitter._record_response(
+                        r.status,
+                        perf_counter() - start,
+                        instance,
+                        r.headers.get("Retry-After"),
+                        len(content),
+                    )
+            except Exception:
+                self._nitter._record_error(instance)
+                if not self._nitter.skip_instance_check:
+                    instance = self._nitter._get_new_instance(f"{instance} unreachable", instance)
+                retry_count += 1
+                continue
+            soup = self._nitter._check_error_page(self._nitter._parse_page(content), instance)
+            if ok and soup is not None and self._nitter.cache is not None:
+                self._nitter.cache.set(endpoint, content)
+            # Error panels of rate limited or failing instances are retried
+            if ok or (soup is None and not retry):
+                if retry_count:
+                    self._nitter.metrics.inc("retries", retry_count)
+                return soup, instance
+            if not self._nitter.skip_instance_check:
+                instance = self._nitter._get_new_instance(f"Error fetching {instance}", instance)
+            retry_count += 1
+
+        self._nitter.metrics.inc("retries", retry_count)
+        logging.warning("Max retries reached. Check your request and try again.")
+        return None, instance
+
+    async def _search(
+        self,
+        term,
+        mode,
+        number,
+        since,
+        until,
+        near,
+        language,
+        to,
+        replies,
+        filters,
+        exclude,
+        max_retries,
+        instance,
+        result_type="dict",
+        checkpoint=None,
+        seen=None,
+        sink=None,
+    ):
+        """
+        Scrape the specified search terms from Nitter
+
+        :param term: term to seach for
+        :param mode: search mode.
+        :param number: number of tweets to scrape.
+        :param since: date to start scraping from.
+        :param until: date to stop scraping at.
+        :param near: location to search near.
+        :param language: language of the tweets.
+        :param to: user to which the tweets are directed.
+        :param replies: True if both tweets and replies are needed.
+        :param filters: list of filters to apply.
+        :param exclude: list of filters to exclude.
+        :param max_retries: max retries to scrape a page.
+        :param instance: Nitter instance to use.
+        :param result_type: 'dict', 'record', 'arrow' or 'pandas'.
+        :param checkpoint: CheckpointStore to save the progress to and resume from. Default is None
+        :param seen: index of the IDs of the tweets to skip, saved to its file when the search stops. Default is None (a new in-memory SeenIndex)
+        :param sink: Sink to write the tweets and threads to instead of returning them. Default is None
+        :return: dictionary of tweets and threads for the term, or of their numbers if a sink is used. A table of the tweets for 'arrow' and 'pandas'.
+        """
+        if result_type in table_types:
+            # The tweets are added to the columns of the table as they are parsed
+            table = TweetTable()
+            await self._search(
+                term,
+                mode,
+                number,
+                since,
+                until,
+                near,
+                language,
+                to,
+                replies,
+                filters,
+                exclude,
+                max_retries,
+                instance,
+                "record",
+                checkpoint,
+                seen,
+                table,
+            )
+            return table.finish(result_type)
+        if sink is not None:
+            tweets = {"tweets": 0, "threads": 0}
+        else:
+            tweets = {"tweets": [], "threads": []}
+        progress = SearchPages(
+            term,
+            self._nitter._build_search_endpoint(
+                term, mode, since, until, near, language, to, replies, filters, exclude
+            ),
+            number,
+            since,
+            checkpoint,
+            seen,
+        )
+        instance = self._pick_instance(instance)
+        try:
+            while True:
+                soup, instance = await self._get_page(progress.endpoint, instance, max_retries)
+                if soup is None:
+                    progress.fail(progress.endpoint)
+                    return tweets
+                limit_reached = self._nitter._collect_timeline(
+                    self._nitter._parse_timeline(
+                        soup, progress.already_scraped, progress.counts, progress.number, result_type
+                    ),
+                    tweets,
+                    sink,
+                )
+                if not progress.advance(
+                    limit_reached, self._nitter._get_next_page(soup, term, mode, since, until)
+                ):
+                    break
+            progress.finish()
+            return tweets
+        finally:
+            progress.close()
+
+    async def get_tweet_by_id(self, username, tweet_id, instance=None, max_retries=5, result_type="dict"):
+        """
+        Fetch a tweet by its ID.
+
+        :param username: The username of the tweet.
+        :param tweet_id: The ID of the tweet to fetch.
+        :param instance: The specific Nitter instance to use.
+        :param max_retries: Max retries to scrape a page. Default is 5.
+        :param result_type: 'dict' for a dictionary, 'record' for a Tweet record. Default is 'dict'.
+        :return: Dictionary of the tweet content.
+        """
+        check_result_type(result_type)
+        if not instance and not self._nitter.working_instances:
+            raise ValueError("No working instances available.")
+
+        endpoint = f"/{username}/status/{tweet_id}"
+        soup, instance = await self._get_page(
+            endpoint, self._pick_instance(instance), max_retries
+        )
+
+        if soup is None:
+            return None
+
+        tweet = self._nitter._parse_status(soup, result_type)
+        if tweet is None:
+            logging.warning(f"Tweet with ID {tweet_id} not found.")
+        return tweet
+
+    async def _fetch_status(self, username, tweet_id, instance, max_retries, result_type):
+        """
+        Fetch a tweet by its ID, reporting the failures instead of logging them
+
+        :param username: username of the tweet
+        :param tweet_id: ID of the tweet
+        :param instance: Nitter instance to use, or None for a random working instance
+        :param max_retries: max retries to scrape the page
+        :param result_type: 'dict' or 'record'
+        :return: tweet and error message. The tweet is None if the fetch failed, the error is None if it succeeded
+        """
+        try:
+            soup, _ = await self._get_page(
+                f"/{username}/status/{tweet_id}", self._pick_instance(instance), max_retries
+            )
+            if soup is None:
+                return None, "Page could not be fetched"
+            tweet = self._nitter._parse_status(soup, result_type)
+            if tweet is None:
+                return None, "Tweet not found"
+            return tweet, None
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}"
+
+    async def get_tweets_by_ids(
+        self, pairs, concurrency=None, instance=None, max_retries=5, result_type="dict"
+    ):
+        """
+        Fetch many tweets by their ID concurrently, yielding them as soon as they are fetched.
+        Every fetch picks its own working instance, unless an instance is given, and a failed
+        fetch is reported with its error without stopping the others.
+
+        :param pairs: iterable of (username, tweet_id) pairs
+        :param concurrency: max number of tweets fetched at the same time. Default is None (the concurrency of the scraper)
+        :param instance: Nitter instance to use. Default is None
+        :param max_retries: max retries to scrape a page. Default is 5
+        :param result_type: 'dict' for dictionaries, 'record' for Tweet records. Default is 'dict'
+        :return: async generator of (username, tweet_id, tweet, error) tuples, in completion order. tweet is None and error is a message if the fetch failed
+        """
+        check_result_type(result_type)
+        if not instance and not self._nitter.working_instances:
+            raise ValueError("No working instances available.")
+        if concurrency is None:
+            concurrency = self.concurrency
+        elif concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+
+        pairs = iter(pairs)
+        pending = {}
+        try:
+            while True:
+                # Keep a bounded number of fetches in flight, so pairs can be a stream
+                for username, tweet_id in pairs:
+                    task = asyncio.ensure_future(
+                        self._fetch_status(username, tweet_id, instance, max_retries, result_type)
+                    )
+                    pending[task] = (username, tweet_id)
+                    if len(pending) >= concurrency:
+                        break
+                if not pending:
+                    return
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    username, tweet_id = pending.pop(task)
+                    tweet, error = task.result()
+                    yield username, tweet_id, tweet, error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def get_tweets(
+        self,
+        terms,
+        mode="term",
+        number=-1,
+        since=None,
+        until=None,
+        near=None,
+        language=None,
+        to=None,
+        replies=False,
+        filters=None,
+        exclude=None,
+        max_retries=5,
+        instance=None,
+        result_type="dict",
+        resume=None,
+        seen=None,
+        sink=None,
+    ):
+        """
+        Scrape the specified term from Nitter
+
+        :param terms: string/s to search for
+        :param mode: search mode. Default is 'term', can also be 'hashtag' or 'user'
+        :param number: number of tweets to scrape. Default is -1 (to not set a limit).
+        :param since: date to start scraping from, formatted as YYYY-MM-DD. Default is None
+        :param until: date to stop scraping at, formatted as YYYY-MM-DD. Default is None
+        :param near: near location of the tweets. Default is None (anywhere)
+        :param language: language of the tweets. Default is None (any language)
+        :param to: user to which the tweets are directed. Default is None (any user)
+        :param replies: True if both tweets and replies are needed. If 'filters' or 'exclude' are set, this option will be overridden. Default is False
+        :param filters: list of filters to apply. Default is None
+        :param exclude: list of filters to exclude. Default is None
+        :param max_retries: max retries to scrape a page. Default is 5
+        :param instance: Nitter instance to use. Default is None
+        :param result_type: 'dict' for tweets as dictionaries, 'record' for compact Tweet records, 'arrow' for a pyarrow Table or 'pandas' for a pandas DataFrame of the tweets of each term. Default is 'dict'
+        :param resume: directory or CheckpointStore where the progress of each term is saved. Default is None (no checkpoints)
+        :param seen: file, SeenIndex or BloomSeenIndex of the IDs of the tweets already scraped, which are skipped. Default is None
+        :param sink: path of a .jsonl, .csv or .parquet file, or Sink (see ntscraper.sinks), where the tweets and threads are written as soon as they are parsed instead of being returned. Default is None
+        :return: dictionary or array with dictionaries (in case of multiple terms) of the tweets and threads for the provided terms. With a sink, the dictionaries hold the number of tweets and threads written. With 'arrow' or 'pandas', a table or array of tables
+        """
+        check_result_type(result_type, tables=True)
+        if sink is not None and result_type in table_types:
+            raise ValueError("A sink cannot be used with a table result type")
+        checkpoint = get_checkpoint_store(resume)
+        seen = get_seen_index(seen, checkpoint)
+        owned = sink is not None and not isinstance(sink, Sink)
+        sink = get_sink(sink)
+        args = (
+            mode,
+            number,
+            since,
+            until,
+            near,
+            language,
+            to,
+            replies,
+            filters,
+            exclude,
+            max_retries,
+            instance,
+            result_type,
+            checkpoint,
+            seen,
+            sink,
+        )
+        try:
+            if isinstance(terms, str):
+                return await self._search(terms.strip(), *args)
+            elif len(terms) == 1:
+                return await self._search(terms[0].strip(), *args)
+            return list(
+                await asyncio.gather(*[self._search(term.strip(), *args) for term in terms])
+            )
+        finally:
+            self._nitter._close_sink(sink, owned)
+
+    async def _profile_info(self, username, max_retries, instance):
+        """
+        Gets the profile information for a user.
+
+        :param username: username of the page to scrape
+        :param max_retries: max retries to scrape a page. Default is 5
+        :param instance: Nitter instance to use. Default is None
+        :return: profile information
+        """
+        username = sub(r"[^A-Za-z0-9_+-:]", "", username)
+        soup, instance = await self._get_page(
+            f"/{username}", self._pick_instance(instance), max_retries
+        )
+        if soup is None:
+            return None
+
+        return self._nitter._parse_profile(soup, self._nitter._is_page_encrypted(soup))
+
+    async def _get_follow_list(
+        self,
+        endpoint,
+        max_retries,
+        instance=None,
+        checkpoint=None,
+        max_pages=None,
+        max_users=None,
+    ):
+        """
+        Scrape a following/followers list
+
+        :param endpoint: endpoint of the list
+        :param max_retries: max retries to scrape a page
+        :param instance: Nitter instance to use. Default is None
+        :param checkpoint: CheckpointStore to save the progress to and resume from. Default is None
+        :param max_pages: max number of pages to scrape. Default is None (no limit)
+        :param max_users: max number of usernames to scrape. Default is None (no limit)
+        :return: list of usernames
+        """
+        instance = self._pick_instance(instance)
+        progress = FollowPages(endpoint, checkpoint, max_pages, max_users)
+        follow_list = []
+        url = progress.url()
+        while url:
+            soup, instance = await self._get_page(url, instance, max_retries)
+            follow_list.extend(
+                progress.read(self._nitter._parse_follow_list(soup) if soup else None)
+            )
+            progress.advance()
+            url = progress.url()
+        return follow_list
+
+    async def _user_profile_info(
+        self,
+        username,
+        max_retries,
+        instance,
+        mode,
+        checkpoint=None,
+        max_pages=None,
+        max_users=None,
+    ):
+        """
+        Gets the profile information for a user, including the follow lists in 'detail' mode.
+
+        :param username: username of the page to scrape
+        :param max_retries: max retries to scrape a page
+        :param instance: Nitter instance to use
+        :param mode: mode of fetching profile info
+        :param checkpoint: CheckpointStore of the follow lists. Default is None
+        :param max_pages: max number of pages of each follow list. Default is None (no limit)
+        :param max_users: max number of usernames of each follow list. Default is None (no limit)
+        :return: dictionary of the profile's information
+        """
+        username = username.strip()
+        profile_info = await self._profile_info(username, max_retries, instance)
+        if profile_info and mode == "detail":
+            (
+                profile_info.following_list,
+                profile_info.followers_list,
+            ) = await asyncio.gather(
+                self._get_follow_list(
+                    f"/{username}/following",
+                    max_retries,
+                    instance,
+                    checkpoint,
+                    max_pages,
+                    max_users,
+                ),
+                self._get_follow_list(
+                    f"/{username}/followers",
+                    max_retries,
+                    instance,
+                    checkpoint,
+                    max_pages,
+                    max_users,
+                ),
+            )
+        return profile_info
+
+    async def get_profile_info(
+        self,
+        username,
+        max_retries=5,
+        instance=None,
+        mode="simple",
+        result_type="dict",
+        resume=None,
+        max_pages=None,
+        max_users=None,
+        sink=None,
+    ):
+        """
+        Get profile information for a user or a list of users
+
+        :param username: username/s of the page to scrape (str or list of str)
+        :param max_retries: max retries to scrape a page. Default is 5
+        :param instance: Nitter instance to use. Default is None
+        :param mode: Mode of fetching profile info. 'simple' for basic info, 'detail' for detailed info including following and followers lists. Default is 'simple'
+        :param result_type: 'dict' for dictionaries, 'record' for compact Profile records. Default is 'dict'
+        :param resume: directory or CheckpointStore where the progress of the follow lists is saved in 'detail' mode. Default is None (no checkpoints)
+        :param max_pages: max number of pages scraped for each follow list in 'detail' mode. Default is None (no limit)
+        :param max_users: max number of usernames scraped for each follow list in 'detail' mode. Default is None (no limit)
+        :param sink: path of a .jsonl, .csv or .parquet file, or Sink (see ntscraper.sinks), where each profile is also written as soon as it is scraped, with its follow lists in 'detail' mode. Default is None
+        :return: dictionary of the profile's information or list of dictionaries if username is a list. See Nitter.get_profile_info for the keys
+        """
+        check_result_type(result_type)
+        self._nitter._check_follow_limits(max_pages, max_users)
+        checkpoint = get_checkpoint_store(resume)
+        owned = sink is not None and not isinstance(sink, Sink)
+        sink = get_sink(sink)
+
+        async def profile(user):
+            profile_info = convert(
+                await self._user_profile_info(
+                    user, max_retries, instance, mode, checkpoint, max_pages, max_users
+                ),
+                result_type,
+            )
+            if sink is not None and profile_info is not None:
+                sink.write(profile_info)
+            return profile_info
+
+        if isinstance(username, str):
+            username = [username]
+        try:
+            if len(username) == 1:
+                return await profile(username[0])
+            return list(await asyncio.gather(*[profile(user) for user in username]))
+        finally:
+            self._nitter._close_sink(sink, owned)
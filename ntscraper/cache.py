@@ -0,0 +1,229 @@
+import os
+import struct
+import zlib
+from hashlib import sha1
+from threading import Lock
+from time import time
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+# Time to live of the cached pages of each type of endpoint, in seconds
+default_ttl = {
+    "search": 15 * 60,
+    "profile": 60 * 60,
+    "follow": 24 * 60 * 60,
+    "status": 7 * 24 * 60 * 60,
+}
+
+
+def normalize_endpoint(endpoint):
+    """
+    Normalize an endpoint, so that the same page always has the same key,
+    whatever the instance it was fetched from
+
+    :param endpoint: endpoint of the page, without the instance
+    :return: path in lowercase followed by the sorted query parameters
+    """
+    url = urlparse(endpoint)
+    query = urlencode(sorted(parse_qsl(url.query, keep_blank_values=True)))
+    path = url.path.rstrip("/").lower() or "/"
+    return path + "?" + query if query else path
+
+
+def endpoint_type(endpoint):
+    """
+    Get the type of an endpoint
+
+    :param endpoint: endpoint of the page
+    :return: 'search', 'status', 'follow' or 'profile'. The timelines of the users, searched or paginated, are searches
+    """
+    url = urlparse(endpoint)
+    path = url.path.rstrip("/")
+    if "/status/" in path:
+        return "status"
+    if path.endswith("/following") or path.endswith("/followers"):
+        return "follow"
+    if (
+        path.endswith("/search")
+        or path.endswith("/with_replies")
+        or any(name == "cursor" for name, _ in parse_qsl(url.query))
+    ):
+        return "search"
+    return "profile"
+
+
+class ResponseCache:
+    header = struct.Struct("<d")
+
+    def __init__(self, path, ttl=None, max_size=256 * 1024 * 1024, offline=False):
+        """
+        On-disk cache of the pages downloaded from Nitter. Pages are compressed and saved
+        one per file, named after their normalized endpoint, so a page is found whatever
+        the instance it came from. When the cache grows over 'max_size', the least
+        recently used pages are removed.
+
+        :param path: directory of the cache, created if needed
+        :param ttl: dictionary of the seconds a page is valid for, by type of endpoint ('search', 'profile', 'follow', 'status'). Missing types use the defaults. Default is None (15 minutes for searches, 1 hour for profiles, 1 day for follow lists, 1 week for tweets)
+        :param max_size: max size of the cache, in bytes. Default is 256 MB
+        :param offline: True if pages should only be read from the cache, even if expired, without using the network. Default is False
+        """
+        if max_size <= 0:
+            raise ValueError("The max size of the cache must be positive")
+        unknown = set(ttl or {}) - set(default_ttl)
+        if unknown:
+            raise ValueError(f"Unknown endpoint types: {', '.join(sorted(unknown))}")
+        self.path = path
+        self.ttl = {**default_ttl, **(ttl or {})}
+        self.max_size = max_size
+        self.offline = offline
+        self._lock = Lock()
+        os.makedirs(path, exist_ok=True)
+        self._size = sum(size for _, size, _ in self._entries())
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def _file(self, endpoint):
+        key = normalize_endpoint(endpoint)
+        return os.path.join(self.path, sha1(key.encode("utf-8")).hexdigest() + ".z")
+
+    def _entries(self):
+        """
+        List the pages in the cache
+
+        :return: list of (file, size, last access time) tuples
+        """
+        entries = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(".z"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def get(self, endpoint, now=None):
+        """
+        Get a page from the cache
+
+        :param endpoint: endpoint of the page
+        :param now: current time. Default is None (now)
+        :return: content of the page, or None if it is missing, expired or corrupt
+        """
+        file = self._file(endpoint)
+        try:
+            with open(file, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        now = time() if now is None else now
+        try:
+            (saved,) = self.header.unpack_from(data)
+            if not self.offline and now - saved > self.ttl[endpoint_type(endpoint)]:
+                return None
+            content = zlib.decompress(data[self.header.size:])
+        except (struct.error, zlib.error):
+            # A truncated or corrupt page is removed, so that it is downloaded again
+            self._remove(file, len(data))
+            return None
+        try:
+            # The modification time of the file is its last access, for the LRU eviction
+            os.utime(file, (now, now))
+        except FileNotFoundError:
+            pass
+        return content
+
+    def _remove(self, file, size):
+        """
+        Remove a page from the cache
+
+        :param file: file of the page
+        :param size: size of the file
+        """
+        with self._lock:
+            try:
+                os.remove(file)
+            except FileNotFoundError:
+                return
+            self._size -= size
+
+    def set(self, endpoint, content, now=None):
+        """
+        Save a page to the cache, removing the least recently used pages if the cache is full
+
+        :param endpoint: endpoint of the page
+        :param content: content of the page
+        :param now: current time. Default is None (now)
+        """
+        # tempfile is only imported here, since it is slow to import
+        import tempfile
+
+        if self.offline:
+            return
+        now = time() if now is None else now
+        data = self.header.pack(now) + zlib.compress(content)
+        file = self._file(endpoint)
+        with self._lock:
+            try:
+                self._size -= os.path.getsize(file)
+            except FileNotFoundError:
+                pass
+            # Every save has its own temporary file, since the directory can be shared by
+            # the threads and the processes of several scrapers
+            fd, temp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(temp, file)
+            except BaseException:
+                os.remove(temp)
+                raise
+            os.utime(file, (now, now))
+            self._size += len(data)
+            if self._size > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        # Remove pages down to 90% of the max size, so the cache is not scanned at every save
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        self._size = sum(size for _, size, _ in entries)
+        for file, size, _ in entries:
+            if self._size <= self.max_size * 0.9:
+                break
+            try:
+                os.remove(file)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+    def clear(self):
+        """
+        Remove all the pages from the cache
+        """
+        with self._lock:
+            for file, _, _ in self._entries():
+                try:
+                    os.remove(file)
+                except FileNotFoundError:
+                    pass
+            self._size = 0
+
+
+def get_response_cache(cache):
+    """
+    Get the response cache to use for a scraper
+
+    :param cache: None, path of a cache directory or ResponseCache
+    :return: ResponseCache, or None if caching is disabled
+    """
+    if cache is None or isinstance(cache, ResponseCache):
+        return cache
+    if isinstance(cache, (str, os.PathLike)):
+        return ResponseCache(os.fspath(cache))
+    raise ValueError("Cache must be a path or a ResponseCache")
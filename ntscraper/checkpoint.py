@@ -0,0 +1,119 @@
+import json
+import os
+from array import array
+from hashlib import sha1
+
+
+class CheckpointStore:
+    def __init__(self, path, every=1):
+        """
+        Directory of checkpoints of paginated scrapes. Every scrape is saved in its own file,
+        named after the scrape, so scrapes running in different processes never share a file.
+
+        :param path: directory of the checkpoints, created if needed
+        :param every: number of pages between two checkpoints. Default is 1 (every page)
+        """
+        if every < 1:
+            raise ValueError("Checkpoints must be saved at least every page")
+        self.path = path
+        self.every = every
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key):
+        return os.path.join(self.path, sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _journal(self, key):
+        return self._file(key)[: -len(".json")] + ".seen"
+
+    def load(self, key):
+        """
+        Load the checkpoint of a scrape
+
+        :param key: key of the scrape
+        :return: saved state, or None if the scrape has no checkpoint
+        """
+        try:
+            with open(self._file(key), encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            return None
+        return checkpoint["state"] if checkpoint.get("key") == key else None
+
+    def save(self, key, state):
+        """
+        Save the checkpoint of a scrape. The file is replaced atomically, so a scrape
+        killed while saving keeps its previous checkpoint
+
+        :param key: key of the scrape
+        :param state: JSON serializable state of the scrape
+        """
+        # tempfile is only imported here, since it is slow to import
+        import tempfile
+
+        # Every save has its own temporary file, since the store can be shared by the
+        # threads and the processes of several scrapers
+        fd, temp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "state": state}, f)
+            os.replace(temp, self._file(key))
+        except BaseException:
+            os.remove(temp)
+            raise
+
+    def append_seen(self, key, ids):
+        """
+        Append IDs to the journal of the IDs seen by a scrape, kept next to its checkpoint,
+        so that its checkpoints only hold the number of IDs in the journal
+
+        :param key: key of the scrape
+        :param ids: list of numeric IDs
+        :return: number of IDs in the journal, to save in the checkpoint
+        """
+        with open(self._journal(key), "ab") as f:
+            array("Q", ids).tofile(f)
+            return f.tell() // 8
+
+    def load_seen(self, key, count):
+        """
+        Load the IDs of the journal of a scrape saved by its checkpoint. The IDs appended
+        after the checkpoint are dropped, since the scrape resumes from it
+
+        :param key: key of the scrape
+        :param count: number of IDs in the journal when the checkpoint was saved
+        :return: array of IDs
+        """
+        ids = array("Q")
+        try:
+            with open(self._journal(key), "r+b") as f:
+                ids.frombytes(f.read(8 * count))
+                f.truncate(8 * len(ids))
+        except FileNotFoundError:
+            pass
+        return ids
+
+    def clear(self, key):
+        """
+        Remove the checkpoint of a finished scrape, with its journal of seen IDs
+
+        :param key: key of the scrape
+        """
+        for file in (self._file(key), self._journal(key)):
+            try:
+                os.remove(file)
+            except FileNotFoundError:
+                pass
+
+
+def get_checkpoint_store(resume):
+    """
+    Get the checkpoint store to use for a scrape
+
+    :param resume: None, path of a checkpoint directory or CheckpointStore
+    :return: CheckpointStore, or None if checkpoints are disabled
+    """
+    if resume is None or isinstance(resume, CheckpointStore):
+        return resume
+    if isinstance(resume, (str, os.PathLike)):
+        return CheckpointStore(resume)
+    raise ValueError("Resume must be a path or a CheckpointStore")
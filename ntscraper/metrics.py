@@ -0,0 +1,278 @@
+import logging
+from bisect import bisect_left
+from threading import Lock, Thread
+
+# Upper bounds of the buckets of each histogram, in seconds
+default_buckets = {
+    "request_seconds": (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    "page_parse_seconds": (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+    "tweet_parse_seconds": (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01),
+}
+
+# Description of each metric, for the Prometheus exporter
+descriptions = {
+    "requests": "HTTP requests sent to the instances, by status code ('error' if unreachable)",
+    "request_seconds": "Response time of the requests",
+    "response_bytes": "Bytes downloaded from the instances",
+    "page_parse_seconds": "Time spent parsing the HTML of a page",
+    "tweet_parse_seconds": "Time spent extracting a tweet from a page",
+    "retries": "Failed attempts to fetch a page that were retried",
+    "cooldowns": "Rate limited (429) responses",
+    "instance_switches": "Switches away from an instance, by instance left",
+    "cache_hits": "Pages read from the response cache",
+    "cache_misses": "Pages missing from the response cache",
+}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        """
+        Histogram of observed values
+
+        :param buckets: sorted upper bounds of the buckets. A last bucket without upper bound is added
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_dict(self):
+        return {
+            "buckets": dict(zip(self.buckets + (float("inf"),), self.counts)),
+            "sum": self.sum,
+            "count": self.count,
+        }
+
+
+class Metrics:
+    def __init__(self, buckets=None, callbacks=None):
+        """
+        Registry of the metrics of a scraper. Counters and histograms are identified by
+        their name and labels, e.g. the requests by instance and status code. Every
+        recorded value is also passed to the callbacks, to forward it to another system.
+
+        :param buckets: dictionary of the bucket bounds of the histograms, by name. Missing histograms use the defaults. Default is None
+        :param callbacks: list of functions called with the name, the value and the dictionary of labels of every recorded value. Default is None
+        """
+        self.buckets = {**default_buckets, **(buckets or {})}
+        self.callbacks = list(callbacks or [])
+        self._counters = {}
+        self._histograms = {}
+        self._lock = Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def add_callback(self, callback):
+        """
+        Add a function called with the name, the value and the labels of every recorded value
+
+        :param callback: function to add
+        """
+        self.callbacks.append(callback)
+
+    def _notify(self, name, value, labels):
+        for callback in self.callbacks:
+            try:
+                callback(name, value, labels)
+            except Exception as e:
+                logging.warning(f"Error in metrics callback: {e}")
+
+    def inc(self, name, value=1, **labels):
+        """
+        Increase a counter
+
+        :param name: name of the counter
+        :param value: amount to add. Default is 1
+        :param labels: labels of the counter
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counters = self._counters.setdefault(name, {})
+            counters[key] = counters.get(key, 0) + value
+        if self.callbacks:
+            self._notify(name, value, labels)
+
+    def observe(self, name, value, **labels):
+        """
+        Add a value to a histogram
+
+        :param name: name of the histogram
+        :param value: value observed
+        :param labels: labels of the histogram
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            histograms = self._histograms.setdefault(name, {})
+            histogram = histograms.get(key)
+            if histogram is None:
+                histogram = histograms[key] = Histogram(self.buckets.get(name, ()))
+            histogram.observe(value)
+        if self.callbacks:
+            self._notify(name, value, labels)
+
+    def _matches(self, key, labels):
+        return all(item in key for item in labels.items())
+
+    def get(self, name, **labels):
+        """
+        Get the value of a counter, summed over the labels not given
+
+        :param name: name of the counter
+        :param labels: labels to filter by
+        :return: value of the counter, 0 if it was never increased
+        """
+        with self._lock:
+            return sum(
+                value
+                for key, value in self._counters.get(name, {}).items()
+                if self._matches(key, labels)
+            )
+
+    def get_histogram(self, name, **labels):
+        """
+        Get the count and the sum of a histogram, summed over the labels not given
+
+        :param name: name of the histogram
+        :param labels: labels to filter by
+        :return: number of observed values and their sum
+        """
+        with self._lock:
+            histograms = [
+                histogram
+                for key, histogram in self._histograms.get(name, {}).items()
+                if self._matches(key, labels)
+            ]
+            return sum(h.count for h in histograms), sum(h.sum for h in histograms)
+
+    def snapshot(self):
+        """
+        Get the current values of all the metrics
+
+        :return: dictionary with the 'counters' and the 'histograms', each one a dictionary of lists of {'labels', 'value'} dictionaries by name
+        """
+        with self._lock:
+            return {
+                "counters": {
+                    name: [{"labels": dict(key), "value": value} for key, value in values.items()]
+                    for name, values in self._counters.items()
+                },
+                "histograms": {
+                    name: [
+                        {"labels": dict(key), "value": histogram.to_dict()}
+                        for key, histogram in values.items()
+                    ]
+                    for name, values in self._histograms.items()
+                },
+            }
+
+    def reset(self):
+        """
+        Forget all the recorded values
+        """
+        with self._lock:
+            self._counters = {}
+            self._histograms = {}
+
+    def to_prometheus(self, prefix="ntscraper"):
+        """
+        Export the metrics in the Prometheus text format
+
+        :param prefix: prefix of the metric names. Default is 'ntscraper'
+        :return: text of the metrics
+        """
+        lines = []
+        with self._lock:
+            for name, values in sorted(self._counters.items()):
+                metric = f"{prefix}_{name}_total"
+                if name in descriptions:
+                    lines.append(f"# HELP {metric} {descriptions[name]}")
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in sorted(values.items()):
+                    lines.append(f"{metric}{_format_labels(key)} {_format_value(value)}")
+            for name, values in sorted(self._histograms.items()):
+                metric = f"{prefix}_{name}"
+                if name in descriptions:
+                    lines.append(f"# HELP {metric} {descriptions[name]}")
+                lines.append(f"# TYPE {metric} histogram")
+                for key, histogram in sorted(values.items()):
+                    total = 0
+                    for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                        total += count
+                        le = (("le", "+Inf" if bound == float("inf") else _format_value(bound)),)
+                        lines.append(f"{metric}_bucket{_format_labels(key + le)} {total}")
+                    lines.append(f"{metric}_sum{_format_labels(key)} {_format_value(histogram.sum)}")
+                    lines.append(f"{metric}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(key):
+    if not key:
+        return ""
+    labels = ",".join(
+        '{}="{}"'.format(
+            name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for name, value in key
+    )
+    return "{" + labels + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def serve_prometheus(metrics, port=9100, host="127.0.0.1"):
+    """
+    Serve the metrics to Prometheus over HTTP, from a background thread
+
+    :param metrics: Metrics to serve
+    :param port: port to listen on. Default is 9100
+    :param host: address to listen on. Default is 127.0.0.1
+    :return: HTTP server. Call its shutdown method to stop it
+    """
+    # http.server is only imported here, since it is slow to import and rarely needed
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            data = self.server.metrics.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    server.metrics = metrics
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def get_metrics(metrics):
+    """
+    Get the metrics registry to use for a scraper
+
+    :param metrics: None or Metrics
+    :return: Metrics
+    """
+    if metrics is None:
+        return Metrics()
+    if isinstance(metrics, Metrics):
+        return metrics
+    raise ValueError("Metrics must be a Metrics registry")
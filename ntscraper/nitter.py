@@ -1,29 +1,43 @@
-import requests
-from bs4 import BeautifulSoup
-import random
 from urllib.parse import unquote, urlparse
-from time import sleep
+from time import sleep, perf_counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from base64 import b64decode
-from random import uniform
 from re import match, sub
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from copy import copy
+from weakref import WeakValueDictionary
+from functools import partial
+from html import unescape
+from threading import Event, Semaphore, Thread, local
+import queue
 import logging
-from logging.handlers import QueueHandler
-from multiprocessing import Pool, Queue, cpu_count
+import re
 from sys import stdout
-from tqdm import tqdm
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(message)s",
-    datefmt="%d-%b-%y %H:%M:%S",
-    handlers=[logging.StreamHandler(stdout)],
+from .scheduler import InstanceScheduler
+from .ratelimit import RateLimiter, parse_retry_after
+from .parsers import get_parser
+from .checkpoint import get_checkpoint_store
+from .cache import get_response_cache
+from .metrics import get_metrics
+from .seen import SeenIndex, get_seen_index
+from .sinks import Sink, get_sink
+from .tables import TweetTable, table_types, tweet_table
+from .pipeline import ParseStage
+from .paging import FollowPages, SearchPages
+from .records import (
+    Profile,
+    ProfileStats,
+    QuotedTweet,
+    Stats,
+    Tweet,
+    User,
+    check_result_type,
+    convert,
 )
 
-log_queue = Queue()
-log_handler = QueueHandler(log_queue)
-root_logger = logging.getLogger()
-root_logger.addHandler(log_handler)
+# requests and tqdm are imported when they are first used, so that
+# importing the scraper is fast and has no side effects, e.g. before forking workers
 
 valid_filters = [
     "nativeretweets",
@@ -40,15 +54,81 @@ valid_filters = [
     "pro_video",
 ]
 
+# Tweet of a timeline, as counted by _check_error_page. Pages handed to a ParseStage are
+# only checked with it, and parsed by the fetcher if it is not found
+timeline_item_pattern = re.compile(rb'<div class="\s*timeline-item(?:\s+thread)?\s*"')
+
+# Link of a show-more button, read by _scan_next_page before the page is parsed
+show_more_pattern = re.compile(
+    rb'<div class="(?:[^"]*\s)?show-more(?:\s[^"]*)?"[^>]*>\s*<a\s[^>]*?href="([^"]*)"'
+)
+
+# (tag name, class) pairs of the tags used to extract a tweet
+tweet_tags = {
+    ("div", "tweet-body"),
+    ("div", "attachments"),
+    ("div", "quote"),
+    ("div", "quote-text"),
+    ("div", "retweet-header"),
+    ("div", "pinned"),
+    ("div", "replying-to"),
+    ("span", "tweet-date"),
+    ("span", "tweet-stat"),
+    ("img", "avatar"),
+    ("a", "fullname"),
+    ("a", "username"),
+    ("a", "card-container"),
+}
+
 
 class Nitter:
-    def __init__(self, instances=None, log_level=1, skip_instance_check=False):
+    def __init__(
+        self,
+        instances=None,
+        log_level=1,
+        skip_instance_check=False,
+        pool_connections=10,
+        pool_maxsize=10,
+        parser="bs4",
+        partial_parse=False,
+        rate=0.5,
+        min_rate=0.05,
+        max_rate=5.0,
+        burst=1,
+        cache=None,
+        metrics=None,
+        prefetch=0,
+    ):
         """
         Nitter scraper
         :param instances: accepts a list of instances or a single instance in this format: "https://{host}:{port}", e.g. "http://localhost:8080
-        :param log_level: logging level
+        :param log_level: logging level. 0 shows warnings, 1 shows info messages too, None leaves the logging configuration untouched. Default is 1
         :param skip_instance_check: True if the health check of all instances and the instance change during execution should be skipped
+        :param pool_connections: number of connection pools kept by the session of each instance. Default is 10
+        :param pool_maxsize: max number of connections kept alive in each connection pool. Default is 10
+        :param parser: HTML parser backend. 'bs4' (BeautifulSoup, the reference) or 'lxml' (faster). Default is 'bs4'
+        :param partial_parse: True if only the timeline, profile and error containers of the pages should be parsed. Default is False
+        :param rate: initial requests per second to each instance. It grows while the instance answers and shrinks when it fails or rate limits. Default is 0.5
+        :param min_rate: min requests per second to each instance. Default is 0.05
+        :param max_rate: max requests per second to each instance. Default is 5.0
+        :param burst: max number of requests sent to an instance without waiting. Default is 1
+        :param cache: directory or ResponseCache (see ntscraper.cache) where the downloaded pages are cached. Default is None (no cache)
+        :param metrics: Metrics (see ntscraper.metrics) where the requests, parse times, retries and instance switches are recorded. Default is None (a new registry)
+        :param prefetch: number of pages of a search downloaded in the background, ahead of the page whose tweets are being extracted. Default is 0 (each page is downloaded after the tweets of the previous one are extracted)
         """
+        if prefetch < 0:
+            raise ValueError("The number of pages to prefetch cannot be negative")
+        self.parser = get_parser(parser, partial_parse)
+        self.rate_limiter = RateLimiter(rate, min_rate, max_rate, burst)
+        self.cache = get_response_cache(cache)
+        self.metrics = get_metrics(metrics)
+        self.prefetch = prefetch
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self._sessions = {}
+        # Users of the records returned, only kept while a record refers to them
+        self._users = WeakValueDictionary()
+        self.response_times = {}
         if instances:
             # check instances type is list or str
             if isinstance(instances, list):
@@ -62,20 +142,15 @@ class Nitter:
         if self.instances is None:
             raise ValueError("Could not fetch instances")
         self.working_instances = []
+        self.scheduler = InstanceScheduler()
         self.skip_instance_check = skip_instance_check
         if skip_instance_check:
             self.working_instances = self.instances
+            self.scheduler.set_instances(self.instances)
         else:
             self._test_all_instances("/x", no_print=True)
-        if log_level == 0:
-            log_level = logging.WARNING
-        elif log_level == 1:
-            log_level = logging.INFO
-        elif log_level:
-            raise ValueError("Invalid log level")
-
-        logger = logging.getLogger()
-        logger.setLevel(log_level)
+        if log_level is not None:
+            self._configure_logging(log_level)
 
         self.retry_count = 0
         self.cooldown_count = 0
@@ -83,9 +158,39 @@ class Nitter:
         self.instance = ""
         self.r = None
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_users"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._users = WeakValueDictionary()
+
+    def _configure_logging(self, log_level):
+        """
+        Print the log messages to stdout, unless logging is configured already, and set their level
+
+        :param log_level: 0 for warnings, 1 for info messages too
+        """
+        if log_level == 0:
+            level = logging.WARNING
+        elif log_level == 1:
+            level = logging.INFO
+        else:
+            raise ValueError("Invalid log level")
+        logging.basicConfig(
+            format="%(asctime)s - %(message)s",
+            datefmt="%d-%b-%y %H:%M:%S",
+            handlers=[logging.StreamHandler(stdout)],
+        )
+        logging.getLogger().setLevel(level)
+
     def _initialize_session(self, instance):
         """
         Initialize the requests session
+
+        :param instance: instance to use. If None, a random instance is used
         """
         if instance is None:
             if self.skip_instance_check:
@@ -96,33 +201,69 @@ class Nitter:
             )
         else:
             self.instance = instance
-        self.r = requests.Session()
-        self.r.headers.update(
-            {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:129.0) Gecko/20100101 Firefox/129.0",
-                "Host": self.instance.split("://")[1],
-            }
-        )
+        self.r = self._get_session(self.instance)
 
-    def _is_instance_encrypted(self):
+    def _get_session(self, instance):
         """
-        Check if the current instance uses encrypted media
+        Get the session of an instance, creating it if needed. Sessions are kept
+        for the whole life of the scraper, so their connections are reused across requests
 
-        :return: True if encrypted, False otherwise
+        :param instance: instance of the session
+        :return: requests session
         """
-        soup = self._get_page("/x")
+        session = self._sessions.get(instance)
+        if session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=self.pool_connections,
+                pool_maxsize=self.pool_maxsize,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(
+                {
+                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:129.0) Gecko/20100101 Firefox/129.0",
+                    "Host": instance.split("://")[1],
+                }
+            )
+            self._sessions[instance] = session
+        return session
 
-        if soup is None:
-            raise ValueError("Invalid instance")
+    def _close_session(self, instance):
+        """
+        Close the session of an instance, if any
 
-        if (
-            soup.find("a", class_="profile-card-avatar").find("img")
-            and "/enc/"
-            in soup.find("a", class_="profile-card-avatar").find("img")["src"]
-        ):
-            return True
-        else:
-            return False
+        :param instance: instance of the session
+        """
+        session = self._sessions.pop(instance, None)
+        if session is not None:
+            session.close()
+
+    def close(self):
+        """
+        Close the sessions of all the instances
+        """
+        for instance in list(self._sessions):
+            self._close_session(instance)
+        self.r = None
+
+    def _is_page_encrypted(self, soup):
+        """
+        Check if a page uses encrypted media, from the URLs of its images and videos.
+        Since this only looks at the page itself, it stays correct when the scraper
+        switches to an instance with a different setting.
+
+        :param soup: page to check
+        :return: True if encrypted, False otherwise
+        """
+        for media in soup.find_all(["img", "source", "video"]):
+            url = media.get("src") or media.get("data-url") or ""
+            if url.startswith(("/pic/", "/video/")):
+                return url.startswith(("/pic/enc/", "/video/enc/"))
+        return False
 
     def _get_instances(self):
         """
@@ -130,67 +271,180 @@ class Nitter:
 
         :return: list of Nitter instances, or None if lookup failed
         """
+        import requests
+
         r = requests.get("https://raw.githubusercontent.com/libredirect/instances/main/data.json")
         if r.ok:
             return r.json()["nitter"]["clearnet"]
         else:
             return None
 
-    def _test_all_instances(self, endpoint, no_print=False):
+    def _probe_instance(self, instance, endpoint, timeout):
+        """
+        Check if a Nitter instance works
+
+        :param instance: instance to check
+        :param endpoint: endpoint to use
+        :param timeout: timeout of the request, in seconds
+        :return: response time in seconds, or None if the instance does not work
+        """
+        start = perf_counter()
+        try:
+            r = self._get_session(instance).get(
+                instance + endpoint,
+                cookies={"hlsPlayback": "on"},
+                timeout=timeout,
+            )
+        except:
+            return None
+        response_time = perf_counter() - start
+        if r.ok:
+            soup = self.parser.parse(r.content)
+            if soup is not None and len(soup.find_all("div", class_="timeline-item")):
+                return response_time
+        return None
+
+    def _test_all_instances(self, endpoint, no_print=False, timeout=10):
         """
-        Test all Nitter instances when a high number of retries is detected
+        Test all Nitter instances when a high number of retries is detected.
+        The instances are tested concurrently, and the ones that do not answer
+        within the timeout are considered not working.
 
         :param endpoint: endpoint to use
         :param no_print: True if no output should be printed
+        :param timeout: max time to wait for the instances, in seconds. Default is 10
+        :return: list of working instances, from the fastest to the slowest
         """
+        from tqdm import tqdm
+
         if not no_print:
             print("High number of retries detected. Testing all instances...")
-        working_instances = []
+        response_times = {}
 
-        for instance in tqdm(self.instances, desc="Testing instances"):
-            self._initialize_session(instance)
-            req_session = requests.Session()
-            req_session.headers.update(
-                {
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0"
-                }
-            )
+        executor = ThreadPoolExecutor(max_workers=max(len(self.instances), 1))
+        futures = {
+            executor.submit(self._probe_instance, instance, endpoint, timeout): instance
+            for instance in self.instances
+        }
+        with tqdm(total=len(futures), desc="Testing instances") as progress:
             try:
-                r = req_session.get(
-                    instance + endpoint,
-                    cookies={"hlsPlayback": "on"},
-                    timeout=10,
-                )
-                if r.ok:
-                    soup = BeautifulSoup(r.text, "lxml")
-                    if soup is not None and len(
-                        soup.find_all("div", class_="timeline-item")
-                    ):
-                        working_instances.append(instance)
-            except:
+                for future in as_completed(futures, timeout=timeout):
+                    progress.update()
+                    if future.result() is not None:
+                        response_times[futures[future]] = future.result()
+            except FuturesTimeoutError:
                 pass
+        executor.shutdown(wait=False)
+
+        working_instances = sorted(response_times, key=response_times.get)
+        self.response_times.update(response_times)
         if not no_print:
             print("New working instances:", ", ".join(working_instances))
         self.working_instances = working_instances
+        self.scheduler.set_instances(working_instances, response_times)
+        return working_instances
 
-    def _get_new_instance(self, message):
-        instance = self.get_random_instance()
+    def _get_new_instance(self, message, current=None):
+        """
+        Pick a different instance to switch to
+
+        :param message: reason of the switch, to log
+        :param current: instance to switch from. Default is the current instance
+        :return: URL of the new instance
+        """
+        self.metrics.inc("instance_switches", instance=current or self.instance)
+        instance = self.scheduler.choose(exclude=current or self.instance)
         logging.warning(f"{message}. Trying {instance}")
         return instance
 
-    def _check_error_page(self, soup):
+    def _record_response(
+        self, status_code, response_time, instance=None, retry_after=None, size=0
+    ):
+        """
+        Update the health and the request rate of an instance with the outcome of a request
+
+        :param status_code: HTTP status code of the response
+        :param response_time: response time, in seconds
+        :param instance: instance of the request. Default is the current instance
+        :param retry_after: value of the Retry-After header of the response. Default is None
+        :param size: size of the response body, in bytes. Default is 0
+        """
+        instance = instance or self.instance
+        self.metrics.inc("requests", instance=instance, status=str(status_code))
+        self.metrics.observe("request_seconds", response_time, instance=instance)
+        self.metrics.inc("response_bytes", size, instance=instance)
+        if status_code == 429:
+            self.metrics.inc("cooldowns", instance=instance)
+            self.scheduler.record_cooldown(instance)
+            self.rate_limiter.record_backoff(instance, parse_retry_after(retry_after))
+        elif status_code >= 500:
+            self.scheduler.record_failure(instance)
+            self.rate_limiter.record_backoff(instance, parse_retry_after(retry_after))
+        else:
+            self.scheduler.record_success(instance, response_time)
+            self.rate_limiter.record_success(instance)
+
+    def _record_error(self, instance=None):
+        """
+        Update the health and the request rate of an instance after a request that got no response
+
+        :param instance: instance of the request. Default is the current instance
+        """
+        instance = instance or self.instance
+        self.metrics.inc("requests", instance=instance, status="error")
+        self.scheduler.record_failure(instance)
+        self.rate_limiter.record_backoff(instance)
+
+    def _parse_page(self, content):
+        """
+        Parse the HTML of a page, recording the time it takes
+
+        :param content: HTML of the page
+        :return: parsed page
+        """
+        start = perf_counter()
+        soup = self.parser.parse(content)
+        self.metrics.observe("page_parse_seconds", perf_counter() - start)
+        return soup
+
+    def _read_page(self, content, raw=False, instance=None):
+        """
+        Parse a page and check it for errors
+
+        :param content: content of the page
+        :param raw: True if the content should be returned instead of the parsed page. The page is then only parsed if a quick scan finds no tweets in it. Default is False
+        :param instance: instance the page was fetched from. Default is the current instance
+        :return: parsed page, or its content if raw is True, None if the page is an error
+        """
+        if not raw:
+            return self._check_error_page(self._parse_page(content), instance)
+        if timeline_item_pattern.search(content):
+            return content
+        if self._check_error_page(self._parse_page(content), instance) is None:
+            return None
+        return content
+
+    def _wait_for_rate_limit(self, instance):
+        """
+        Wait until a request can be sent to an instance without exceeding its rate
+
+        :param instance: instance of the request
+        """
+        delay = self.rate_limiter.reserve(instance)
+        if delay > 0:
+            sleep(delay)
+
+    def _check_error_page(self, soup, instance=None):
         """
         Check if the page contains an error. If so, print the error and return None
 
         :param soup: page to check
+        :param instance: instance the page was fetched from. Default is the current instance
         :return: None if error is found, soup otherwise
         """
-        if not soup.find(
-            lambda tag: tag.name == "div"
-            and (
-                tag.get("class") == ["timeline-item"]
-                or tag.get("class") == ["timeline-item", "thread"]
-            )
+        if not any(
+            tweet.get("class") in (["timeline-item"], ["timeline-item", "thread"])
+            for tweet in soup.find_all("div", class_="timeline-item")
         ):
             if soup.find("div", class_="error-panel"):
                 message = (
@@ -201,22 +455,54 @@ class Nitter:
                 if soup.find("div", class_="timeline-header timeline-protected"):
                     message = "Account is protected"
                 else:
-                    message = f"Empty page on {self.instance}"
+                    message = f"Empty page on {instance or self.instance}"
             logging.warning(message)
             soup = None
         return soup
 
-    def _get_page(self, endpoint, max_retries=5):
+    def _get_cached_page(self, endpoint, instance=None, raw=False):
+        """
+        Get a page from the response cache
+
+        :param endpoint: endpoint of the page
+        :param instance: instance the page is requested from. Default is the current instance
+        :param raw: True if the content of the page should be returned instead of the parsed page. Default is False
+        :return: page content, None if the page is not cached in offline mode, or False if the page should be downloaded
+        """
+        content = self.cache.get(endpoint)
+        if content is not None:
+            self.metrics.inc("cache_hits")
+            return self._read_page(content, raw, instance)
+        self.metrics.inc("cache_misses")
+        if self.cache.offline:
+            logging.warning(f"{endpoint} is not in the cache")
+            return None
+        return False
+
+    def _get_page(self, endpoint, max_retries=5, raw=False):
         """
         Download page from Nitter instance
 
         :param endpoint: endpoint to use
         :param max_retries: max number of retries, default 5
+        :param raw: True if the content of the page should be returned instead of the parsed page, to parse it in a ParseStage. Default is False
         :return: page content, or None if max retries reached
         """
+        if self.cache is not None:
+            soup = self._get_cached_page(endpoint, raw=raw)
+            if soup is not False:
+                return soup
         keep_trying = True
         soup = None
         while keep_trying and (self.retry_count < max_retries):
+            if not self.skip_instance_check and not self.scheduler.is_available(
+                self.instance
+            ):
+                self._initialize_session(
+                    self._get_new_instance(f"{self.instance} is out of service")
+                )
+            self._wait_for_rate_limit(self.instance)
+            start = perf_counter()
             try:
                 r = self.r.get(
                     self.instance + endpoint,
@@ -224,6 +510,7 @@ class Nitter:
                     timeout=10,
                 )
             except:
+                self._record_error()
                 if self.retry_count == max_retries // 2:
                     if not self.skip_instance_check:
                         self._test_all_instances(endpoint)
@@ -239,16 +526,22 @@ class Nitter:
                 self.retry_count += 1
                 self.cooldown_count = 0
                 self.session_reset = True
-                sleep(1)
                 continue
-            soup = BeautifulSoup(r.text, "lxml")
+            self._record_response(
+                r.status_code,
+                perf_counter() - start,
+                retry_after=r.headers.get("Retry-After"),
+                size=len(r.content),
+            )
+            soup = self._read_page(r.content, raw)
             if r.ok:
                 self.session_reset = False
-                soup = self._check_error_page(soup)
+                if soup is not None and self.cache is not None:
+                    self.cache.set(endpoint, r.content)
                 keep_trying = False
             else:
-                soup = self._check_error_page(soup)
-                if soup is None:
+                # Error panels of rate limited or failing instances are retried
+                if soup is None and r.status_code != 429 and r.status_code < 500:
                     keep_trying = False
                 else:
                     if self.retry_count == max_retries // 2:
@@ -260,19 +553,24 @@ class Nitter:
                                 )
                                 soup = None
                                 keep_trying = False
-                        else:
-                            self.retry_count += 1
+                            else:
+                                self._initialize_session(
+                                    self._get_new_instance(
+                                        f"Error fetching {self.instance}"
+                                    )
+                                )
+                        self.retry_count += 1
                     else:
                         if "cursor" in endpoint:
                             if not self.session_reset:
                                 logging.warning(
-                                    "Cooldown reached, trying again in 20 seconds"
+                                    f"Cooldown reached on {self.instance}, slowing down"
                                 )
                                 self.cooldown_count += 1
-                                sleep(20)
                             if self.cooldown_count >= 5 and not self.session_reset:
+                                self._close_session(self.instance)
                                 if not self.skip_instance_check:
-                                    self._initialize_session()
+                                    self._initialize_session(None)
                                 else:
                                     self._initialize_session(self.instance)
                                 self.session_reset = True
@@ -293,204 +591,109 @@ class Nitter:
                                     )
                                 )
                         self.retry_count += 1
-            sleep(2)
 
         if self.retry_count >= max_retries:
             logging.warning("Max retries reached. Check your request and try again.")
             soup = None
+        if self.retry_count:
+            self.metrics.inc("retries", self.retry_count)
         self.retry_count = 0
 
         return soup
 
-    def _get_quoted_media(self, quoted_tweet, is_encrypted):
-        """
-        Extract media from a quoted tweet
-
-        :param quoted_tweet: tweet to extract media from
-        :param is_encrypted: True if instance uses encrypted media
-        :return: lists of images, videos and gifs, or empty lists if no media is found
-        """
-        quoted_pictures, quoted_videos, quoted_gifs = [], [], []
-        if quoted_tweet.find("div", class_="attachments"):
-            if is_encrypted:
-                quoted_pictures = [
-                    "https://pbs.twimg.com/"
-                    + b64decode(img["src"].split("/")[-1].encode("utf-8"))
-                    .decode("utf-8")
-                    .split("?")[0]
-                    for img in quoted_tweet.find("div", class_="attachments").find_all(
-                        "img"
-                    )
-                ]
-                quoted_videos = [
-                    b64decode(video["data-url"].split("/")[-1].encode("utf-8")).decode(
-                        "utf-8"
-                    )
-                    if "data-url" in video.attrs
-                    else video.find("source")["src"]
-                    for video in quoted_tweet.find(
-                        "div", class_="attachments"
-                    ).find_all("video", class_="")
-                ]
-                quoted_gifs = [
-                    "https://"
-                    + b64decode(
-                        gif.source["src"].split("/")[-1].encode("utf-8")
-                    ).decode("utf-8")
-                    for gif in quoted_tweet.find("div", class_="attachments").find_all(
-                        "video", class_="gif"
-                    )
-                ]
-            else:
-                quoted_pictures = [
-                    "https://pbs.twimg.com"
-                    + unquote(img["src"].split("/pic")[1]).split("?")[0]
-                    for img in quoted_tweet.find("div", class_="attachments").find_all(
-                        "img"
-                    )
-                ]
-                quoted_videos = [
-                    unquote("https" + video["data-url"].split("https")[1])
-                    if "data-url" in video.attrs
-                    else unquote(video.find("source")["src"])
-                    for video in quoted_tweet.find(
-                        "div", class_="attachments"
-                    ).find_all("video", class_="")
-                ]
-                quoted_gifs = [
-                    unquote("https://" + gif.source["src"].split("/pic/")[1])
-                    for gif in quoted_tweet.find("div", class_="attachments").find_all(
-                        "video", class_="gif"
-                    )
-                ]
-        return quoted_pictures, quoted_videos, quoted_gifs
-
-    def _get_tweet_media(self, tweet, is_encrypted):
+    def _get_media(self, images, videos, is_encrypted, unquote_sources=False):
         """
-        Extract media from a tweet
+        Extract media from the images and videos of an attachments container
 
-        :param tweet: tweet to extract media from
+        :param images: img tags of the attachments
+        :param videos: video tags of the attachments
         :param is_encrypted: True if instance uses encrypted media
-        :return: lists of images, videos and gifs, or empty lists if no media is found
+        :param unquote_sources: True if the source URLs of the videos should be unquoted
+        :return: tuples of images, videos and gifs, or empty tuples if no media is found
         """
-        pictures, videos, gifs = [], [], []
-        if tweet.find("div", class_="tweet-body").find(
-            "div", class_="attachments", recursive=False
-        ):
-            if is_encrypted:
-                pictures = [
+        # Only videos with an empty class attribute are proper videos
+        plain_videos = [video for video in videos if video.get("class") == []]
+        gifs = [video for video in videos if "gif" in (video.get("class") or [])]
+        if is_encrypted:
+            return (
+                tuple(
                     "https://pbs.twimg.com/"
                     + b64decode(img["src"].split("/")[-1].encode("utf-8"))
                     .decode("utf-8")
                     .split("?")[0]
-                    for img in tweet.find("div", class_="tweet-body")
-                    .find("div", class_="attachments", recursive=False)
-                    .find_all("img")
-                ]
-                videos = [
+                    for img in images
+                ),
+                tuple(
                     b64decode(video["data-url"].split("/")[-1].encode("utf-8")).decode(
                         "utf-8"
                     )
                     if "data-url" in video.attrs
                     else video.find("source")["src"]
-                    for video in tweet.find("div", class_="tweet-body")
-                    .find("div", class_="attachments", recursive=False)
-                    .find_all("video", class_="")
-                ]
-                gifs = [
+                    for video in plain_videos
+                ),
+                tuple(
                     "https://"
                     + b64decode(
                         gif.source["src"].split("/")[-1].encode("utf-8")
                     ).decode("utf-8")
-                    for gif in tweet.find("div", class_="tweet-body")
-                    .find("div", class_="attachments", recursive=False)
-                    .find_all("video", class_="gif")
-                ]
-            else:
-                pictures = [
-                    "https://pbs.twimg.com"
-                    + unquote(img["src"].split("/pic")[1]).split("?")[0]
-                    for img in tweet.find("div", class_="tweet-body")
-                    .find("div", class_="attachments", recursive=False)
-                    .find_all("img")
-                ]
-                videos = [
-                    unquote("https" + video["data-url"].split("https")[1])
-                    if "data-url" in video.attrs
-                    else video.find("source")["src"]
-                    for video in tweet.find("div", class_="tweet-body")
-                    .find("div", class_="attachments", recursive=False)
-                    .find_all("video", class_="")
-                ]
-                gifs = [
-                    unquote("https://" + gif.source["src"].split("/pic/")[1])
-                    for gif in tweet.find("div", class_="tweet-body")
-                    .find("div", class_="attachments", recursive=False)
-                    .find_all("video", class_="gif")
-                ]
-        return pictures, videos, gifs
+                    for gif in gifs
+                ),
+            )
+        return (
+            tuple(
+                "https://pbs.twimg.com"
+                + unquote(img["src"].split("/pic")[1]).split("?")[0]
+                for img in images
+            ),
+            tuple(
+                unquote("https" + video["data-url"].split("https")[1])
+                if "data-url" in video.attrs
+                else unquote(video.find("source")["src"])
+                if unquote_sources
+                else video.find("source")["src"]
+                for video in plain_videos
+            ),
+            tuple(
+                unquote("https://" + gif.source["src"].split("/pic/")[1])
+                for gif in gifs
+            ),
+        )
 
-    def _get_tweet_stats(self, tweet):
+    def _get_tweet_stats(self, stat_tags):
         """
         Extract stats from a tweet
 
-        :param tweet: tweet to extract stats from
-        :return: dictionary of stats. If a stat is not found, it is set to 0
+        :param stat_tags: tweet-stat tags of the tweet
+        :return: stats of the tweet. If a stat is not found, it is set to 0
         """
-        return {
-            "comments": int(
-                tweet.find_all("span", class_="tweet-stat")[0]
-                .find("div")
-                .text.strip()
-                .replace(",", "")
-                or 0
-            ),
-            "retweets": int(
-                tweet.find_all("span", class_="tweet-stat")[1]
-                .find("div")
-                .text.strip()
-                .replace(",", "")
-                or 0
-            ),
-            "quotes": int(
-                tweet.find_all("span", class_="tweet-stat")[2]
-                .find("div")
-                .text.strip()
-                .replace(",", "")
-                or 0
-            ),
-            "likes": int(
-                tweet.find_all("span", class_="tweet-stat")[3]
-                .find("div")
-                .text.strip()
-                .replace(",", "")
-                or 0
-            ),
-        }
+        return Stats(
+            *[
+                int(tag.find("div").text.strip().replace(",", "") or 0)
+                for tag in stat_tags[:4]
+            ]
+        )
 
-    def _get_user(self, tweet, is_encrypted):
+    def _get_user(self, tags, is_encrypted):
         """
         Extract user from a tweet
 
-        :param tweet: tweet to extract user from
+        :param tags: tags of the tweet, as indexed by _index_tweet
         :param is_encrypted: True if instance uses encrypted media
-        :return: dictionary of user
+        :return: user of the tweet
         """
         avatar = "https://abs.twimg.com/sticky/default_profile_images/default_profile_normal.png"  # Default avatar
         profile_id = "unknown"  # Default profile ID
+        avatar_tag = tags.get(("img", "avatar"))
 
         if is_encrypted:
             try:
                 avatar = "https://pbs.twimg.com/" + b64decode(
-                    tweet.find("img", class_="avatar")["src"]
-                    .split("/")[-1]
-                    .encode("utf-8")
+                    avatar_tag["src"].split("/")[-1].encode("utf-8")
                 ).decode("utf-8")
             except:
                 avatar = "https://abs.twimg.com/sticky/default_profile_images/default_profile_normal.png"  # Fallback avatar
 
         else:
-            avatar_tag = tweet.find("img", class_="avatar")
             if avatar_tag and avatar_tag.has_attr("src"):
                 avatar = unquote(avatar_tag["src"])  # Successfully getting avatar
             else:
@@ -500,153 +703,202 @@ class Nitter:
         if "profile_images" in avatar:
             profile_id = avatar.split("/profile_images/")[1].split("/")[0]
 
-        return {
-            "name": tweet.find("a", class_="fullname").text.strip(),
-            "username": tweet.find("a", class_="username").text.strip(),
-            "profile_id": profile_id,
-            "avatar": avatar,
-        }
+        return User(
+            tags[("a", "fullname")].text.strip(),
+            tags[("a", "username")].text.strip(),
+            profile_id,
+            avatar,
+        )
+
+    def _intern_user(self, user):
+        """
+        Get the user with the same details as the given one, which is stored the first time
+        it is seen, so that all the records of the same user share a single object
+
+        :param user: user of a record
+        :return: shared user
+        """
+        key = (user.name, user.username, user.profile_id, user.avatar)
+        shared = self._users.get(key)
+        if shared is None:
+            self._users[key] = shared = user
+        return shared
+
+    def _intern_users(self, tweet):
+        """
+        Replace the users of a tweet and of its quoted tweet with the shared ones
+
+        :param tweet: extracted tweet
+        :return: the tweet
+        """
+        for record in (tweet, tweet.quoted_post):
+            if record is not None and record.user is not None:
+                record.user = self._intern_user(record.user)
+        return tweet
 
-    def _get_tweet_date(self, tweet):
+    def _get_tweet_date(self, tags):
         """
         Extract date from a tweet
 
-        :param tweet: tweet to extract date from
+        :param tags: tags of the tweet, as indexed by _index_tweet
         :return: date of tweet
         """
+        tweet_date = tags.get(("span", "tweet-date"))
         return (
-            tweet.find("span", class_="tweet-date")
-            .find("a")["title"]
-            .split("/")[-1]
-            .split("#")[0]
-            if tweet.find("span", class_="tweet-date")
+            tweet_date.find("a")["title"].split("/")[-1].split("#")[0]
+            if tweet_date
             else ""
         )
 
-    def _get_tweet_text(self, tweet):
+    def _get_tweet_text(self, tags):
         """
         Extract text from a tweet
 
-        :param tweet: tweet to extract text from
+        :param tags: tags of the tweet, as indexed by _index_tweet
         :return: text of tweet
         """
-        return (
-            tweet.find("div", class_="tweet-content media-body")
-            .text.strip()
-            .replace("\n", " ")
-            if tweet.find("div", class_="tweet-content media-body")
-            else tweet.find("div", class_="quote-text").text.strip().replace("\n", " ")
-            if tweet.find("div", class_="quote-text")
-            else ""
+        content = tags.get(("div", "tweet-content media-body")) or tags.get(
+            ("div", "quote-text")
         )
+        return content.text.strip().replace("\n", " ") if content else ""
 
-    def _get_tweet_link(self, tweet):
+    def _get_tweet_link(self, tags):
         """
         Extract link from a tweet
 
-        :param tweet: tweet to extract link from
+        :param tags: tags of the tweet, as indexed by _index_tweet
         :return: link of tweet
         """
-        tweet_date = tweet.find("span", class_="tweet-date")
+        tweet_date = tags.get(("span", "tweet-date"))
         return "https://twitter.com" + tweet_date.find("a")["href"] if tweet_date else ""
 
-    def _get_external_link(self, tweet):
+    def _index_tweet(self, element, tags, quote_tags, media, links):
         """
-        Extract external link from a tweet
-
-        :param tweet: tweet to extract external link from
-        :return: external link of tweet
+        Walk the tags of a tweet once, collecting everything the extractor needs.
+        For each (tag name, class) pair only the first tag is kept, as find() would do.
+
+        :param element: tag whose children should be visited
+        :param tags: dictionary of the tags of the whole tweet, filled while walking. Besides the (tag name, class) keys, 'stats' holds all the tweet-stat tags, 'quote' the tags of the quoted tweet and 'media' the tags of the attachments
+        :param quote_tags: dictionary of the tags of the quoted tweet, or None outside of it
+        :param media: dictionary with the lists of img and video tags of the attachments being visited, or None outside of them
+        :param links: list of links with an external URL, filled while walking
         """
-        return (
-            tweet.find("a", class_="card-container")["href"]
-            if tweet.find("a", class_="card-container")
-            else ""
-        )
+        for child in element.contents:
+            if child.name is None:
+                continue
+            name = child.name
+            classes = child.get("class") or ()
 
-    def _get_replied_to(self, tweet):
-        """
-        Extract the users a tweet is replying to. If the tweet is not a reply,
-        return an empty list.
+            # Links to external URLs are replaced with the URL itself, so
+            # nothing inside of them is part of the tweet anymore
+            if name == "a" and "https" in child.get("href", ""):
+                links.append(child)
+                continue
 
-        :param tweet: tweet to extract replies from
-        :return: list of users the tweet is replying to
-        """
-        return (
-            [
-                user.text.strip()
-                for user in tweet.find("div", class_="replying-to").find_all("a")
-            ]
-            if tweet.find("div", class_="replying-to")
-            else []
-        )
+            child_quote_tags = quote_tags
+            child_media = media
+            for class_name in classes:
+                key = (name, class_name)
+                if key not in tweet_tags:
+                    continue
+                if key == ("span", "tweet-stat"):
+                    tags["stats"].append(child)
+                    continue
+                if key == ("div", "quote") and key not in tags:
+                    child_quote_tags = tags["quote"] = {}
+                elif key == ("div", "attachments"):
+                    if quote_tags is not None:
+                        if "media" not in quote_tags:
+                            child_media = quote_tags["media"] = {"img": [], "video": []}
+                    elif "media" not in tags and element is tags.get(
+                        ("div", "tweet-body")
+                    ):
+                        child_media = tags["media"] = {"img": [], "video": []}
+                if key not in tags:
+                    tags[key] = child
+                if quote_tags is not None and key not in quote_tags:
+                    quote_tags[key] = child
+            if name == "div" and " ".join(classes) == "tweet-content media-body":
+                key = ("div", "tweet-content media-body")
+                if key not in tags:
+                    tags[key] = child
+                if quote_tags is not None and key not in quote_tags:
+                    quote_tags[key] = child
+
+            if media is not None and name in ("img", "video"):
+                media[name].append(child)
+
+            self._index_tweet(child, tags, child_quote_tags, child_media, links)
 
     def _extract_tweet(self, tweet, is_encrypted):
         """
-        Extract content from a tweet
+        Extract content from a tweet. The tags of the tweet are visited only once
 
         :param tweet: tweet to extract content from
         :param is_encrypted: True if instance uses encrypted media
-        :return: dictionary of content for the tweet
+        :return: content of the tweet
         """
+        tags = {"stats": []}
+        links = []
+        self._index_tweet(tweet, tags, None, None, links)
+
         # Replace link text with link
-        if tweet.find_all("a"):
-            for link in tweet.find_all("a"):
-                if "https" in link["href"]:
-                    link.replace_with(link["href"])
+        for link in links:
+            link.replace_with(link["href"])
 
         # Extract the quoted tweet
-        quoted_tweet = (
-            tweet.find("div", class_="quote")
-            if tweet.find("div", class_="quote")
-            else None
-        )
+        quoted_tweet = tags.get(("div", "quote"))
 
         # Extract media from the quoted tweet
         if quoted_tweet:
-            deleted = False
-            if quoted_tweet["class"] == ["quote", "unavailable"]:
-                deleted = True
-            (
-                quoted_pictures,
-                quoted_videos,
-                quoted_gifs,
-            ) = self._get_quoted_media(quoted_tweet, is_encrypted)
+            quote_tags = tags["quote"]
+            deleted = quoted_tweet["class"] == ["quote", "unavailable"]
+            quote_media = quote_tags.get("media", {"img": [], "video": []})
+            (quoted_pictures, quoted_videos, quoted_gifs) = self._get_media(
+                quote_media["img"], quote_media["video"], is_encrypted, True
+            )
 
         # Extract media from the tweet
-        pictures, videos, gifs = self._get_tweet_media(tweet, is_encrypted)
+        tweet_media = tags.get("media", {"img": [], "video": []})
+        pictures, videos, gifs = self._get_media(
+            tweet_media["img"], tweet_media["video"], is_encrypted
+        )
 
         # Extract the tweet id
-        link = self._get_tweet_link(tweet)
+        link = self._get_tweet_link(tags)
         id = urlparse(link).path.rsplit("/", 1)[-1]
 
-        return {
-            "id": id,
-            "link": link,
-            "text": self._get_tweet_text(tweet),
-            "user": self._get_user(tweet, is_encrypted),
-            "date": self._get_tweet_date(tweet),
-            "is-retweet": tweet.find("div", class_="retweet-header") is not None,
-            "is-pinned": tweet.find("div", class_="pinned") is not None,
-            "external-link": self._get_external_link(tweet),
-            "replying-to": self._get_replied_to(tweet),
-            "quoted-post": {
-                "link": self._get_tweet_link(quoted_tweet) if not deleted else "",
-                "text": self._get_tweet_text(quoted_tweet) if not deleted else "",
-                "user": self._get_user(quoted_tweet, is_encrypted)
-                if not deleted
-                else {},
-                "date": self._get_tweet_date(quoted_tweet) if not deleted else "",
-                "pictures": quoted_pictures,
-                "videos": quoted_videos,
-                "gifs": quoted_gifs,
-            }
+        card = tags.get(("a", "card-container"))
+        replying_to = tags.get(("div", "replying-to"))
+
+        return Tweet(
+            id,
+            link,
+            self._get_tweet_text(tags),
+            self._get_user(tags, is_encrypted),
+            self._get_tweet_date(tags),
+            ("div", "retweet-header") in tags,
+            ("div", "pinned") in tags,
+            card["href"] if card else "",
+            tuple(user.text.strip() for user in replying_to.find_all("a"))
+            if replying_to
+            else (),
+            QuotedTweet(
+                self._get_tweet_link(quote_tags) if not deleted else "",
+                self._get_tweet_text(quote_tags) if not deleted else "",
+                self._get_user(quote_tags, is_encrypted) if not deleted else None,
+                self._get_tweet_date(quote_tags) if not deleted else "",
+                quoted_pictures,
+                quoted_videos,
+                quoted_gifs,
+            )
             if quoted_tweet
-            else {},
-            "stats": self._get_tweet_stats(tweet),
-            "pictures": pictures,
-            "videos": videos,
-            "gifs": gifs,
-        }
+            else None,
+            self._get_tweet_stats(tags["stats"]),
+            pictures,
+            videos,
+            gifs,
+        )
 
     def _check_date_validity(self, date):
         """
@@ -673,28 +925,14 @@ class Nitter:
 
         return to_return
 
-    def _search(
-        self,
-        term,
-        mode,
-        number,
-        since,
-        until,
-        near,
-        language,
-        to,
-        replies,
-        filters,
-        exclude,
-        max_retries,
-        instance,
+    def _build_search_endpoint(
+        self, term, mode, since, until, near, language, to, replies, filters, exclude
     ):
         """
-        Scrape the specified search terms from Nitter
+        Build the Nitter endpoint for a search
 
         :param term: term to seach for
         :param mode: search mode.
-        :param number: number of tweets to scrape.
         :param since: date to start scraping from.
         :param until: date to stop scraping at.
         :param near: location to search near.
@@ -703,11 +941,8 @@ class Nitter:
         :param replies: True if both tweets and replies are needed.
         :param filters: list of filters to apply.
         :param exclude: list of filters to exclude.
-        :param max_retries: max retries to scrape a page.
-        :param instance: Nitter instance to use.
-        :return: dictionary of tweets and threads for the term.
+        :return: endpoint of the first page of results
         """
-        tweets = {"tweets": [], "threads": []}
         if mode == "hashtag":
             endpoint = "/search?f=tweets&q=%23" + term
         elif mode == "term":
@@ -722,15 +957,20 @@ class Nitter:
         else:
             raise ValueError("Invalid mode. Use 'term', 'hashtag', or 'user'.")
 
-        self._initialize_session(instance)
-
         if language:
             endpoint += f"+lang%3A{language}"
 
         if to:
             endpoint += f"+to%3A{to}"
 
-        if since:
+        # Datetimes, used by the hour windows of sharded searches, are searched
+        # to the second with the since_time and until_time operators
+        if isinstance(since, datetime):
+            endpoint += f"+since_time%3A{int(since.timestamp())}"
+        if isinstance(until, datetime):
+            endpoint += f"+until_time%3A{int(until.timestamp())}"
+
+        if since and not isinstance(since, datetime):
             if self._check_date_validity(since):
                 endpoint += f"&since={since}"
             else:
@@ -738,7 +978,7 @@ class Nitter:
                     "Invalid 'since' date. Use the YYYY-MM-DD format and make sure the date is valid."
                 )
 
-        if until:
+        if until and not isinstance(until, datetime):
             if self._check_date_validity(until):
                 endpoint += f"&until={until}"
             else:
@@ -771,90 +1011,790 @@ class Nitter:
             else:
                 endpoint += "?scroll=false"
 
-        soup = self._get_page(endpoint, max_retries)
+        return endpoint
 
-        if soup is None:
-            return tweets
+    def _get_tweet_id(self, tweet):
+        """
+        Read the ID of a tweet from its link, without extracting the tweet
 
-        is_encrypted = self._is_instance_encrypted()
+        :param tweet: tweet to read the ID of
+        :return: numeric ID of the tweet, or None if the tweet has no link
+        """
+        link = tweet.find("a", class_="tweet-link", recursive=False)
+        if link:
+            tweet_id = link.get("href", "").split("/")[-1].split("#")[0]
+            if tweet_id.isdigit():
+                return int(tweet_id)
+        return None
+
+    def _extract_new_tweet(self, tweet, is_encrypted, already_scraped):
+        """
+        Extract a tweet, unless it was already scraped. Tweets with a link are
+        looked up by ID before being extracted, so duplicates cost almost nothing
 
-        already_scraped = set()
+        :param tweet: tweet to extract content from
+        :param is_encrypted: True if instance uses encrypted media
+        :param already_scraped: index of the IDs of the tweets already scraped
+        :return: content of the tweet, or None if it was already scraped
+        """
+        tweet_id = self._get_tweet_id(tweet)
+        if tweet_id is not None and tweet_id in already_scraped:
+            return None
+        start = perf_counter()
+        extracted = self._extract_tweet(tweet, is_encrypted)
+        self.metrics.observe("tweet_parse_seconds", perf_counter() - start)
+        if tweet_id is None:
+            tweet_id = int(extracted.id) if extracted.id.isdigit() else 0
+        return extracted if already_scraped.add(tweet_id) else None
+
+    def _parse_timeline(self, soup, already_scraped, counts, number, result_type="dict"):
+        """
+        Extract the new tweets and threads of a timeline page
+
+        :param soup: page to extract the tweets from
+        :param already_scraped: index of the IDs of the tweets already scraped (SeenIndex or BloomSeenIndex)
+        :param counts: dictionary with the number of tweets and threads scraped so far, updated while extracting
+        :param number: max number of tweets to scrape
+        :param result_type: 'dict' or 'record'. Default is 'dict'
+        :return: generator of tweets and threads (lists of tweets). Its return value is True if the max number of tweets was reached
+        """
+        is_encrypted = self._is_page_encrypted(soup)
+        return (
+            yield from self._select_timeline(
+                self._timeline_entries(soup),
+                lambda tweet: self._extract_new_tweet(tweet, is_encrypted, already_scraped),
+                counts,
+                number,
+                result_type,
+            )
+        )
 
-        number = float("inf") if number == -1 else number
-        keep_scraping = True
-        while keep_scraping:
-            thread = []
-
-            for tweet in soup.find_all("div", class_="timeline-item"):
-                if len(tweet["class"]) == 1:
-                    to_append = self._extract_tweet(tweet, is_encrypted)
-                    # Extract tweets
-                    if len(tweets["tweets"]) + len(tweets["threads"]) < number:
-                        if self._get_tweet_link(tweet) not in already_scraped:
-                            tweets["tweets"].append(to_append)
-                            already_scraped.add(self._get_tweet_link(tweet))
-                    else:
-                        keep_scraping = False
-                        break
-                else:
-                    if "thread" in tweet["class"]:
-                        to_append = self._extract_tweet(tweet, is_encrypted)
-                        # Extract threads
-                        if self._get_tweet_link(tweet) not in already_scraped:
-                            thread.append(to_append)
-                            already_scraped.add(self._get_tweet_link(tweet))
+    def _timeline_entries(self, soup):
+        """
+        Find the tweets of a timeline page
 
-                        if len(tweet["class"]) == 3:
-                            tweets["threads"].append(thread)
-                            thread = []
+        :param soup: page to find the tweets in
+        :return: generator of (kind, tweet) pairs. kind is 'tweet' for a tweet, 'thread' for a tweet of a thread and 'thread-last' for the last tweet of a thread
+        """
+        for tweet in soup.find_all("div", class_="timeline-item"):
+            if len(tweet["class"]) == 1:
+                yield "tweet", tweet
+            elif "thread" in tweet["class"]:
+                yield ("thread-last" if len(tweet["class"]) == 3 else "thread"), tweet
 
-            logging.info(
-                f"Current stats for {term}: {len(tweets['tweets'])} tweets, {len(tweets['threads'])} threads..."
-            )
-            if (
-                not (since and until)
-                and not (since)
-                and len(tweets["tweets"]) + len(tweets["threads"]) >= number
-            ):
-                keep_scraping = False
+    def _select_timeline(self, entries, extract, counts, number, result_type):
+        """
+        Group the tweets of a timeline page in tweets and threads, skipping the tweets already scraped
+
+        :param entries: (kind, tweet) pairs of the page, see _timeline_entries
+        :param extract: function returning the content of a tweet of the entries, or None if it was already scraped
+        :param counts: dictionary with the number of tweets and threads scraped so far, updated while extracting
+        :param number: max number of tweets to scrape
+        :param result_type: 'dict' or 'record'
+        :return: generator of tweets and threads (lists of tweets). Its return value is True if the max number of tweets was reached
+        """
+        thread = []
+
+        for kind, tweet in entries:
+            if kind == "tweet":
+                # Extract tweets
+                if counts["tweets"] + counts["threads"] >= number:
+                    return True
+                to_append = extract(tweet)
+                if to_append is not None:
+                    counts["tweets"] += 1
+                    if result_type == "record":
+                        self._intern_users(to_append)
+                    yield convert(to_append, result_type)
             else:
-                sleep(uniform(1, 2))
-
-                # Go to the next page
-                show_more_buttons = soup.find_all("div", class_="show-more")
-                if soup.find_all("div", class_="show-more"):
-                    if mode == "user":
-                        if since or until:
-                            next_page = (
-                                f"/{term}/search?"
-                                + show_more_buttons[-1].find("a")["href"].split("?")[-1]
-                            )
-                        else:
-                            next_page = (
-                                f"/{term}?"
-                                + show_more_buttons[-1].find("a")["href"].split("?")[-1]
-                            )
-                    else:
-                        next_page = "/search" + show_more_buttons[-1].find("a")["href"]
-                    soup = self._get_page(next_page, max_retries)
-                    if soup is None:
-                        keep_scraping = False
+                # Extract threads
+                to_append = extract(tweet)
+                if to_append is not None:
+                    if result_type == "record":
+                        self._intern_users(to_append)
+                    thread.append(to_append)
+
+                if kind == "thread-last":
+                    counts["threads"] += 1
+                    yield convert(thread, result_type)
+                    thread = []
+        return False
+
+    def _parse_search_page(self, content, term, mode, since, until):
+        """
+        Extract all the tweets of a page of a search, in a worker process of a ParseStage
+
+        :param content: content of the page
+        :param term: term of the search
+        :param mode: search mode
+        :param since: date the search starts from
+        :param until: date the search stops at
+        :return: (kind, (tweet ID, tweet)) entries of the page, endpoint of the next page or None, time spent parsing the page and list of the times spent extracting each tweet
+        """
+        start = perf_counter()
+        soup = self.parser.parse(content)
+        page_seconds = perf_counter() - start
+        is_encrypted = self._is_page_encrypted(soup)
+        entries = []
+        tweet_seconds = []
+        for kind, tweet in self._timeline_entries(soup):
+            tweet_id = self._get_tweet_id(tweet)
+            start = perf_counter()
+            extracted = self._extract_tweet(tweet, is_encrypted)
+            tweet_seconds.append(perf_counter() - start)
+            if tweet_id is None:
+                tweet_id = int(extracted.id) if extracted.id.isdigit() else 0
+            entries.append((kind, (tweet_id, extracted)))
+        return (
+            entries,
+            self._get_next_page(soup, term, mode, since, until),
+            page_seconds,
+            tweet_seconds,
+        )
+
+    def _select_parsed(self, entry, already_scraped):
+        """
+        Get a tweet extracted by a ParseStage, unless it was already scraped
+
+        :param entry: tweet ID and tweet
+        :param already_scraped: index of the IDs of the tweets already scraped
+        :return: tweet, or None if it was already scraped
+        """
+        tweet_id, tweet = entry
+        if not already_scraped.add(tweet_id):
+            return None
+        return tweet
+
+    def _worker_copy(self):
+        """
+        Copy the scraper for the worker processes of a ParseStage, which only parse pages
+
+        :return: copy of the scraper, without sessions, cache and metrics
+        """
+        worker = self._clone()
+        worker.cache = None
+        # The parse times are sent back with the pages, and the callbacks of the
+        # registry may not be picklable
+        worker.metrics = get_metrics(None)
+        return worker
+
+    def _collect_timeline(self, items, tweets, sink=None):
+        """
+        Add the tweets and threads extracted from a timeline page to the results
+
+        :param items: generator returned by _parse_timeline
+        :param tweets: dictionary of tweets and threads to add the new ones to, or of their numbers if a sink is used
+        :param sink: Sink to write the tweets and threads to instead. Default is None
+        :return: True if the max number of tweets was reached
+        """
+        while True:
+            try:
+                item = next(items)
+            except StopIteration as stop:
+                return stop.value
+            key = "threads" if isinstance(item, list) else "tweets"
+            if sink is not None:
+                sink.write(item)
+                tweets[key] += 1
+            else:
+                tweets[key].append(item)
+
+    def _get_next_page(self, soup, term, mode, since, until):
+        """
+        Get the endpoint of the next page of a search
+
+        :param soup: current page
+        :param term: term to seach for
+        :param mode: search mode.
+        :param since: date to start scraping from.
+        :param until: date to stop scraping at.
+        :return: endpoint of the next page, or None if there are no more pages
+        """
+        show_more_buttons = soup.find_all("div", class_="show-more")
+        if not show_more_buttons:
+            return None
+        return self._next_page_endpoint(
+            show_more_buttons[-1].find("a")["href"], term, mode, since, until
+        )
+
+    def _scan_next_page(self, content, term, mode, since, until):
+        """
+        Read the endpoint of the next page of a search from the content of the current
+        page, without parsing it. The result is checked with _get_next_page once the page is parsed
+
+        :param content: content of the current page
+        :param term: term to seach for
+        :param mode: search mode.
+        :param since: date to start scraping from.
+        :param until: date to stop scraping at.
+        :return: endpoint of the next page, or None if no link to it was found
+        """
+        links = show_more_pattern.findall(content)
+        if not links:
+            return None
+        return self._next_page_endpoint(
+            unescape(links[-1].decode("utf-8")), term, mode, since, until
+        )
+
+    def _next_page_endpoint(self, href, term, mode, since, until):
+        """
+        Build the endpoint of the next page of a search from the link of its show-more button
+
+        :param href: link of the button
+        :param term: term to seach for
+        :param mode: search mode.
+        :param since: date to start scraping from.
+        :param until: date to stop scraping at.
+        :return: endpoint of the next page
+        """
+        if mode == "user":
+            if since or until:
+                return f"/{term}/search?" + href.split("?")[-1]
+            return f"/{term}?" + href.split("?")[-1]
+        return "/search" + href
+
+    def _iter_search(
+        self,
+        term,
+        mode,
+        number,
+        since,
+        until,
+        near,
+        language,
+        to,
+        replies,
+        filters,
+        exclude,
+        max_retries,
+        instance,
+        result_type="dict",
+        checkpoint=None,
+        seen=None,
+        parse_stage=None,
+    ):
+        """
+        Scrape the specified search terms from Nitter, page by page
+
+        :param term: term to seach for
+        :param mode: search mode.
+        :param number: number of tweets to scrape.
+        :param since: date to start scraping from.
+        :param until: date to stop scraping at.
+        :param near: location to search near.
+        :param language: language of the tweets.
+        :param to: user to which the tweets are directed.
+        :param replies: True if both tweets and replies are needed.
+        :param filters: list of filters to apply.
+        :param exclude: list of filters to exclude.
+        :param max_retries: max retries to scrape a page.
+        :param instance: Nitter instance to use.
+        :param result_type: 'dict' or 'record'.
+        :param checkpoint: CheckpointStore to save the progress to and resume from. Default is None
+        :param seen: index of the IDs of the tweets to skip, saved to its file when the search stops. Default is None (a new in-memory SeenIndex)
+        :param parse_stage: ParseStage parsing the pages in other processes. Default is None (pages are parsed by this thread)
+        :return: generator of tweets and threads (lists of tweets) for the term. It returns False if a page could not be downloaded, True otherwise
+        """
+        progress = SearchPages(
+            term,
+            self._build_search_endpoint(
+                term, mode, since, until, near, language, to, replies, filters, exclude
+            ),
+            number,
+            since,
+            checkpoint,
+            seen,
+        )
+        already_scraped = progress.already_scraped
+
+        self._initialize_session(instance)
+
+        if not self.prefetch:
+            search_pages = self._iter_search_pages(
+                progress.endpoint, max_retries, term, mode, since, until, parse_stage
+            )
+        else:
+            search_pages = self._prefetch_pages(
+                progress.endpoint, max_retries, term, mode, since, until, parse_stage
+            )
+
+        try:
+            for page, next_page in search_pages:
+                if page is None:
+                    progress.fail(next_page)
+                    return False
+                if parse_stage is not None:
+                    limit_reached = yield from self._select_timeline(
+                        page,
+                        lambda entry: self._select_parsed(entry, already_scraped),
+                        progress.counts,
+                        progress.number,
+                        result_type,
+                    )
                 else:
-                    keep_scraping = False
+                    limit_reached = yield from self._parse_timeline(
+                        page, already_scraped, progress.counts, progress.number, result_type
+                    )
+                if not progress.advance(limit_reached, next_page):
+                    break
+            progress.finish()
+            return True
+        finally:
+            search_pages.close()
+            progress.close()
+
+    def _iter_search_pages(
+        self, endpoint, max_retries, term, mode, since, until, parse_stage=None
+    ):
+        """
+        Download the pages of a search, each one after the previous one
+
+        :param endpoint: endpoint of the first page
+        :param max_retries: max retries to scrape a page
+        :param term: term of the search
+        :param mode: search mode
+        :param since: date the search starts from
+        :param until: date the search stops at
+        :param parse_stage: ParseStage parsing the pages in other processes. Default is None (pages are parsed by this thread)
+        :return: generator of (page, endpoint of the next page or None) pairs. The page is parsed, or its (kind, (tweet ID, tweet)) entries with a ParseStage. If a page cannot be downloaded, (None, its endpoint) is the last pair
+        """
+        # The content of the pages is handed to the ParseStage, if any
+        get_page = self._get_page if parse_stage is None else partial(self._get_page, raw=True)
+        while endpoint:
+            page = get_page(endpoint, max_retries)
+            if page is None:
+                yield None, endpoint
+                return
+            if parse_stage is None:
+                next_page = self._get_next_page(page, term, mode, since, until)
+            else:
+                page, next_page = parse_stage.parse(page, term, mode, since, until)
+            yield page, next_page
+            endpoint = next_page
+
+    def _read_search_page(self, content, term, mode, since, until, parse_stage=None):
+        """
+        Parse the content of a page of a search
+
+        :param content: content of the page
+        :param term: term of the search
+        :param mode: search mode
+        :param since: date the search starts from
+        :param until: date the search stops at
+        :param parse_stage: ParseStage parsing the page in another process. Default is None (the page is parsed by this thread)
+        :return: parsed page, or its (kind, (tweet ID, tweet)) entries with a ParseStage, and endpoint of the next page or None
+        """
+        if parse_stage is not None:
+            return parse_stage.parse(content, term, mode, since, until)
+        soup = self._parse_page(content)
+        return soup, self._get_next_page(soup, term, mode, since, until)
+
+    def _prefetch_pages(
+        self, endpoint, max_retries, term, mode, since, until, parse_stage=None
+    ):
+        """
+        Download the pages of a search in a background thread, up to self.prefetch pages
+        ahead of the page whose tweets are being extracted. The endpoint of the next page
+        is read from the content of a page as soon as it is downloaded, before the page is
+        parsed, and the requests still wait for the rate limit of their instance. If it
+        differs from the endpoint found once the page is parsed, the pages downloaded ahead
+        are dropped and downloaded again. If the search stops early, up to self.prefetch
+        pages are downloaded for nothing.
+
+        :param endpoint: endpoint of the first page
+        :param max_retries: max retries to scrape a page
+        :param term: term of the search
+        :param mode: search mode
+        :param since: date the search starts from
+        :param until: date the search stops at
+        :param parse_stage: ParseStage parsing the pages in other processes. Default is None (pages are parsed by this thread)
+        :return: generator of (page, endpoint of the next page or None) pairs, see _iter_search_pages
+        """
+
+        def start(endpoint):
+            # Pages downloaded ahead, and a slot for each page that can still be downloaded
+            ready = queue.Queue()
+            slots = Semaphore(self.prefetch)
+            stop = Event()
+
+            def fetch(endpoint):
+                try:
+                    while endpoint:
+                        while not slots.acquire(timeout=0.1):
+                            if stop.is_set():
+                                return
+                        if stop.is_set():
+                            return
+                        content = self._get_page(endpoint, max_retries, raw=True)
+                        if content is None:
+                            ready.put((None, endpoint))
+                            return
+                        endpoint = self._scan_next_page(content, term, mode, since, until)
+                        ready.put((content, endpoint))
+                except Exception as e:
+                    ready.put(e)
+
+            thread = Thread(target=fetch, args=(endpoint,), daemon=True)
+            thread.start()
+            return ready, slots, stop, thread
+
+        def halt(fetcher):
+            fetcher[2].set()
+            fetcher[3].join()
+
+        fetcher = start(endpoint)
+        try:
+            while True:
+                item = fetcher[0].get()
+                if isinstance(item, Exception):
+                    raise item
+                content, scanned = item
+                if content is None:
+                    yield None, scanned
+                    return
+                # The page is taken, so one more page can be downloaded ahead
+                fetcher[1].release()
+                page, next_page = self._read_search_page(
+                    content, term, mode, since, until, parse_stage
+                )
+                if next_page != scanned:
+                    logging.info(f"Next page of {term} misread, dropping the pages downloaded ahead")
+                    halt(fetcher)
+                    fetcher = start(next_page)
+                yield page, next_page
+                if not next_page:
+                    return
+        finally:
+            halt(fetcher)
+
+    def _search(
+        self,
+        term,
+        mode,
+        number,
+        since,
+        until,
+        near,
+        language,
+        to,
+        replies,
+        filters,
+        exclude,
+        max_retries,
+        instance,
+        result_type="dict",
+        checkpoint=None,
+        seen=None,
+        sink=None,
+        parse_stage=None,
+    ):
+        """
+        Scrape the specified search terms from Nitter
+
+        :param term: term to seach for
+        :param mode: search mode.
+        :param number: number of tweets to scrape.
+        :param since: date to start scraping from.
+        :param until: date to stop scraping at.
+        :param near: location to search near.
+        :param language: language of the tweets.
+        :param to: user to which the tweets are directed.
+        :param replies: True if both tweets and replies are needed.
+        :param filters: list of filters to apply.
+        :param exclude: list of filters to exclude.
+        :param max_retries: max retries to scrape a page.
+        :param instance: Nitter instance to use.
+        :param result_type: 'dict', 'record', 'arrow' or 'pandas'.
+        :param checkpoint: CheckpointStore to save the progress to and resume from. Default is None
+        :param seen: index of the IDs of the tweets to skip. Default is None
+        :param sink: Sink to write the tweets and threads to instead of returning them. Default is None
+        :param parse_stage: ParseStage parsing the pages in other processes. Default is None
+        :return: dictionary of tweets and threads for the term, or of their numbers if a sink is used. A table of the tweets for 'arrow' and 'pandas'.
+        """
+        table_type = None
+        if result_type in table_types:
+            # The tweets are added to the columns of the table as they are parsed
+            table_type, result_type, sink = result_type, "record", TweetTable()
+        if sink is not None:
+            counts = self._write_results(
+                self._iter_search(
+                    term,
+                    mode,
+                    number,
+                    since,
+                    until,
+                    near,
+                    language,
+                    to,
+                    replies,
+                    filters,
+                    exclude,
+                    max_retries,
+                    instance,
+                    result_type,
+                    checkpoint,
+                    seen,
+                    parse_stage,
+                ),
+                sink,
+            )
+            return sink.finish(table_type) if table_type is not None else counts
+        tweets = {"tweets": [], "threads": []}
+        for item in self._iter_search(
+            term,
+            mode,
+            number,
+            since,
+            until,
+            near,
+            language,
+            to,
+            replies,
+            filters,
+            exclude,
+            max_retries,
+            instance,
+            result_type,
+            checkpoint,
+            seen,
+            parse_stage,
+        ):
+            tweets["threads" if isinstance(item, list) else "tweets"].append(item)
         return tweets
 
-    def _search_dispatch(self, args):
-        return self._search(*args)
+    def _write_results(self, items, sink):
+        """
+        Write tweets and threads to a sink as they are scraped
+
+        :param items: iterable of tweets and threads
+        :param sink: Sink to write to
+        :return: dictionary with the number of tweets and threads written
+        """
+        counts = {"tweets": 0, "threads": 0}
+        for item in items:
+            sink.write(item)
+            counts["threads" if isinstance(item, list) else "tweets"] += 1
+        return counts
+
+    def _close_sink(self, sink, owned):
+        """
+        Write the buffered rows of a sink, closing it if it was opened by the scraper
+
+        :param sink: Sink to close, or None
+        :param owned: True if the sink was created from a path by the scraper
+        """
+        if sink is None:
+            return
+        if owned:
+            sink.close()
+        else:
+            sink.flush()
+
+    def _clone(self):
+        """
+        Copy the scraper for use in another thread. The copy shares the instances,
+        their health and the parser, but has its own sessions and retry state
+
+        :return: copy of the scraper
+        """
+        clone = copy(self)
+        clone._sessions = {}
+        clone.retry_count = 0
+        clone.cooldown_count = 0
+        clone.session_reset = False
+        clone.instance = ""
+        clone.r = None
+        return clone
+
+    def _run_in_threads(self, function, args, workers):
+        """
+        Run a method on a list of arguments with a fixed-size pool of threads,
+        each task on its own copy of the scraper. The arguments are handed out one at
+        a time, so any number of them is supported, and the copies share the rate
+        limiter, the health of the instances and the metrics of the scraper
+
+        :param function: method of Nitter to run
+        :param args: list of arguments, one for each task
+        :param workers: max number of threads. If None, the number of working instances is used
+        :return: list of results, in the same order as the arguments
+        """
+        if workers is None:
+            workers = max(len(self.working_instances), 1)
+        elif workers < 1:
+            raise ValueError("The number of workers must be at least 1")
+
+        def run(task_args):
+            clone = self._clone()
+            try:
+                return function(clone, *task_args)
+            finally:
+                clone.close()
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(args))) as executor:
+            return list(executor.map(run, args))
+
+    def _get_windows(self, since, until, shard):
+        """
+        Split a date range into time windows
+
+        :param since: first day of the range, formatted as YYYY-MM-DD
+        :param until: day after the range, formatted as YYYY-MM-DD. If None, today is used
+        :param shard: size of the windows, 'day' or 'hour'
+        :return: list of (since, until) pairs, from the newest window to the oldest one. Day windows are dates, hour windows are UTC datetimes
+        """
+        if shard not in ("day", "hour"):
+            raise ValueError("Invalid shard. Use 'day' or 'hour'.")
+        if not since:
+            raise ValueError("Sharded searches need a 'since' date")
+        until = until or datetime.now().strftime("%Y-%m-%d")
+        for date in (since, until):
+            if not self._check_date_validity(date):
+                raise ValueError(
+                    f"Invalid date '{date}'. Use the YYYY-MM-DD format and make sure the date is valid."
+                )
+        start = datetime.strptime(since, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        end = datetime.strptime(until, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        if start >= end:
+            raise ValueError("'since' must be before 'until'")
+
+        step = timedelta(days=1) if shard == "day" else timedelta(hours=1)
+        windows = []
+        while start < end:
+            windows.append((start, min(start + step, end)))
+            start += step
+        if shard == "day":
+            windows = [
+                (start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"))
+                for start, end in windows
+            ]
+        return windows[::-1]
+
+    def _merge_windows(self, results, number, seen):
+        """
+        Merge the results of the windows of a sharded search, skipping duplicates
+
+        :param results: results of the windows, from the newest to the oldest
+        :param number: max number of tweets. -1 means no limit
+        :param seen: index of the IDs of the tweets to skip
+        :return: dictionary of tweets and threads
+        """
+        tweets = {"tweets": [], "threads": []}
+        number = float("inf") if number == -1 else number
+
+        def is_new(tweet):
+            tweet_id = tweet["id"]
+            return seen.add(int(tweet_id) if tweet_id.isdigit() else 0)
+
+        for result in results:
+            for tweet in result["tweets"]:
+                if len(tweets["tweets"]) + len(tweets["threads"]) >= number:
+                    return tweets
+                if is_new(tweet):
+                    tweets["tweets"].append(tweet)
+            for thread in result["threads"]:
+                if len(tweets["tweets"]) + len(tweets["threads"]) >= number:
+                    return tweets
+                thread = [tweet for tweet in thread if is_new(tweet)]
+                if thread:
+                    tweets["threads"].append(thread)
+        return tweets
+
+    def _sharded_search(
+        self,
+        terms,
+        mode,
+        number,
+        since,
+        until,
+        near,
+        language,
+        to,
+        replies,
+        filters,
+        exclude,
+        max_retries,
+        instance,
+        result_type,
+        checkpoint,
+        seen,
+        shard,
+        workers,
+        parse_stage=None,
+    ):
+        """
+        Scrape the specified terms from Nitter, splitting the date range in time windows.
+        The windows are scraped concurrently, each one on an instance picked by the
+        scheduler unless an instance is given, and then merged
+
+        :param terms: list of terms to search for
+        :param mode: search mode.
+        :param number: number of tweets to scrape for each term.
+        :param since: first day of the range, formatted as YYYY-MM-DD.
+        :param until: day after the range, formatted as YYYY-MM-DD, or None for today.
+        :param near: location to search near.
+        :param language: language of the tweets.
+        :param to: user to which the tweets are directed.
+        :param replies: True if both tweets and replies are needed.
+        :param filters: list of filters to apply.
+        :param exclude: list of filters to exclude.
+        :param max_retries: max retries to scrape a page.
+        :param instance: Nitter instance to use.
+        :param result_type: 'dict' or 'record'.
+        :param checkpoint: CheckpointStore to save the progress of the windows to, or None
+        :param seen: index of the IDs of the tweets to skip, or None
+        :param shard: size of the windows, 'day' or 'hour'
+        :param workers: max number of windows scraped at the same time
+        :param parse_stage: ParseStage parsing the pages in other processes. Default is None
+        :return: list of dictionaries of the tweets and threads, one for each term
+        """
+        windows = self._get_windows(since, until, shard)
+        args = [
+            (
+                term,
+                mode,
+                number,
+                window_since,
+                window_until,
+                near,
+                language,
+                to,
+                replies,
+                filters,
+                exclude,
+                max_retries,
+                instance,
+                result_type,
+                checkpoint,
+                None,
+                None,
+                parse_stage,
+            )
+            for term in terms
+            for window_since, window_until in windows
+        ]
+        logging.info(f"Scraping {len(args)} windows of one {shard}")
+        results = self._run_in_threads(Nitter._search, args, workers)
+        merged = [
+            self._merge_windows(
+                results[i * len(windows) : (i + 1) * len(windows)],
+                number,
+                seen if seen is not None else SeenIndex(),
+            )
+            for i in range(len(terms))
+        ]
+        if seen is not None and seen.path is not None:
+            seen.save()
+        return merged
 
     def get_random_instance(self):
         """
-        Get a random Nitter instance
+        Get a random Nitter instance. Fast and healthy instances are more likely to be picked
 
         :return: URL of random Nitter instance
         """
-        return random.choice(self.working_instances)
+        return self.scheduler.choose()
 
-    def get_tweet_by_id(self, username, tweet_id, instance=None, max_retries=5):
+    def get_tweet_by_id(self, username, tweet_id, instance=None, max_retries=5, result_type="dict"):
         """
         Fetch a tweet by its ID.
 
@@ -862,14 +1802,16 @@ class Nitter:
         :param tweet_id: The ID of the tweet to fetch.
         :param instance: The specific Nitter instance to use.
         :param max_retries: Max retries to scrape a page. Default is 5.
+        :param result_type: 'dict' for a dictionary, 'record' for a Tweet record. Default is 'dict'.
         :return: Dictionary of the tweet content.
         """
+        check_result_type(result_type)
         if instance:
             self._initialize_session(instance)
         else:
             if not self.working_instances:
                 raise ValueError("No working instances available.")
-            self.instance = self.get_random_instance()
+            self._initialize_session(self.get_random_instance())
 
         endpoint = f"/{username}/status/{tweet_id}"
         soup = self._get_page(endpoint, max_retries)
@@ -877,14 +1819,109 @@ class Nitter:
         if soup is None:
             return None
 
-        is_encrypted = self._is_instance_encrypted()
+        tweet = self._parse_status(soup, result_type)
+        if tweet is None:
+            logging.warning(f"Tweet with ID {tweet_id} not found.")
+        return tweet
+
+    def _parse_status(self, soup, result_type="dict"):
+        """
+        Extract the tweet of a status page
 
+        :param soup: status page
+        :param result_type: 'dict' or 'record'. Default is 'dict'
+        :return: tweet, or None if the page has no tweet
+        """
         tweet = soup.find("div", class_="timeline-item")
         if tweet:
-            return self._extract_tweet(tweet, is_encrypted)
-        else:
-            logging.warning(f"Tweet with ID {tweet_id} not found.")
-            return None
+            return convert(
+                self._extract_tweet(tweet, self._is_page_encrypted(soup)), result_type
+            )
+        return None
+
+    def _fetch_status(self, username, tweet_id, instance, max_retries, result_type):
+        """
+        Fetch a tweet by its ID, reporting the failures instead of logging them
+
+        :param username: username of the tweet
+        :param tweet_id: ID of the tweet
+        :param instance: Nitter instance to use, or None for a random working instance
+        :param max_retries: max retries to scrape the page
+        :param result_type: 'dict' or 'record'
+        :return: tweet and error message. The tweet is None if the fetch failed, the error is None if it succeeded
+        """
+        try:
+            self._initialize_session(instance or self.get_random_instance())
+            soup = self._get_page(f"/{username}/status/{tweet_id}", max_retries)
+            if soup is None:
+                return None, "Page could not be fetched"
+            tweet = self._parse_status(soup, result_type)
+            if tweet is None:
+                return None, "Tweet not found"
+            return tweet, None
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}"
+
+    def get_tweets_by_ids(
+        self, pairs, concurrency=None, instance=None, max_retries=5, result_type="dict"
+    ):
+        """
+        Fetch many tweets by their ID concurrently, yielding them as soon as they are fetched.
+        Every fetch picks its own working instance, unless an instance is given, and a failed
+        fetch is reported with its error without stopping the others.
+
+        :param pairs: iterable of (username, tweet_id) pairs
+        :param concurrency: max number of tweets fetched at the same time. Default is None (two for each working instance)
+        :param instance: Nitter instance to use. Default is None
+        :param max_retries: max retries to scrape a page. Default is 5
+        :param result_type: 'dict' for dictionaries, 'record' for Tweet records. Default is 'dict'
+        :return: generator of (username, tweet_id, tweet, error) tuples, in completion order. tweet is None and error is a message if the fetch failed
+        """
+        check_result_type(result_type)
+        if not instance and not self.working_instances:
+            raise ValueError("No working instances available.")
+        if concurrency is None:
+            concurrency = 2 * max(len(self.working_instances), 1)
+        elif concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+        return self._iter_statuses(pairs, concurrency, instance, max_retries, result_type)
+
+    def _iter_statuses(self, pairs, concurrency, instance, max_retries, result_type):
+        threads = local()
+        clones = []
+
+        def fetch(username, tweet_id):
+            # Every thread reuses its own copy of the scraper, and so its sessions
+            clone = getattr(threads, "scraper", None)
+            if clone is None:
+                clone = threads.scraper = self._clone()
+                clones.append(clone)
+            return clone._fetch_status(username, tweet_id, instance, max_retries, result_type)
+
+        pairs = iter(pairs)
+        pending = {}
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        try:
+            while True:
+                # Keep a bounded number of fetches in flight, so pairs can be a stream
+                for username, tweet_id in pairs:
+                    pending[executor.submit(fetch, username, tweet_id)] = (username, tweet_id)
+                    if len(pending) >= 2 * concurrency:
+                        break
+                if not pending:
+                    return
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    username, tweet_id = pending.pop(future)
+                    tweet, error = future.result()
+                    yield username, tweet_id, tweet, error
+        finally:
+            # Fetches not started yet are dropped when the consumer stops early
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+            for clone in clones:
+                clone.close()
 
     def get_tweets(
         self,
@@ -901,6 +1938,13 @@ class Nitter:
         exclude=None,
         max_retries=5,
         instance=None,
+        workers=None,
+        result_type="dict",
+        resume=None,
+        seen=None,
+        shard=None,
+        sink=None,
+        parse_workers=None,
     ):
         """
         Scrape the specified term from Nitter
@@ -918,8 +1962,112 @@ class Nitter:
         :param exclude: list of filters to exclude. Default is None
         :param max_retries: max retries to scrape a page. Default is 5
         :param instance: Nitter instance to use. Default is None
-        :return: dictionary or array with dictionaries (in case of multiple terms) of the tweets and threads for the provided terms
+        :param workers: max number of threads used to scrape multiple terms. Default is None (number of working instances)
+        :param result_type: 'dict' for tweets as dictionaries, 'record' for compact Tweet records (see ntscraper.records), 'arrow' for a pyarrow Table or 'pandas' for a pandas DataFrame of the tweets of each term (see ntscraper.tables). Default is 'dict'
+        :param resume: directory or CheckpointStore where the progress of each term is saved. A scrape interrupted by an error or by the end of the script continues from its last checkpoint, without the tweets scraped before it. Default is None (no checkpoints)
+        :param seen: file, SeenIndex or BloomSeenIndex (see ntscraper.seen) of the IDs of the tweets already scraped. The tweets in it are skipped, and the new ones are added to it. Default is None (tweets are only deduplicated within a scrape)
+        :param shard: 'day' or 'hour' to split the range from since to until (or today) in time windows, scraped concurrently by up to 'workers' threads and merged from the newest to the oldest. 'number' is applied to each window and to the merged result. Default is None (a single search)
+        :param sink: path of a .jsonl, .csv or .parquet file, or Sink (see ntscraper.sinks), where the tweets and threads are written as soon as they are parsed instead of being returned. Default is None
+        :param parse_workers: number of processes parsing the pages (see ntscraper.pipeline). The pages are then downloaded by threads, which hand them to the processes through a bounded queue, so that the pages of a term are parsed while the pages of the other terms and windows are downloaded. Default is None (each page is parsed by the thread that downloads it)
+        :return: dictionary or array with dictionaries (in case of multiple terms) of the tweets and threads for the provided terms. With a sink, the dictionaries hold the number of tweets and threads written. With 'arrow' or 'pandas', a table or array of tables
         """
+        check_result_type(result_type, tables=True)
+        if sink is not None and result_type in table_types:
+            raise ValueError("A sink cannot be used with a table result type")
+        checkpoint = get_checkpoint_store(resume)
+        seen = get_seen_index(seen, checkpoint)
+        owned = sink is not None and not isinstance(sink, Sink)
+        sink = get_sink(sink)
+        parse_stage = ParseStage(self, parse_workers) if parse_workers is not None else None
+        try:
+            return self._get_tweets(
+                terms,
+                mode,
+                number,
+                since,
+                until,
+                near,
+                language,
+                to,
+                replies,
+                filters,
+                exclude,
+                max_retries,
+                instance,
+                workers,
+                result_type,
+                checkpoint,
+                seen,
+                shard,
+                sink,
+                parse_stage,
+            )
+        finally:
+            self._close_sink(sink, owned)
+            if parse_stage is not None:
+                parse_stage.close()
+
+    def _get_tweets(
+        self,
+        terms,
+        mode,
+        number,
+        since,
+        until,
+        near,
+        language,
+        to,
+        replies,
+        filters,
+        exclude,
+        max_retries,
+        instance,
+        workers,
+        result_type,
+        checkpoint,
+        seen,
+        shard,
+        sink,
+        parse_stage,
+    ):
+        """
+        Scrape the specified terms from Nitter, see get_tweets
+
+        :return: dictionary or array with dictionaries (in case of multiple terms) of the tweets and threads, or of their numbers if a sink is used, or tables of the tweets
+        """
+        if shard is not None:
+            tweets = self._sharded_search(
+                [terms.strip()] if type(terms) == str else [term.strip() for term in terms],
+                mode,
+                number,
+                since,
+                until,
+                near,
+                language,
+                to,
+                replies,
+                filters,
+                exclude,
+                max_retries,
+                instance,
+                "record" if result_type in table_types else result_type,
+                checkpoint,
+                seen,
+                shard,
+                workers,
+                parse_stage,
+            )
+            if result_type in table_types:
+                tweets = [tweet_table(result, result_type) for result in tweets]
+            elif sink is not None:
+                # The windows are merged in memory to skip duplicates, then written
+                tweets = [
+                    self._write_results(
+                        [*result["tweets"], *result["threads"]], sink
+                    )
+                    for result in tweets
+                ]
+            return tweets[0] if len(tweets) == 1 else tweets
         if type(terms) == str:
             term = terms.strip()
 
@@ -937,6 +2085,11 @@ class Nitter:
                 exclude,
                 max_retries,
                 instance,
+                result_type,
+                checkpoint,
+                seen,
+                sink,
+                parse_stage,
             )
         elif len(terms) == 1:
             term = terms[0].strip()
@@ -955,13 +2108,13 @@ class Nitter:
                 exclude,
                 max_retries,
                 instance,
+                result_type,
+                checkpoint,
+                seen,
+                sink,
+                parse_stage,
             )
         else:
-            if len(terms) > cpu_count():
-                raise ValueError(
-                    f"Too many terms. You can search at most {cpu_count()} terms."
-                )
-
             args = [
                 (
                     term.strip(),
@@ -977,13 +2130,80 @@ class Nitter:
                     exclude,
                     max_retries,
                     instance,
+                    result_type,
+                    checkpoint,
+                    seen,
+                    sink,
+                    parse_stage,
                 )
                 for term in terms
             ]
-            with Pool(len(terms)) as p:
-                results = list(p.map(self._search_dispatch, args))
+            # The terms are scraped by threads, which share the rate limit and the health
+            # of the instances, the metrics and the sink
+            return self._run_in_threads(Nitter._search, args, workers)
+
+    def iter_tweets(
+        self,
+        term,
+        mode="term",
+        number=-1,
+        since=None,
+        until=None,
+        near=None,
+        language=None,
+        to=None,
+        replies=False,
+        filters=None,
+        exclude=None,
+        max_retries=5,
+        instance=None,
+        result_type="dict",
+        resume=None,
+        seen=None,
+    ):
+        """
+        Scrape the specified term from Nitter, yielding the tweets as soon as their page is parsed.
+        The scrape can be stopped at any time by breaking out of the loop.
 
-            return results
+        :param term: string to search for
+        :param mode: search mode. Default is 'term', can also be 'hashtag' or 'user'
+        :param number: number of tweets to scrape. Default is -1 (to not set a limit).
+        :param since: date to start scraping from, formatted as YYYY-MM-DD. Default is None
+        :param until: date to stop scraping at, formatted as YYYY-MM-DD. Default is None
+        :param near: near location of the tweets. Default is None (anywhere)
+        :param language: language of the tweets. Default is None (any language)
+        :param to: user to which the tweets are directed. Default is None (any user)
+        :param replies: True if both tweets and replies are needed. If 'filters' or 'exclude' are set, this option will be overridden. Default is False
+        :param filters: list of filters to apply. Default is None
+        :param exclude: list of filters to exclude. Default is None
+        :param max_retries: max retries to scrape a page. Default is 5
+        :param instance: Nitter instance to use. Default is None
+        :param result_type: 'dict' for tweets as dictionaries, 'record' for compact Tweet records. Default is 'dict'
+        :param resume: directory or CheckpointStore where the progress is saved. An interrupted scrape continues from its last checkpoint. Default is None (no checkpoints)
+        :param seen: file, SeenIndex or BloomSeenIndex of the IDs of the tweets already scraped, which are skipped. Default is None
+        :return: generator of tweets and threads (lists of tweets)
+        """
+        check_result_type(result_type)
+        checkpoint = get_checkpoint_store(resume)
+        seen = get_seen_index(seen, checkpoint)
+        return self._iter_search(
+            term.strip(),
+            mode,
+            number,
+            since,
+            until,
+            near,
+            language,
+            to,
+            replies,
+            filters,
+            exclude,
+            max_retries,
+            instance,
+            result_type,
+            checkpoint,
+            seen,
+        )
 
     def _profile_info(self, username, max_retries, instance):
         """
@@ -992,7 +2212,7 @@ class Nitter:
         :param username: username of the page to scrape
         :param max_retries: max retries to scrape a page. Default is 5
         :param instance: Nitter instance to use. Default is None
-        :return: dictionary of the profile's information
+        :return: profile information
         """
         self._initialize_session(instance)
         username = sub(r"[^A-Za-z0-9_+-:]", "", username)
@@ -1000,7 +2220,16 @@ class Nitter:
         if soup is None:
             return None
 
-        is_encrypted = self._is_instance_encrypted()
+        return self._parse_profile(soup, self._is_page_encrypted(soup))
+
+    def _parse_profile(self, soup, is_encrypted):
+        """
+        Extract the profile information from a profile page
+
+        :param soup: profile page
+        :param is_encrypted: True if instance uses encrypted media
+        :return: profile information
+        """
         # Extract id if the banner exists, no matter if the instance uses base64 or not
         if soup.find("div", class_="profile-banner").find("img") and is_encrypted:
             profile_id = (
@@ -1049,64 +2278,355 @@ class Nitter:
             else None
         )
 
-        return {
-            "image": profile_image,
-            "name": soup.find("a", class_="profile-card-fullname").text.strip(),
-            "username": soup.find("a", class_="profile-card-username").text.strip(),
-            "id": profile_id,
-            "bio": soup.find("div", class_="profile-bio").p.text.strip()
+        return Profile(
+            image=profile_image,
+            name=soup.find("a", class_="profile-card-fullname").text.strip(),
+            username=soup.find("a", class_="profile-card-username").text.strip(),
+            id=profile_id,
+            bio=soup.find("div", class_="profile-bio").p.text.strip()
             if soup.find("div", class_="profile-bio")
             else "",
-            "location": soup.find("div", class_="profile-location")
+            location=soup.find("div", class_="profile-location")
             .find_all("span")[-1]
             .text.strip()
             if soup.find("div", class_="profile-location")
             else "",
-            "website": soup.find("div", class_="profile-website").find("a")["href"]
+            website=soup.find("div", class_="profile-website").find("a")["href"]
             if soup.find("div", class_="profile-website")
             else "",
-            "joined": soup.find("div", class_="profile-joindate").find("span")["title"],
-            "stats": {
-                "tweets": int(
+            joined=soup.find("div", class_="profile-joindate").find("span")["title"],
+            stats=ProfileStats(
+                tweets=int(
                     soup.find("ul", class_="profile-statlist")
                     .find("li", class_="posts")
                     .find_all("span")[1]
                     .text.strip()
                     .replace(",", "")
                 ),
-                "following": int(
+                following=int(
                     soup.find("ul", class_="profile-statlist")
                     .find("li", class_="following")
                     .find_all("span")[1]
                     .text.strip()
                     .replace(",", "")
                 ),
-                "followers": int(
+                followers=int(
                     soup.find("ul", class_="profile-statlist")
                     .find("li", class_="followers")
                     .find_all("span")[1]
                     .text.strip()
                     .replace(",", "")
                 ),
-                "likes": int(
+                likes=int(
                     soup.find("ul", class_="profile-statlist")
                     .find("li", class_="likes")
                     .find_all("span")[1]
                     .text.strip()
                     .replace(",", "")
                 ),
-                "media": int(
+                media=int(
                     icon_container.text.strip().replace(",", "").split(" ")[0]
                     if icon_container
                     else 0
                 ),
-            },
-        }
+            ),
+        )
+
+    def _parse_follow_list(self, soup):
+        """
+        Extract the usernames and the next cursor from a following/followers page
+
+        :param soup: page to extract the usernames from
+        :return: list of usernames and cursor of the next page, or None if there are no more pages
+        """
+        users = [user.text.strip() for user in soup.find_all("a", class_="username")]
+        load_more = soup.find("div", class_="show-more")
+        if load_more and load_more.find("a"):
+            return users, load_more.find("a")["href"].split("cursor=")[-1]
+        return users, None
+
+    def _iter_follow_list(
+        self, endpoint, max_retries, checkpoint=None, max_pages=None, max_users=None
+    ):
+        """
+        Scrape a following/followers list, page by page
+
+        :param endpoint: endpoint of the list
+        :param max_retries: max retries to scrape a page
+        :param checkpoint: CheckpointStore to save the progress to and resume from. Default is None
+        :param max_pages: max number of pages to scrape. Default is None (no limit)
+        :param max_users: max number of usernames to scrape. Default is None (no limit)
+        :return: generator of usernames
+        """
+        progress = FollowPages(endpoint, checkpoint, max_pages, max_users)
+        url = progress.url()
+        while url:
+            soup = self._get_page(url, max_retries)
+            yield from progress.read(self._parse_follow_list(soup) if soup else None)
+            progress.advance()
+            url = progress.url()
+
+    def _get_follow_list(
+        self, endpoint, max_retries, checkpoint=None, max_pages=None, max_users=None
+    ):
+        """
+        Scrape a following/followers list
+
+        :param endpoint: endpoint of the list
+        :param max_retries: max retries to scrape a page
+        :param checkpoint: CheckpointStore to save the progress to and resume from. Default is None
+        :param max_pages: max number of pages to scrape. Default is None (no limit)
+        :param max_users: max number of usernames to scrape. Default is None (no limit)
+        :return: list of usernames
+        """
+        return list(
+            self._iter_follow_list(endpoint, max_retries, checkpoint, max_pages, max_users)
+        )
 
-    def _search_profile_dispatch(self, args):
-        return self.get_profile_info(*args)
+    def _check_follow_limits(self, max_pages, max_users):
+        """
+        Check the limits of the follow lists
 
-    def get_profile_info(self, username, max_retries=5, instance=None, mode='simple'):
+        :param max_pages: max number of pages of a list, or None
+        :param max_users: max number of usernames of a list, or None
+        """
+        if max_pages is not None and max_pages < 1:
+            raise ValueError("The max number of pages must be at least 1")
+        if max_users is not None and max_users < 1:
+            raise ValueError("The max number of users must be at least 1")
+
+    def iter_follow_list(
+        self,
+        username,
+        list_type="followers",
+        max_retries=5,
+        instance=None,
+        resume=None,
+        max_pages=None,
+        max_users=None,
+    ):
+        """
+        Scrape the followers or the following list of a user, yielding the usernames as soon as their page is parsed
+
+        :param username: username of the user
+        :param list_type: 'followers' or 'following'. Default is 'followers'
+        :param max_retries: max retries to scrape a page. Default is 5
+        :param instance: Nitter instance to use. Default is None
+        :param resume: directory or CheckpointStore where the progress is saved. An interrupted scrape, or one stopped by a limit, continues from its last checkpoint. Default is None (no checkpoints)
+        :param max_pages: max number of pages to scrape. Default is None (no limit)
+        :param max_users: max number of usernames to scrape. Default is None (no limit)
+        :return: generator of usernames
+        """
+        if list_type not in ("followers", "following"):
+            raise ValueError("Invalid list type. Use 'followers' or 'following'.")
+        self._check_follow_limits(max_pages, max_users)
+        checkpoint = get_checkpoint_store(resume)
+        username = sub(r"[^A-Za-z0-9_+-:]", "", username.strip())
+        self._initialize_session(instance)
+        return self._iter_follow_list(
+            f"/{username}/{list_type}", max_retries, checkpoint, max_pages, max_users
+        )
+
+    def iter_follow_graph(
+        self,
+        usernames,
+        list_types=("following", "followers"),
+        max_retries=5,
+        instance=None,
+        workers=None,
+        resume=None,
+        max_pages=None,
+        max_users=None,
+    ):
+        """
+        Scrape the follow lists of many users concurrently, yielding the usernames as soon as their page is parsed.
+        An error scraping a list is raised, and stops the other lists
+
+        :param usernames: list of usernames
+        :param list_types: lists to scrape for each user, 'following' and/or 'followers'. Default is both
+        :param max_retries: max retries to scrape a page. Default is 5
+        :param instance: Nitter instance to use. Default is None (a random working instance for each list)
+        :param workers: max number of lists scraped at the same time. Default is None (two for each working instance)
+        :param resume: directory or CheckpointStore where the progress of each list is saved. Default is None (no checkpoints)
+        :param max_pages: max number of pages to scrape for each list. Default is None (no limit)
+        :param max_users: max number of usernames to scrape for each list. Default is None (no limit)
+        :return: generator of (username, list type, username in the list) tuples, in the order they are scraped
+        """
+        if isinstance(list_types, str):
+            list_types = [list_types]
+        if not list_types or any(
+            list_type not in ("followers", "following") for list_type in list_types
+        ):
+            raise ValueError("Invalid list type. Use 'followers' or 'following'.")
+        self._check_follow_limits(max_pages, max_users)
+        if workers is None:
+            workers = 2 * max(len(self.working_instances), 1)
+        elif workers < 1:
+            raise ValueError("The number of workers must be at least 1")
+        checkpoint = get_checkpoint_store(resume)
+        lists = [
+            (sub(r"[^A-Za-z0-9_+-:]", "", username.strip()), list_type)
+            for username in ([usernames] if isinstance(usernames, str) else usernames)
+            for list_type in list_types
+        ]
+        return self._iter_follow_lists(
+            lists, max_retries, instance, workers, checkpoint, max_pages, max_users
+        )
+
+    def _iter_follow_lists(
+        self, lists, max_retries, instance, workers, checkpoint, max_pages, max_users
+    ):
+        """
+        Scrape follow lists with a pool of threads, each list on its own copy of the scraper.
+        An error scraping a list is raised to the consumer, and stops the other lists
+
+        :param lists: list of (username, list type) pairs
+        :param max_retries: max retries to scrape a page
+        :param instance: Nitter instance to use, or None
+        :param workers: max number of lists scraped at the same time
+        :param checkpoint: CheckpointStore of the lists, or None
+        :param max_pages: max number of pages of each list, or None
+        :param max_users: max number of usernames of each list, or None
+        :return: generator of (username, list type, username in the list) tuples
+        """
+        # Pages of usernames waiting to be consumed. The queue is bounded, so a slow
+        # consumer pauses the threads instead of piling up whole lists in memory
+        pages = queue.Queue(maxsize=4 * workers)
+        stop = Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def crawl(username, list_type):
+            clone = self._clone()
+            try:
+                clone._initialize_session(instance)
+                page = []
+                for user in clone._iter_follow_list(
+                    f"/{username}/{list_type}", max_retries, checkpoint, max_pages, max_users
+                ):
+                    page.append(user)
+                    if len(page) == 20:
+                        if not put((username, list_type, page)):
+                            return
+                        page = []
+                if page:
+                    put((username, list_type, page))
+            except Exception as e:
+                # Raised by the consumer, which stops the other lists
+                put((username, list_type, e))
+            finally:
+                clone.close()
+                put(None)
+
+        executor = ThreadPoolExecutor(max_workers=min(workers, max(len(lists), 1)))
+        futures = [
+            executor.submit(crawl, username, list_type) for username, list_type in lists
+        ]
+        try:
+            finished = 0
+            while finished < len(lists):
+                item = pages.get()
+                if item is None:
+                    finished += 1
+                    continue
+                username, list_type, page = item
+                if isinstance(page, Exception):
+                    logging.warning(f"Error scraping the {list_type} of {username}: {page}")
+                    raise page
+                for user in page:
+                    yield username, list_type, user
+        finally:
+            # Lists not started yet are dropped when the consumer stops early
+            stop.set()
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def _get_follow_lists(
+        self, username, max_retries, instance, checkpoint, max_pages, max_users
+    ):
+        """
+        Scrape the following and followers lists of a user at the same time
+
+        :param username: username of the user
+        :param max_retries: max retries to scrape a page
+        :param instance: Nitter instance to use, or None
+        :param checkpoint: CheckpointStore of the lists, or None
+        :param max_pages: max number of pages of each list, or None
+        :param max_users: max number of usernames of each list, or None
+        :return: dictionary with the 'following' and 'followers' lists
+        """
+        follow_lists = {"following": [], "followers": []}
+        for _, list_type, user in self._iter_follow_lists(
+            [(username, "following"), (username, "followers")],
+            max_retries,
+            instance,
+            2,
+            checkpoint,
+            max_pages,
+            max_users,
+        ):
+            follow_lists[list_type].append(user)
+        return follow_lists
+
+    def _user_profile_info(
+        self,
+        username,
+        max_retries,
+        instance,
+        mode,
+        result_type,
+        checkpoint,
+        max_pages,
+        max_users,
+        sink=None,
+    ):
+        """
+        Get the profile information of a user, see get_profile_info
+
+        :param username: username of the page to scrape
+        :param max_retries: max retries to scrape a page
+        :param instance: Nitter instance to use, or None
+        :param mode: 'simple' or 'detail'
+        :param result_type: 'dict' or 'record'
+        :param checkpoint: CheckpointStore of the follow lists, or None
+        :param max_pages: max number of pages of each follow list, or None
+        :param max_users: max number of usernames of each follow list, or None
+        :param sink: Sink the profile is written to as soon as it is scraped. Default is None
+        :return: profile information, or None if the profile could not be scraped
+        """
+        profile_info = self._profile_info(username, max_retries, instance)
+        if profile_info and mode == 'detail':
+            follow_lists = self._get_follow_lists(
+                username, max_retries, instance, checkpoint, max_pages, max_users
+            )
+            profile_info.following_list = follow_lists["following"]
+            profile_info.followers_list = follow_lists["followers"]
+        profile_info = convert(profile_info, result_type)
+        if sink is not None and profile_info is not None:
+            sink.write(profile_info)
+        return profile_info
+
+    def get_profile_info(
+        self,
+        username,
+        max_retries=5,
+        instance=None,
+        mode="simple",
+        workers=None,
+        result_type="dict",
+        resume=None,
+        max_pages=None,
+        max_users=None,
+        sink=None,
+    ):
         """
         Get profile information for a user or a list of users
 
@@ -1114,6 +2634,12 @@ class Nitter:
         :param max_retries: max retries to scrape a page. Default is 5
         :param instance: Nitter instance to use. Default is None
         :param mode: Mode of fetching profile info. 'simple' for basic info, 'detail' for detailed info including following and followers lists. Default is 'simple'
+        :param workers: max number of threads used to scrape multiple users. Default is None (number of working instances)
+        :param result_type: 'dict' for dictionaries, 'record' for compact Profile records (see ntscraper.records). Default is 'dict'
+        :param resume: directory or CheckpointStore where the progress of the follow lists is saved in 'detail' mode. An interrupted list, or one stopped by a limit, continues from its last checkpoint, without the users scraped before it. Default is None (no checkpoints)
+        :param max_pages: max number of pages scraped for each follow list in 'detail' mode. Default is None (no limit)
+        :param max_users: max number of usernames scraped for each follow list in 'detail' mode. Default is None (no limit)
+        :param sink: path of a .jsonl, .csv or .parquet file, or Sink (see ntscraper.sinks), where each profile is also written as soon as it is scraped. Default is None
         :return: dictionary of the profile's information or list of dictionaries if username is a list. The dictionary contains the following keys:
             - image: URL of the profile image
             - name: Full name of the user
@@ -1132,45 +2658,30 @@ class Nitter:
             - following_list: List of usernames the profile is following (only in 'detail' mode)
             - followers_list: List of usernames following the profile (only in 'detail' mode)
         """
-
-        def _get_follow_list(endpoint):
-            follow_list = []
-            cursor = None
-            while True:
-                url = f"{endpoint}?cursor={cursor}" if cursor else endpoint
-                soup = self._get_page(url, max_retries)
-                if not soup:
-                    break
-                users = [user.text.strip() for user in soup.find_all("a", class_="username")]
-                if not users:
-                    break
-                follow_list.extend(users)
-                load_more = soup.find("div", class_="show-more")
-                if load_more and load_more.find("a"):
-                    cursor = load_more.find("a")["href"].split("cursor=")[-1]
-                else:
-                    break
-            return follow_list
-
+        check_result_type(result_type)
+        self._check_follow_limits(max_pages, max_users)
+        checkpoint = get_checkpoint_store(resume)
+        owned = sink is not None and not isinstance(sink, Sink)
+        sink = get_sink(sink)
         if isinstance(username, str):
-            username = username.strip()
-            profile_info = self._profile_info(username, max_retries, instance)
-            if profile_info and mode == 'detail':
-                profile_info["following_list"] = _get_follow_list(f"/{username}/following")
-                profile_info["followers_list"] = _get_follow_list(f"/{username}/followers")
-            return profile_info
-        elif len(username) == 1:
-            username = username[0].strip()
-            profile_info = self._profile_info(username, max_retries, instance)
-            if profile_info and mode == 'detail':
-                profile_info["following_list"] = _get_follow_list(f"/{username}/following")
-                profile_info["followers_list"] = _get_follow_list(f"/{username}/followers")
-            return profile_info
-        else:
-            if len(username) > cpu_count():
-                raise ValueError(f"Too many usernames. You can use at most {cpu_count()} usernames.")
-
-            args = [(user.strip(), max_retries, instance, mode) for user in username]
-            with Pool(len(username)) as p:
-                results = list(p.map(self._search_profile_dispatch, args))
-            return results
+            username = [username]
+        args = [
+            (
+                user.strip(),
+                max_retries,
+                instance,
+                mode,
+                result_type,
+                checkpoint,
+                max_pages,
+                max_users,
+                sink,
+            )
+            for user in username
+        ]
+        try:
+            if len(args) == 1:
+                return self._user_profile_info(*args[0])
+            return self._run_in_threads(Nitter._user_profile_info, args, workers)
+        finally:
+            self._close_sink(sink, owned)
@@ -0,0 +1,219 @@
+import logging
+from .seen import SeenIndex
+
+
+class SearchPages:
+    def __init__(self, term, endpoint, number, since, checkpoint=None, seen=None):
+        """
+        Progress of a search through its pages, shared by the scrapers, which only fetch and
+        parse the pages. It resumes the search from its checkpoint, if any, decides when the
+        search stops and saves its checkpoints.
+
+        :param term: term of the search
+        :param endpoint: endpoint of the first page
+        :param number: number of tweets to scrape, -1 for no limit
+        :param since: date the search starts from
+        :param checkpoint: CheckpointStore to save the progress to and resume from. Default is None
+        :param seen: index of the IDs of the tweets to skip, saved to its file when the search stops. Default is None (a new in-memory SeenIndex)
+        """
+        self.term = term
+        self.number = float("inf") if number == -1 else number
+        self.since = since
+        self.checkpoint = checkpoint
+        self.key = "search:" + endpoint
+        self.already_scraped = seen if seen is not None else SeenIndex()
+        # The IDs seen by a search with an in-memory index are appended to the journal of its
+        # checkpoint, instead of being saved in every checkpoint
+        self._journal = checkpoint is not None and self.already_scraped.path is None
+        # Number of pages read by this run, as opposed to the ones read before resuming
+        self.read = 0
+        state = checkpoint.load(self.key) if checkpoint else None
+        if state:
+            logging.info(f"Resuming {term} after page {state['pages']}")
+            self.endpoint = state["endpoint"]
+            if "journal" in state:
+                seen_ids = checkpoint.load_seen(self.key, state["journal"])
+            else:
+                seen_ids = state["seen"] or ()
+            for tweet_id in seen_ids:
+                self.already_scraped.add(tweet_id)
+            self.counts = state["counts"]
+            self.pages = state["pages"]
+        else:
+            if self._journal:
+                # Drop the journal of a run stopped before its first checkpoint
+                checkpoint.clear(self.key)
+            self.endpoint = endpoint
+            self.counts = {"tweets": 0, "threads": 0}
+            self.pages = 0
+        if self._journal:
+            # The next checkpoint only appends the IDs added from now on
+            self.already_scraped.snapshot()
+
+    def _save(self):
+        state = {
+            "endpoint": self.endpoint,
+            "counts": self.counts,
+            "seen": self.already_scraped.snapshot(),
+            "pages": self.pages,
+        }
+        if self._journal:
+            state["journal"] = self.checkpoint.append_seen(self.key, state["seen"])
+            state["seen"] = None
+        self.checkpoint.save(self.key, state)
+
+    def advance(self, limit_reached, next_page):
+        """
+        Record a page whose tweets were collected, and move to the next one
+
+        :param limit_reached: True if the max number of tweets was reached in the page
+        :param next_page: endpoint of the next page, or None if there are no more pages
+        :return: True if the next page must be scraped, False if the search is over
+        """
+        self.pages += 1
+        self.read += 1
+        logging.info(
+            f"Current stats for {self.term}: {self.counts['tweets']} tweets, {self.counts['threads']} threads..."
+        )
+        if limit_reached or (
+            not self.since and self.counts["tweets"] + self.counts["threads"] >= self.number
+        ):
+            return False
+        if not next_page:
+            return False
+        self.endpoint = next_page
+        if self.checkpoint and self.pages % self.checkpoint.every == 0:
+            self._save()
+        return True
+
+    def fail(self, endpoint):
+        """
+        Record a page that could not be downloaded. It is saved in the checkpoint, so that it
+        is the first one tried when resuming
+
+        :param endpoint: endpoint of the page
+        """
+        self.endpoint = endpoint
+        # If no page was read, the checkpoint (if any) already starts from this page
+        if self.checkpoint and self.read:
+            self._save()
+
+    def finish(self):
+        """
+        Drop the checkpoint of a search that is over
+        """
+        if self.checkpoint:
+            self.checkpoint.clear(self.key)
+
+    def close(self):
+        """
+        Save the IDs seen so far to the file of the index, if any, even if the scrape
+        was stopped by the caller
+        """
+        if self.already_scraped.path is not None:
+            self.already_scraped.save()
+
+
+class FollowPages:
+    def __init__(self, endpoint, checkpoint=None, max_pages=None, max_users=None):
+        """
+        Progress of a following/followers list through its pages, shared by the scrapers,
+        which only fetch the pages. It resumes the list from its checkpoint, if any, applies
+        the limits and saves the checkpoints.
+
+        :param endpoint: endpoint of the list
+        :param checkpoint: CheckpointStore to save the progress to and resume from. Default is None
+        :param max_pages: max number of pages to scrape. Default is None (no limit)
+        :param max_users: max number of usernames to scrape. Default is None (no limit)
+        """
+        self.endpoint = endpoint
+        self.checkpoint = checkpoint
+        self.max_pages = max_pages
+        self.max_users = max_users
+        self.key = "follow:" + endpoint
+        state = checkpoint.load(self.key) if checkpoint else None
+        if state:
+            logging.info(f"Resuming {endpoint} after page {state['pages']}")
+        self.cursor = state["cursor"] if state else None
+        self.pages = state["pages"] if state else 0
+        # Number of users of the first page scraped before resuming
+        self.offset = state.get("offset", 0) if state else 0
+        self.scraped_pages = self.scraped_users = 0
+        self.done = False
+        self._next_cursor = None
+        # Number of users taken from the last page read, if it reached max_users
+        self._taken = None
+
+    def _save(self, offset=0):
+        state = {"cursor": self.cursor, "pages": self.pages}
+        if offset:
+            state["offset"] = offset
+        self.checkpoint.save(self.key, state)
+
+    def url(self):
+        """
+        :return: URL of the next page to scrape, or None if the list is over
+        """
+        if self.done:
+            return None
+        return f"{self.endpoint}?cursor={self.cursor}" if self.cursor else self.endpoint
+
+    def read(self, page):
+        """
+        Read the usernames of the page returned by url(). The progress is only saved by
+        advance(), once the usernames are scraped
+
+        :param page: usernames and cursor of the next page (see Nitter._parse_follow_list), or None if the page could not be downloaded
+        :return: list of the new usernames of the page
+        """
+        if page is None:
+            # Save the page that failed, so that it is the first one tried when resuming
+            self.done = True
+            if self.checkpoint and self.cursor:
+                self._save(self.offset)
+            return []
+        users, self._next_cursor = page
+        if not users:
+            self._finish()
+            return []
+        users = users[self.offset:]
+        if self.max_users is not None and self.scraped_users + len(users) > self.max_users:
+            users = users[: self.max_users - self.scraped_users]
+            self._taken = len(users)
+        else:
+            self._taken = None
+        self.scraped_users += len(users)
+        return users
+
+    def advance(self):
+        """
+        Record the page read by read(), whose usernames were scraped, and move to the next one
+        """
+        if self.done:
+            return
+        if self._taken is not None:
+            # The page is scraped again when resuming, skipping the users scraped so far
+            self.done = True
+            if self.checkpoint:
+                self._save(self.offset + self._taken)
+            return
+        self.offset = 0
+        self.cursor = self._next_cursor
+        self.pages += 1
+        self.scraped_pages += 1
+        if not self.cursor:
+            self._finish()
+        elif (self.max_pages is not None and self.scraped_pages >= self.max_pages) or (
+            self.max_users is not None and self.scraped_users >= self.max_users
+        ):
+            logging.info(f"Stopping {self.endpoint} at the limit, after page {self.pages}")
+            self.done = True
+            if self.checkpoint:
+                self._save()
+        elif self.checkpoint and self.pages % self.checkpoint.every == 0:
+            self._save()
+
+    def _finish(self):
+        self.done = True
+        if self.checkpoint:
+            self.checkpoint.clear(self.key)
@@ -0,0 +1,227 @@
+# bs4 and lxml are imported by the backends when they are created, so that importing
+# the scraper stays fast
+# Classes of the containers that hold everything the scraper extracts
+containers = [
+    "timeline-container",
+    "timeline",
+    "conversation",
+    "profile-banner",
+    "profile-card",
+    "photo-rail-card",
+    "error-panel",
+    "timeline-header",
+]
+
+
+class BeautifulSoupParser:
+    name = "bs4"
+
+    def __init__(self, partial=False):
+        """
+        Reference parser backend, based on BeautifulSoup
+
+        :param partial: True if only the containers with timelines, profiles and errors should be parsed
+        """
+        from bs4 import BeautifulSoup, SoupStrainer
+
+        self.partial = partial
+        self._soup = BeautifulSoup
+        self._strainer = SoupStrainer("div", class_=containers) if partial else None
+
+    def parse(self, content, encoding="utf-8"):
+        """
+        Parse a page
+
+        :param content: page content, as bytes
+        :param encoding: encoding of the page. Default is utf-8
+        :return: BeautifulSoup of the page
+        """
+        return self._soup(
+            content, "lxml", from_encoding=encoding, parse_only=self._strainer
+        )
+
+
+class LxmlTag:
+    __slots__ = ("_element", "_document")
+
+    def __init__(self, element, document):
+        """
+        Tag of a page parsed with lxml, exposing the subset of the BeautifulSoup API used by the scraper
+
+        :param element: lxml element
+        :param document: LxmlDocument the element belongs to
+        """
+        self._element = element
+        self._document = document
+
+    @property
+    def name(self):
+        return self._element.tag
+
+    @property
+    def text(self):
+        return "".join(self._element.itertext())
+
+    @property
+    def attrs(self):
+        attrs = dict(self._element.attrib)
+        if "class" in attrs:
+            attrs["class"] = attrs["class"].split()
+        return attrs
+
+    @property
+    def contents(self):
+        return [
+            self._document.wrap(child)
+            for child in self._element
+            if isinstance(child.tag, str)
+        ]
+
+    def __getitem__(self, key):
+        value = self._element.attrib[key]
+        return value.split() if key == "class" else value
+
+    def __getattr__(self, name):
+        # tag.p, tag.source... return the first descendant with that name, as in BeautifulSoup
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.find(name)
+
+    def __bool__(self):
+        return True
+
+    def __repr__(self):
+        from lxml import etree
+
+        return etree.tostring(self._element, encoding="unicode", with_tail=False)
+
+    def get(self, key, default=None):
+        value = self._element.get(key)
+        if value is None:
+            return default
+        return value.split() if key == "class" else value
+
+    def has_attr(self, key):
+        return key in self._element.attrib
+
+    def _iter(self, name, class_, recursive):
+        if name is True or name is None:
+            name = None
+        elif isinstance(name, str):
+            name = (name,)
+        if recursive:
+            elements = self._element.iterdescendants(*name) if name else self._element.iterdescendants()
+        else:
+            elements = self._element.iterchildren(*name) if name else self._element.iterchildren()
+        for element in elements:
+            if not isinstance(element.tag, str):
+                continue
+            if class_ is not None:
+                classes = element.get("class")
+                if classes is None:
+                    continue
+                classes = classes.split()
+                if class_ not in classes and " ".join(classes) != class_:
+                    continue
+            yield element
+
+    def find(self, name=None, class_=None, recursive=True):
+        for element in self._iter(name, class_, recursive):
+            return self._document.wrap(element)
+        return None
+
+    def find_all(self, name=None, class_=None, recursive=True):
+        return [
+            self._document.wrap(element)
+            for element in self._iter(name, class_, recursive)
+        ]
+
+    def replace_with(self, text):
+        element = self._element
+        parent = element.getparent()
+        previous = element.getprevious()
+        text += element.tail or ""
+        if previous is not None:
+            previous.tail = (previous.tail or "") + text
+        else:
+            parent.text = (parent.text or "") + text
+        parent.remove(element)
+
+
+class LxmlDocument(LxmlTag):
+    __slots__ = ("_cache",)
+
+    def __init__(self, root):
+        """
+        Page parsed with lxml
+
+        :param root: root lxml element
+        """
+        self._cache = {}
+        super().__init__(root, self)
+
+    def wrap(self, element):
+        """
+        Wrap an lxml element, returning always the same tag for the same element
+
+        :param element: lxml element
+        :return: LxmlTag of the element
+        """
+        tag = self._cache.get(element)
+        if tag is None:
+            tag = self._cache[element] = LxmlTag(element, self)
+        return tag
+
+    def find(self, name=None, class_=None, recursive=True):
+        if recursive and self._element.tag == name and class_ is None:
+            return self
+        return super().find(name, class_, recursive)
+
+
+class LxmlParser:
+    name = "lxml"
+
+    def __init__(self, partial=False):
+        """
+        Fast parser backend, based directly on lxml. The whole page is parsed in C,
+        and Python objects are only created for the tags the scraper looks at
+
+        :param partial: ignored, since the parts of the page the scraper does not look at cost nothing
+        """
+        self.partial = partial
+
+    def parse(self, content, encoding="utf-8"):
+        """
+        Parse a page
+
+        :param content: page content, as bytes
+        :param encoding: encoding of the page. Default is utf-8
+        :return: LxmlDocument of the page
+        """
+        from lxml import etree
+
+        root = etree.fromstring(content, etree.HTMLParser(encoding=encoding))
+        if root is None:
+            root = etree.fromstring(b"<html></html>", etree.HTMLParser())
+        return LxmlDocument(root)
+
+
+parsers = {
+    BeautifulSoupParser.name: BeautifulSoupParser,
+    LxmlParser.name: LxmlParser,
+}
+
+
+def get_parser(name, partial=False):
+    """
+    Get a parser backend
+
+    :param name: name of the backend, 'bs4' or 'lxml'
+    :param partial: True if only the containers with timelines, profiles and errors should be parsed
+    :return: parser backend
+    """
+    if name not in parsers:
+        raise ValueError(
+            f"Invalid parser '{name}'. Valid parsers are: {', '.join(parsers)}"
+        )
+    return parsers[name](partial)
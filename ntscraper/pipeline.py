@@ -0,0 +1,83 @@
+import os
+from threading import BoundedSemaphore
+
+# Scraper used by a worker process of a ParseStage, set when the process starts
+_scraper = None
+
+
+def _init_worker(scraper):
+    global _scraper
+    _scraper = scraper
+
+
+def _parse_in_worker(args):
+    return _scraper._parse_search_page(*args)
+
+
+class ParseStage:
+    def __init__(self, scraper, workers=None, queue_size=None):
+        """
+        Pool of processes parsing the pages downloaded by the threads of a scraper. A
+        fetcher hands the content of a page to the pool and waits for its tweets and the
+        endpoint of the next page, so the pages of a search are parsed while the pages of
+        the other searches are downloaded, on all the cores instead of a single one.
+        At most 'queue_size' pages are queued or being parsed: when the queue is full,
+        the fetchers wait before handing over their page.
+
+        :param scraper: Nitter scraper whose parser is used
+        :param workers: number of processes. Default is None (number of cores)
+        :param queue_size: max number of pages queued or being parsed. Default is None (twice the number of processes)
+        """
+        # multiprocessing is only imported here, since it is slow to import
+        from concurrent.futures import ProcessPoolExecutor
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        elif workers < 1:
+            raise ValueError("The number of parse workers must be at least 1")
+        if queue_size is None:
+            queue_size = 2 * workers
+        elif queue_size < 1:
+            raise ValueError("The queue size must be at least 1")
+        self.workers = workers
+        self.queue_size = queue_size
+        self.metrics = scraper.metrics
+        self._slots = BoundedSemaphore(queue_size)
+        self._executor = ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(scraper._worker_copy(),)
+        )
+        # Start the processes now, before the fetchers, so that they are not forked
+        # while other threads are running
+        self._executor.submit(int).result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def parse(self, content, term, mode, since, until):
+        """
+        Parse a page of a search in a worker process, waiting for a free slot in the queue
+
+        :param content: content of the page
+        :param term: term of the search
+        :param mode: search mode
+        :param since: date the search starts from
+        :param until: date the search stops at
+        :return: list of the (kind, (tweet ID, tweet)) entries of the timeline, see Nitter._timeline_entries, and endpoint of the next page or None
+        """
+        with self._slots:
+            entries, next_page, page_seconds, tweet_seconds = self._executor.submit(
+                _parse_in_worker, (content, term, mode, since, until)
+            ).result()
+        self.metrics.observe("page_parse_seconds", page_seconds)
+        for seconds in tweet_seconds:
+            self.metrics.observe("tweet_parse_seconds", seconds)
+        return entries, next_page
+
+    def close(self):
+        """
+        Stop the worker processes
+        """
+        self._executor.shutdown()
@@ -0,0 +1,168 @@
+from datetime import datetime, timezone
+from threading import Lock
+from time import monotonic
+
+
+class TokenBucket:
+    def __init__(self, rate, burst, now):
+        """
+        Token bucket of a Nitter instance
+
+        :param rate: requests per second
+        :param burst: max number of requests sent without waiting
+        :param now: monotonic time the bucket is full at
+        """
+        self.rate = rate
+        self.tokens = float(burst)
+        self.updated = now
+
+    def to_dict(self):
+        return {
+            "rate": self.rate,
+            "tokens": self.tokens,
+        }
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        rate=0.5,
+        min_rate=0.05,
+        max_rate=5.0,
+        burst=1,
+        increase=0.1,
+        decrease=0.5,
+    ):
+        """
+        Adaptive per-instance rate limiter.
+
+        Every instance has a token bucket that refills at 'rate' requests per second and
+        holds up to 'burst' tokens. The rate grows by 'increase' after every healthy
+        response, up to 'max_rate', and is multiplied by 'decrease' after a rate limited
+        (429) or failed (5xx or unreachable) request, down to 'min_rate'. A 'Retry-After'
+        header stops the requests to the instance for the time it asks for.
+
+        :param rate: initial requests per second to each instance. Default is 0.5
+        :param min_rate: min requests per second to each instance. Default is 0.05
+        :param max_rate: max requests per second to each instance. Default is 5.0
+        :param burst: max number of requests sent to an instance without waiting. Default is 1
+        :param increase: requests per second added to the rate after a healthy response. Default is 0.1
+        :param decrease: factor applied to the rate after a rate limited or failed request. Default is 0.5
+        """
+        if not 0 < min_rate <= rate <= max_rate:
+            raise ValueError("The rates must satisfy 0 < min_rate <= rate <= max_rate")
+        if burst < 1:
+            raise ValueError("The burst must be at least 1")
+        if not 0 < decrease < 1:
+            raise ValueError("The decrease must be between 0 and 1 (excluded)")
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self._buckets = {}
+        self._lock = Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def _get_bucket(self, instance, now=None):
+        bucket = self._buckets.get(instance)
+        if bucket is None:
+            bucket = self._buckets[instance] = TokenBucket(
+                self.rate, self.burst, monotonic() if now is None else now
+            )
+        return bucket
+
+    def _refill(self, bucket, now):
+        bucket.tokens = min(
+            self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate
+        )
+        bucket.updated = now
+
+    def reserve(self, instance, now=None):
+        """
+        Reserve a request to an instance. The request must wait for the returned time
+        before being sent, so that concurrent callers are spaced out
+
+        :param instance: instance of the request
+        :param now: current monotonic time. Default is None (now)
+        :return: seconds to wait before sending the request
+        """
+        with self._lock:
+            now = monotonic() if now is None else now
+            bucket = self._get_bucket(instance, now)
+            self._refill(bucket, now)
+            bucket.tokens -= 1
+            return -bucket.tokens / bucket.rate if bucket.tokens < 0 else 0.0
+
+    def record_success(self, instance):
+        """
+        Record a healthy response, speeding up the requests to the instance
+
+        :param instance: instance of the request
+        """
+        with self._lock:
+            bucket = self._get_bucket(instance)
+            bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+
+    def record_backoff(self, instance, retry_after=None, now=None):
+        """
+        Record a rate limited or failed request, slowing down the requests to the instance
+
+        :param instance: instance of the request
+        :param retry_after: seconds to wait asked by the instance. Default is None
+        :param now: current monotonic time. Default is None (now)
+        """
+        with self._lock:
+            now = monotonic() if now is None else now
+            bucket = self._get_bucket(instance, now)
+            self._refill(bucket, now)
+            bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+            # Drop the saved up tokens, so the next request waits for the new rate
+            bucket.tokens = min(bucket.tokens, 0.0)
+            if retry_after:
+                # Go into debt, so the next request waits for 'retry_after' seconds
+                # and the following ones are spaced out from then on
+                bucket.tokens = min(bucket.tokens, 1 - retry_after * bucket.rate)
+
+    def stats(self):
+        """
+        Get the state of the buckets of the instances
+
+        :return: dictionary with the bucket of each instance
+        """
+        with self._lock:
+            return {
+                instance: bucket.to_dict() for instance, bucket in self._buckets.items()
+            }
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header
+
+    :param value: value of the header, in seconds or as an HTTP date, or None
+    :return: seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    from email.utils import parsedate_to_datetime
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0.0)
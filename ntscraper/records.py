@@ -0,0 +1,287 @@
+from abc import ABC, abstractmethod
+from .tables import table_types
+
+result_types = ["dict", "record"]
+
+
+class Record(ABC):
+    __slots__ = ()
+    # Dictionary keys of the record, mapped to the attributes holding them
+    _keys = {}
+
+    def __getitem__(self, key):
+        return getattr(self, self._keys[key])
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    @abstractmethod
+    def to_dict(self):
+        """
+        Convert the record to the dictionary returned by the scraper with result_type='dict'
+
+        :return: dictionary of the record
+        """
+
+
+class User(Record):
+    # Users are referenced weakly by the table of the scraper sharing them
+    __slots__ = ("name", "username", "profile_id", "avatar", "__weakref__")
+    _keys = {key: key for key in __slots__[:4]}
+
+    def __init__(self, name, username, profile_id, avatar):
+        """
+        Author of a tweet. Authors are shared by all the tweets of a scrape, see Nitter._intern_user
+        """
+        self.name = name
+        self.username = username
+        self.profile_id = profile_id
+        self.avatar = avatar
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "username": self.username,
+            "profile_id": self.profile_id,
+            "avatar": self.avatar,
+        }
+
+
+class Stats(Record):
+    __slots__ = ("comments", "retweets", "quotes", "likes")
+    _keys = {key: key for key in __slots__}
+
+    def __init__(self, comments, retweets, quotes, likes):
+        """
+        Stats of a tweet
+        """
+        self.comments = comments
+        self.retweets = retweets
+        self.quotes = quotes
+        self.likes = likes
+
+    def to_dict(self):
+        return {
+            "comments": self.comments,
+            "retweets": self.retweets,
+            "quotes": self.quotes,
+            "likes": self.likes,
+        }
+
+
+class QuotedTweet(Record):
+    __slots__ = ("link", "text", "user", "date", "pictures", "videos", "gifs")
+    _keys = {key: key for key in __slots__}
+
+    def __init__(self, link, text, user, date, pictures, videos, gifs):
+        """
+        Tweet quoted by another tweet. The user of a deleted tweet is None
+        """
+        self.link = link
+        self.text = text
+        self.user = user
+        self.date = date
+        self.pictures = pictures
+        self.videos = videos
+        self.gifs = gifs
+
+    def to_dict(self):
+        return {
+            "link": self.link,
+            "text": self.text,
+            "user": self.user.to_dict() if self.user else {},
+            "date": self.date,
+            "pictures": list(self.pictures),
+            "videos": list(self.videos),
+            "gifs": list(self.gifs),
+        }
+
+
+class Tweet(Record):
+    __slots__ = (
+        "id",
+        "link",
+        "text",
+        "user",
+        "date",
+        "is_retweet",
+        "is_pinned",
+        "external_link",
+        "replying_to",
+        "quoted_post",
+        "stats",
+        "pictures",
+        "videos",
+        "gifs",
+    )
+    _keys = {key.replace("_", "-"): key for key in __slots__}
+
+    def __init__(
+        self,
+        id,
+        link,
+        text,
+        user,
+        date,
+        is_retweet,
+        is_pinned,
+        external_link,
+        replying_to,
+        quoted_post,
+        stats,
+        pictures,
+        videos,
+        gifs,
+    ):
+        """
+        Scraped tweet. The lists of the dictionary are tuples, and quoted_post is None if no tweet is quoted
+        """
+        self.id = id
+        self.link = link
+        self.text = text
+        self.user = user
+        self.date = date
+        self.is_retweet = is_retweet
+        self.is_pinned = is_pinned
+        self.external_link = external_link
+        self.replying_to = replying_to
+        self.quoted_post = quoted_post
+        self.stats = stats
+        self.pictures = pictures
+        self.videos = videos
+        self.gifs = gifs
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "link": self.link,
+            "text": self.text,
+            "user": self.user.to_dict(),
+            "date": self.date,
+            "is-retweet": self.is_retweet,
+            "is-pinned": self.is_pinned,
+            "external-link": self.external_link,
+            "replying-to": list(self.replying_to),
+            "quoted-post": self.quoted_post.to_dict() if self.quoted_post else {},
+            "stats": self.stats.to_dict(),
+            "pictures": list(self.pictures),
+            "videos": list(self.videos),
+            "gifs": list(self.gifs),
+        }
+
+
+class ProfileStats(Record):
+    __slots__ = ("tweets", "following", "followers", "likes", "media")
+    _keys = {key: key for key in __slots__}
+
+    def __init__(self, tweets, following, followers, likes, media):
+        """
+        Stats of a profile
+        """
+        self.tweets = tweets
+        self.following = following
+        self.followers = followers
+        self.likes = likes
+        self.media = media
+
+    def to_dict(self):
+        return {
+            "tweets": self.tweets,
+            "following": self.following,
+            "followers": self.followers,
+            "likes": self.likes,
+            "media": self.media,
+        }
+
+
+class Profile(Record):
+    __slots__ = (
+        "image",
+        "name",
+        "username",
+        "id",
+        "bio",
+        "location",
+        "website",
+        "joined",
+        "stats",
+        "following_list",
+        "followers_list",
+    )
+    _keys = {key: key for key in __slots__}
+
+    def __init__(
+        self,
+        image,
+        name,
+        username,
+        id,
+        bio,
+        location,
+        website,
+        joined,
+        stats,
+        following_list=None,
+        followers_list=None,
+    ):
+        """
+        Scraped profile. The follow lists are None unless they were scraped ('detail' mode)
+        """
+        self.image = image
+        self.name = name
+        self.username = username
+        self.id = id
+        self.bio = bio
+        self.location = location
+        self.website = website
+        self.joined = joined
+        self.stats = stats
+        self.following_list = following_list
+        self.followers_list = followers_list
+
+    def to_dict(self):
+        profile = {
+            "image": self.image,
+            "name": self.name,
+            "username": self.username,
+            "id": self.id,
+            "bio": self.bio,
+            "location": self.location,
+            "website": self.website,
+            "joined": self.joined,
+            "stats": self.stats.to_dict(),
+        }
+        if self.following_list is not None:
+            profile["following_list"] = self.following_list
+        if self.followers_list is not None:
+            profile["followers_list"] = self.followers_list
+        return profile
+
+
+def check_result_type(result_type, tables=False):
+    """
+    Check that a result type is supported
+
+    :param result_type: result type to check
+    :param tables: True if the table result types ('arrow' and 'pandas', see ntscraper.tables) are supported too. Default is False
+    """
+    valid = result_types + (table_types if tables else [])
+    if result_type not in valid:
+        raise ValueError(
+            f"Invalid result type '{result_type}'. Valid result types are: {', '.join(valid)}"
+        )
+
+
+def convert(record, result_type):
+    """
+    Convert a record, or a list of records, to the requested result type
+
+    :param record: record, list of records or None
+    :param result_type: 'dict' or 'record'
+    :return: converted record
+    """
+    if result_type == "record" or record is None:
+        return record
+    if isinstance(record, list):
+        return [item.to_dict() for item in record]
+    return record.to_dict()
@@ -0,0 +1,236 @@
+import random
+from threading import Lock
+from time import monotonic
+
+
+class InstanceHealth:
+    def __init__(self, latency=None):
+        """
+        Health of a Nitter instance
+
+        :param latency: initial response time of the instance, in seconds. Default is None (unknown)
+        """
+        self.latency = latency
+        self.error_rate = 0.0
+        self.cooldown_rate = 0.0
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.open_until = 0.0
+        self.probe_started = 0.0
+
+    def to_dict(self):
+        return {
+            "latency": self.latency,
+            "error_rate": self.error_rate,
+            "cooldown_rate": self.cooldown_rate,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "open_until": self.open_until,
+        }
+
+
+class InstanceScheduler:
+    def __init__(
+        self,
+        instances=None,
+        response_times=None,
+        alpha=0.3,
+        failure_threshold=3,
+        recovery_time=30,
+        max_recovery_time=600,
+    ):
+        """
+        Health and latency weighted scheduler of Nitter instances.
+
+        Every instance keeps an exponentially weighted moving average (EWMA) of its
+        response time, error rate and cooldown rate, and is picked with a probability
+        proportional to how fast and reliable it is. After 'failure_threshold'
+        consecutive failures the circuit breaker of the instance trips and the instance
+        is not used for 'recovery_time' seconds (doubled at every new trip, up to
+        'max_recovery_time'). Then a single trial request is let through: if it succeeds
+        the instance is back in service, with a weight that grows as its error rate decays.
+
+        :param instances: list of instances to schedule. Default is None
+        :param response_times: dictionary of known response times of the instances, in seconds. Default is None
+        :param alpha: weight of the newest sample in the moving averages. Default is 0.3
+        :param failure_threshold: consecutive failures that trip the circuit breaker. Default is 3
+        :param recovery_time: seconds an instance is out of service after the first trip. Default is 30
+        :param max_recovery_time: max seconds an instance is out of service. Default is 600
+        """
+        if not 0 < alpha <= 1:
+            raise ValueError("Alpha must be between 0 (excluded) and 1")
+        if failure_threshold < 1:
+            raise ValueError("The failure threshold must be at least 1")
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.max_recovery_time = max_recovery_time
+        self.instances = []
+        self._health = {}
+        self._lock = Lock()
+        self.set_instances(instances or [], response_times)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def _get_health(self, instance):
+        health = self._health.get(instance)
+        if health is None:
+            health = self._health[instance] = InstanceHealth()
+        return health
+
+    def _average(self, current, sample):
+        if current is None:
+            return sample
+        return (1 - self.alpha) * current + self.alpha * sample
+
+    def set_instances(self, instances, response_times=None):
+        """
+        Set the instances to schedule, keeping the health of the ones already known
+
+        :param instances: list of instances
+        :param response_times: dictionary of response times of the instances, in seconds. Default is None
+        """
+        with self._lock:
+            self.instances = list(instances)
+            for instance in self.instances:
+                health = self._get_health(instance)
+                if response_times and instance in response_times:
+                    health.latency = self._average(
+                        health.latency, response_times[instance]
+                    )
+
+    def is_available(self, instance, now=None):
+        """
+        Check if the circuit breaker of an instance lets requests through
+
+        :param instance: instance to check
+        :param now: current monotonic time. Default is None (now)
+        :return: True if the instance can be used, False otherwise
+        """
+        health = self._health.get(instance)
+        if health is None:
+            return True
+        now = monotonic() if now is None else now
+        return health.open_until <= now
+
+    def _can_choose(self, instance, now):
+        # A half-open instance only gets one trial request at a time
+        health = self._health[instance]
+        return self.is_available(instance, now) and (
+            not health.probe_started
+            or now - health.probe_started > self.recovery_time
+        )
+
+    def _weight(self, health, default_latency):
+        latency = health.latency if health.latency is not None else default_latency
+        return 1 / (
+            max(latency, 0.001)
+            * (1 + 10 * health.error_rate)
+            * (1 + 5 * health.cooldown_rate)
+        )
+
+    def choose(self, exclude=None):
+        """
+        Pick an instance, with a probability proportional to its health and speed
+
+        :param exclude: instance to avoid if others are available. Default is None
+        :return: URL of the instance
+        """
+        with self._lock:
+            if not self.instances:
+                raise ValueError("No working instances available.")
+            now = monotonic()
+            candidates = [
+                instance
+                for instance in self.instances
+                if instance != exclude and self._can_choose(instance, now)
+            ]
+            if not candidates:
+                candidates = [
+                    instance for instance in self.instances if instance != exclude
+                ] or self.instances
+                # Every breaker is open: use the instance that recovers first
+                instance = min(
+                    candidates, key=lambda instance: self._get_health(instance).open_until
+                )
+            else:
+                known = sorted(
+                    self._health[instance].latency
+                    for instance in candidates
+                    if self._health[instance].latency is not None
+                )
+                default_latency = known[len(known) // 2] if known else 1.0
+                instance = random.choices(
+                    candidates,
+                    weights=[
+                        self._weight(self._health[instance], default_latency)
+                        for instance in candidates
+                    ],
+                )[0]
+            health = self._get_health(instance)
+            if health.trips and health.open_until <= now:
+                health.probe_started = now
+            return instance
+
+    def record_success(self, instance, latency):
+        """
+        Record a successful request
+
+        :param instance: instance of the request
+        :param latency: response time, in seconds
+        """
+        with self._lock:
+            health = self._get_health(instance)
+            health.latency = self._average(health.latency, latency)
+            health.error_rate = self._average(health.error_rate, 0.0)
+            health.cooldown_rate = self._average(health.cooldown_rate, 0.0)
+            health.consecutive_failures = 0
+            health.trips = 0
+            health.probe_started = 0.0
+
+    def record_failure(self, instance):
+        """
+        Record a failed request, tripping the circuit breaker if needed
+
+        :param instance: instance of the request
+        """
+        with self._lock:
+            health = self._get_health(instance)
+            health.error_rate = self._average(health.error_rate, 1.0)
+            health.consecutive_failures += 1
+            if health.probe_started or health.consecutive_failures >= self.failure_threshold:
+                health.open_until = monotonic() + min(
+                    self.recovery_time * 2 ** health.trips, self.max_recovery_time
+                )
+                health.trips += 1
+                health.consecutive_failures = 0
+            health.probe_started = 0.0
+
+    def record_cooldown(self, instance):
+        """
+        Record a request refused because of rate limiting
+
+        :param instance: instance of the request
+        """
+        with self._lock:
+            health = self._get_health(instance)
+            health.cooldown_rate = self._average(health.cooldown_rate, 1.0)
+
+    def stats(self):
+        """
+        Get the health of the scheduled instances
+
+        :return: dictionary with the health of each instance
+        """
+        with self._lock:
+            return {
+                instance: self._get_health(instance).to_dict()
+                for instance in self.instances
+            }
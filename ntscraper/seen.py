@@ -0,0 +1,362 @@
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from heapq import merge
+from contextlib import contextmanager
+from math import ceil, log
+from threading import RLock
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, where saves from different processes are not locked
+    fcntl = None
+
+MASK = (1 << 64) - 1
+
+
+def _contains(ids, id):
+    index = bisect_left(ids, id)
+    return index < len(ids) and ids[index] == id
+
+
+def _unique(ids):
+    previous = None
+    for id in ids:
+        if id != previous:
+            yield id
+            previous = id
+
+
+@contextmanager
+def _locked(path):
+    """
+    Hold an exclusive lock on a file, shared by all the processes using it
+
+    :param path: path of the lock file
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class SeenIndex:
+    magic = b"NTSEEN01"
+
+    def __init__(self, path=None, ids=None, buffer_size=1024, snapshot_size=16384):
+        """
+        Compact index of the numeric IDs of the tweets already scraped, used to skip duplicates.
+        IDs are kept in sorted arrays of 8-byte integers, instead of a set of link strings.
+        With a path, the IDs saved by previous runs are memory-mapped from the file, so they
+        are not loaded in memory, and save() adds the new ones to the file. The index can be
+        shared by the threads of a scrape.
+
+        :param path: file to load the IDs from and save them to. Default is None (in memory only)
+        :param ids: iterable of IDs to add. Default is None
+        :param buffer_size: number of IDs buffered in a set before being sorted into an array. Default is 1024
+        :param snapshot_size: max number of unsaved IDs put in a checkpoint by snapshot(). Beyond it, the index is saved to its file instead. Default is 16384
+        """
+        self.path = path
+        self.buffer_size = buffer_size
+        self.snapshot_size = snapshot_size
+        self._file = None
+        self._map = None
+        self._base = array("Q")
+        # Sorted arrays of the IDs added since the last save, at most one per size class
+        self._runs = []
+        self._pending = set()
+        # IDs added since the last snapshot of an in-memory index, once snapshot() was called
+        self._added = None
+        self._lock = RLock()
+        if path is not None:
+            self._open()
+        for id in ids or ():
+            self.add(id)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_file"] = state["_map"] = state["_lock"] = None
+        state["_base"] = array("Q") if self.path is not None else self._base
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = RLock()
+        if self.path is not None:
+            self._open()
+
+    def _open(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) <= len(self.magic):
+            return
+        self._file = open(self.path, "rb")
+        if self._file.read(len(self.magic)) != self.magic:
+            self._file.close()
+            self._file = None
+            raise ValueError(f"{self.path} is not an index of seen IDs")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._base = memoryview(self._map)[len(self.magic):].cast("Q")
+
+    def close(self):
+        """
+        Release the memory-mapped file. Unsaved IDs are kept in memory
+        """
+        with self._lock:
+            if self._map is not None:
+                self._base.release()
+                self._base = array("Q")
+                self._map.close()
+                self._file.close()
+                self._map = self._file = None
+
+    def _flush(self):
+        with self._lock:
+            run = array("Q", sorted(self._pending))
+            self._pending = set()
+            # Merge runs of the same size class, as in a binary counter, so that
+            # there are only a logarithmic number of them
+            while self._runs and len(self._runs[-1]) <= len(run):
+                run = array("Q", merge(self._runs.pop(), run))
+            self._runs.append(run)
+
+    def __contains__(self, id):
+        with self._lock:
+            return (
+                id in self._pending
+                or any(_contains(run, id) for run in self._runs)
+                or _contains(self._base, id)
+            )
+
+    def __len__(self):
+        with self._lock:
+            return len(self._base) + sum(len(run) for run in self._runs) + len(self._pending)
+
+    def __iter__(self):
+        with self._lock:
+            if self._pending:
+                self._flush()
+            return _unique(merge(self._base, *self._runs))
+
+    def add(self, id):
+        """
+        Add an ID to the index
+
+        :param id: numeric ID of the tweet
+        :return: True if the ID is new, False if it was already in the index
+        """
+        with self._lock:
+            if id in self:
+                return False
+            self._pending.add(id)
+            if self._added is not None:
+                self._added.append(id)
+            if len(self._pending) >= self.buffer_size:
+                self._flush()
+            return True
+
+    def save(self):
+        """
+        Save the IDs to the file of the index. The IDs saved in the meantime by other
+        scrapers using the same file are kept
+        """
+        # tempfile is only imported here, since it is slow to import
+        import tempfile
+
+        with self._lock:
+            if self.path is None:
+                raise ValueError("The index has no path to save to")
+            if self._pending:
+                self._flush()
+            # Each save writes its own temporary file, and the lock keeps other processes from
+            # replacing the file between the read of its IDs and the replace
+            with _locked(self.path + ".lock"):
+                on_disk = SeenIndex(self.path)
+                fd, temp = tempfile.mkstemp(
+                    dir=os.path.dirname(os.path.abspath(self.path)),
+                    prefix=os.path.basename(self.path) + ".",
+                    suffix=".tmp",
+                )
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(self.magic)
+                        ids = array("Q")
+                        for id in _unique(merge(on_disk._base, self._base, *self._runs)):
+                            ids.append(id)
+                            if len(ids) == 65536:
+                                ids.tofile(f)
+                                ids = array("Q")
+                        ids.tofile(f)
+                    on_disk.close()
+                    self.close()
+                    os.replace(temp, self.path)
+                finally:
+                    on_disk.close()
+                    if os.path.exists(temp):
+                        os.remove(temp)
+                self._runs = []
+                self._open()
+
+    def snapshot(self):
+        """
+        Get the state of the index to save in a checkpoint, so that checkpoints don't hold all
+        the IDs seen so far. With a path, the IDs added since the last save are returned, and
+        the index is saved to its file when they are many. In memory, the first snapshot returns
+        all the IDs, and the next ones the IDs added since the previous snapshot
+
+        :return: list of IDs, or None if the index was saved to its file
+        """
+        with self._lock:
+            if self.path is None:
+                ids = list(self) if self._added is None else self._added
+                self._added = []
+                return ids
+            if len(self._pending) + sum(len(run) for run in self._runs) > self.snapshot_size:
+                self.save()
+                return None
+            if self._pending:
+                self._flush()
+            return [id for run in self._runs for id in run]
+
+
+class BloomSeenIndex:
+    magic = b"NTBLOOM1"
+    header = struct.Struct("<QQ")
+
+    def __init__(self, path=None, capacity=10000000, error_rate=0.001):
+        """
+        Bloom filter of the numeric IDs of the tweets already scraped. It takes a fixed amount
+        of memory, about 1.8 bytes per ID for a 0.1% error rate, but a new tweet is wrongly
+        reported as seen with probability 'error_rate'. With a path, the filter is a memory-mapped
+        file shared by all the scrapers using it.
+
+        :param path: file of the filter. If it exists, its size is used instead of capacity and error_rate. Default is None (in memory only)
+        :param capacity: number of IDs the filter is sized for. Default is 10000000
+        :param error_rate: probability that a new ID is reported as seen when the filter is full. Default is 0.001
+        """
+        if not 0 < error_rate < 1:
+            raise ValueError("The error rate must be between 0 and 1")
+        self.path = path
+        self.size = ceil(-capacity * log(error_rate) / log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * log(2)))
+        self._file = None
+        self._bits = None
+        self._lock = RLock()
+        self._open()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_file"] = state["_lock"] = None
+        if self.path is not None:
+            state["_bits"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = RLock()
+        if self.path is not None:
+            self._open()
+
+    def _open(self):
+        offset = len(self.magic) + self.header.size
+        if self.path is None:
+            self._bits = bytearray(self.size // 8 + 1)
+            self._offset = 0
+            return
+        if not os.path.exists(self.path):
+            with open(self.path, "wb") as f:
+                f.write(self.magic + self.header.pack(self.size, self.hashes))
+                f.truncate(offset + self.size // 8 + 1)
+        self._file = open(self.path, "r+b")
+        if self._file.read(len(self.magic)) != self.magic:
+            self._file.close()
+            self._file = None
+            raise ValueError(f"{self.path} is not a Bloom filter of seen IDs")
+        self.size, self.hashes = self.header.unpack(self._file.read(self.header.size))
+        self._bits = mmap.mmap(self._file.fileno(), 0)
+        self._offset = offset
+
+    def close(self):
+        """
+        Save and release the memory-mapped file
+        """
+        if self._file is not None:
+            self._bits.flush()
+            self._bits.close()
+            self._file.close()
+            self._bits = self._file = None
+
+    def _positions(self, id):
+        # Double hashing with the splitmix64 finalizer
+        h1 = (id + 0x9E3779B97F4A7C15) & MASK
+        h1 = ((h1 ^ (h1 >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+        h1 = ((h1 ^ (h1 >> 27)) * 0x94D049BB133111EB) & MASK
+        h1 ^= h1 >> 31
+        h2 = (h1 >> 32) | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, id):
+        bits, offset = self._bits, self._offset
+        return all(
+            bits[offset + (position >> 3)] & (1 << (position & 7))
+            for position in self._positions(id)
+        )
+
+    def add(self, id):
+        """
+        Add an ID to the filter
+
+        :param id: numeric ID of the tweet
+        :return: True if the ID is new, False if it was (probably) already in the filter
+        """
+        bits, offset = self._bits, self._offset
+        new = False
+        with self._lock:
+            for position in self._positions(id):
+                byte = offset + (position >> 3)
+                bit = 1 << (position & 7)
+                if not bits[byte] & bit:
+                    bits[byte] |= bit
+                    new = True
+        return new
+
+    def save(self):
+        """
+        Flush the filter to its file
+        """
+        if self.path is None:
+            raise ValueError("The filter has no path to save to")
+        self._bits.flush()
+
+    def snapshot(self):
+        """
+        Get the state of the filter to save in a checkpoint. Only filters with a path
+        can be checkpointed
+
+        :return: None, since the filter is saved to its file
+        """
+        self.save()
+        return None
+
+
+def get_seen_index(seen, checkpoint=None):
+    """
+    Get the index of seen IDs to use for a scrape
+
+    :param seen: None, path of a SeenIndex file, SeenIndex or BloomSeenIndex
+    :param checkpoint: CheckpointStore of the scrape, or None. An index used with checkpoints must have a file, where the IDs are saved with them. Default is None
+    :return: index of seen IDs, or None if none was given
+    """
+    if isinstance(seen, (str, os.PathLike)):
+        return SeenIndex(os.fspath(seen))
+    if seen is not None and not isinstance(seen, (SeenIndex, BloomSeenIndex)):
+        raise ValueError("Seen must be a path, a SeenIndex or a BloomSeenIndex")
+    if seen is not None and checkpoint is not None and seen.path is None:
+        raise ValueError("A seen index used with resume must have a path, where its IDs are saved with the checkpoints")
+    return seen
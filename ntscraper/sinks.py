@@ -0,0 +1,379 @@
+import csv
+import json
+import os
+from abc import ABC, abstractmethod
+from threading import Lock
+from .records import Record
+
+# Columns of the flat sinks for tweets and profiles. Nested dictionaries are flattened
+# with dots, e.g. 'stats.likes', and lists are written as JSON arrays
+tweet_columns = [
+    "thread",
+    "id",
+    "link",
+    "text",
+    "user.name",
+    "user.username",
+    "user.profile_id",
+    "user.avatar",
+    "date",
+    "is-retweet",
+    "is-pinned",
+    "external-link",
+    "replying-to",
+    "quoted-post.link",
+    "quoted-post.text",
+    "quoted-post.user.name",
+    "quoted-post.user.username",
+    "quoted-post.user.profile_id",
+    "quoted-post.user.avatar",
+    "quoted-post.date",
+    "quoted-post.pictures",
+    "quoted-post.videos",
+    "quoted-post.gifs",
+    "stats.comments",
+    "stats.retweets",
+    "stats.quotes",
+    "stats.likes",
+    "pictures",
+    "videos",
+    "gifs",
+]
+
+profile_columns = [
+    "image",
+    "name",
+    "username",
+    "id",
+    "bio",
+    "location",
+    "website",
+    "joined",
+    "stats.tweets",
+    "stats.following",
+    "stats.followers",
+    "stats.likes",
+    "stats.media",
+    "following_list",
+    "followers_list",
+]
+
+
+def _to_dict(item):
+    return item.to_dict() if isinstance(item, Record) else item
+
+
+def flatten(item, prefix="", row=None):
+    """
+    Flatten a tweet or a profile into a single level dictionary
+
+    :param item: dictionary or record to flatten
+    :param prefix: prefix of the keys. Default is ''
+    :param row: dictionary to add the keys to. Default is None (a new dictionary)
+    :return: dictionary with dotted keys, e.g. 'user.username', and lists as JSON arrays
+    """
+    row = {} if row is None else row
+    for key, value in _to_dict(item).items():
+        if isinstance(value, (dict, Record)):
+            flatten(value, f"{prefix}{key}.", row)
+        elif isinstance(value, (list, tuple)):
+            row[prefix + key] = json.dumps(list(value), ensure_ascii=False)
+        else:
+            row[prefix + key] = value
+    return row
+
+
+def flat_rows(item):
+    """
+    Flatten a tweet, a thread or a profile into rows
+
+    :param item: tweet, thread (list of tweets) or profile, as dictionaries or records
+    :return: list of flat dictionaries. The tweets of a thread have the ID of its first tweet in 'thread'
+    """
+    if isinstance(item, list):
+        if not item:
+            return []
+        thread = _to_dict(item[0])["id"]
+        return [flatten(tweet, row={"thread": thread}) for tweet in item]
+    return [flatten(item)]
+
+
+def _columns_of(row):
+    return tweet_columns if "link" in row else profile_columns
+
+
+class Sink(ABC):
+    def __init__(self, buffer_size=1000):
+        """
+        Base class of the output sinks. Items are buffered and written when the buffer is
+        full. The writes run in the thread of the scraper, which waits for them, so the
+        scraper never gets ahead of the disk. A sink can be shared by several threads.
+
+        :param buffer_size: number of rows buffered before being written. Default is 1000
+        """
+        if buffer_size < 1:
+            raise ValueError("The buffer size must be at least 1")
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._buffer = []
+        self._lock = Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @abstractmethod
+    def _rows(self, item):
+        """
+        Convert an item to the rows to write
+
+        :param item: tweet, thread or profile
+        :return: list of rows
+        """
+
+    @abstractmethod
+    def _write_rows(self, rows):
+        """
+        Write rows to the output
+
+        :param rows: list of rows
+        """
+
+    def _close(self):
+        pass
+
+    def write(self, item):
+        """
+        Write a tweet, a thread (list of tweets) or a profile
+
+        :param item: item to write, as a dictionary or a record
+        """
+        rows = self._rows(item)
+        with self._lock:
+            self._buffer.extend(rows)
+            self.count += 1
+            if len(self._buffer) >= self.buffer_size:
+                self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            rows, self._buffer = self._buffer, []
+            self._write_rows(rows)
+
+    def flush(self):
+        """
+        Write the buffered rows
+        """
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        """
+        Write the buffered rows and close the output
+        """
+        with self._lock:
+            self._flush()
+            self._close()
+
+
+class JsonlSink(Sink):
+    def __init__(self, path, max_bytes=None, max_items=None, buffer_size=1000):
+        """
+        Sink writing one JSON document per line: a tweet, a thread (array of tweets) or a
+        profile, as returned by the scraper. With 'max_bytes' or 'max_items', the output is
+        rotated: the items are written to numbered files, e.g. tweets-00000.jsonl,
+        tweets-00001.jsonl..., starting after the files written by previous runs.
+        Without them, the items are appended to the file.
+
+        :param path: file to write to
+        :param max_bytes: max size of each file, in bytes. Default is None (no limit)
+        :param max_items: max number of items in each file. Default is None (no limit)
+        :param buffer_size: number of items buffered before being written. Default is 1000
+        """
+        super().__init__(buffer_size)
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("The max size of a file must be positive")
+        if max_items is not None and max_items < 1:
+            raise ValueError("The max number of items of a file must be positive")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self.files = []
+        self._index = 0
+        self._file = None
+        self._size = 0
+        self._items = 0
+
+    def _rows(self, item):
+        if isinstance(item, list):
+            item = [_to_dict(tweet) for tweet in item]
+        else:
+            item = _to_dict(item)
+        return [(json.dumps(item, ensure_ascii=False) + "\n").encode("utf-8")]
+
+    def _open(self):
+        if self.max_bytes is None and self.max_items is None:
+            path = self.path
+        else:
+            stem, ext = os.path.splitext(self.path)
+            while True:
+                path = f"{stem}-{self._index:05d}{ext}"
+                self._index += 1
+                if not os.path.exists(path):
+                    break
+        self._file = open(path, "ab")
+        self._size = self._items = 0
+        self.files.append(path)
+
+    def _is_full(self, line):
+        return (self.max_items is not None and self._items >= self.max_items) or (
+            self.max_bytes is not None
+            and self._items
+            and self._size + len(line) > self.max_bytes
+        )
+
+    def _write_rows(self, rows):
+        if self._file is None:
+            self._open()
+        for line in rows:
+            if self._is_full(line):
+                self._file.close()
+                self._open()
+            self._file.write(line)
+            self._size += len(line)
+            self._items += 1
+        self._file.flush()
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class CsvSink(Sink):
+    def __init__(self, path, columns=None, buffer_size=1000):
+        """
+        Sink writing one row per tweet or profile to a CSV file. Nested fields are flattened
+        into columns, e.g. 'stats.likes' and 'user.username', lists are written as JSON
+        arrays, and the tweets of a thread have the ID of its first tweet in 'thread'.
+        Rows are appended to the file, and the header is written if the file is new.
+
+        :param path: file to write to
+        :param columns: list of columns to write. Default is None (all the columns of tweets or profiles, from the first item)
+        :param buffer_size: number of rows buffered before being written. Default is 1000
+        """
+        super().__init__(buffer_size)
+        self.path = path
+        self.columns = columns
+        self._file = None
+        self._writer = None
+
+    def _rows(self, item):
+        return flat_rows(item)
+
+    def _write_rows(self, rows):
+        if self._writer is None:
+            if self.columns is None:
+                self.columns = _columns_of(rows[0])
+            new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            self._file = open(self.path, "a", encoding="utf-8", newline="")
+            self._writer = csv.writer(self._file)
+            if new:
+                self._writer.writerow(self.columns)
+        self._writer.writerows(
+            [["" if row.get(column) is None else row[column] for column in self.columns] for row in rows]
+        )
+        self._file.flush()
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+
+class ParquetSink(Sink):
+    def __init__(self, path, columns=None, row_group_size=10000, compression="snappy"):
+        """
+        Sink writing one row per tweet or profile to a Parquet file, with the same columns
+        as CsvSink. Rows are buffered and written one row group at a time, so memory
+        stays bounded. The file is overwritten. Requires pyarrow.
+
+        :param path: file to write to
+        :param columns: list of columns to write. Default is None (all the columns of tweets or profiles, from the first item)
+        :param row_group_size: number of rows of each row group. Default is 10000
+        :param compression: compression codec of the file. Default is 'snappy'
+        """
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("ParquetSink requires pyarrow. Install it with 'pip install pyarrow'")
+        super().__init__(row_group_size)
+        self.path = path
+        self.columns = columns
+        self.compression = compression
+        self._pa = pyarrow
+        self._schema = None
+        self._writer = None
+
+    def _rows(self, item):
+        return flat_rows(item)
+
+    def _type_of(self, column):
+        if column.startswith("stats."):
+            return self._pa.int64()
+        if column.startswith("is-"):
+            return self._pa.bool_()
+        return self._pa.string()
+
+    def _write_rows(self, rows):
+        if self._writer is None:
+            if self.columns is None:
+                self.columns = _columns_of(rows[0])
+            self._schema = self._pa.schema(
+                [(column, self._type_of(column)) for column in self.columns]
+            )
+            self._writer = self._pa.parquet.ParquetWriter(
+                self.path, self._schema, compression=self.compression
+            )
+        table = self._pa.Table.from_pydict(
+            {column: [row.get(column) for row in rows] for column in self.columns},
+            schema=self._schema,
+        )
+        self._writer.write_table(table, row_group_size=len(rows))
+
+    def _close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+# Sink created for each file extension
+sink_extensions = {
+    ".jsonl": JsonlSink,
+    ".csv": CsvSink,
+    ".parquet": ParquetSink,
+}
+
+
+def get_sink(sink):
+    """
+    Get the sink to write the results of a scrape to
+
+    :param sink: None, Sink or path of a file ending with .jsonl, .csv or .parquet
+    :return: Sink, or None if the results are only returned
+    """
+    if sink is None or isinstance(sink, Sink):
+        return sink
+    if isinstance(sink, (str, os.PathLike)):
+        path = os.fspath(sink)
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in sink_extensions:
+            raise ValueError(
+                f"Unknown sink format '{ext}'. Valid formats are: {', '.join(sink_extensions)}"
+            )
+        return sink_extensions[ext](path)
+    raise ValueError("Sink must be a path or a Sink")
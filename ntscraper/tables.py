@@ -0,0 +1,299 @@
+from array import array
+from calendar import timegm
+from datetime import datetime, timezone
+import re
+
+# Result types returning all the tweets of a term as a single table
+table_types = ["arrow", "pandas"]
+
+months = {
+    name: number
+    for number, name in enumerate(
+        ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], 1
+    )
+}
+
+# Date of a tweet as shown by Nitter, e.g. 'Aug 16, 2024 · 6:03 PM UTC'
+date_pattern = re.compile(r"(\w{3}) (\d{1,2}), (\d{4}) · (\d{1,2}):(\d{2}) ([AP]M) UTC")
+# The same format, for the vectorized parsers of Arrow and pandas
+date_format = "%b %d, %Y · %I:%M %p UTC"
+
+
+def parse_date(date):
+    """
+    Parse the date of a tweet
+
+    :param date: date as shown by Nitter, e.g. 'Aug 16, 2024 · 6:03 PM UTC'
+    :return: UNIX time in seconds, or None if the date is invalid
+    """
+    found = date_pattern.fullmatch(date)
+    if not found or found.group(1) not in months:
+        return None
+    month, day, year, hour, minute, half = found.groups()
+    hour = int(hour) % 12 + (12 if half == "PM" else 0)
+    return timegm((int(year), months[month], int(day), hour, int(minute), 0))
+
+
+def parse_dates(dates):
+    """
+    Parse a batch of tweet dates in Python, for the tables built without Arrow or pandas.
+    Dates have a precision of one minute, so many tweets share the same date and each
+    distinct date is only parsed once
+
+    :param dates: list of dates as shown by Nitter
+    :return: list of UNIX times in seconds, None for the invalid dates
+    """
+    parsed = {date: parse_date(date) for date in set(dates)}
+    return [parsed[date] for date in dates]
+
+
+def _import(name, result_type):
+    try:
+        return __import__(name)
+    except ImportError:
+        raise ImportError(f"result_type='{result_type}' requires {name}. Install it with 'pip install ntscraper[tables]'")
+
+
+class TweetTable:
+    # Columns of the table, in order
+    columns = [
+        "id",
+        "thread",
+        "link",
+        "text",
+        "username",
+        "name",
+        "date",
+        "is_retweet",
+        "is_pinned",
+        "external_link",
+        "replying_to",
+        "quoted_link",
+        "comments",
+        "retweets",
+        "quotes",
+        "likes",
+        "pictures",
+        "videos",
+        "gifs",
+    ]
+
+    def __init__(self):
+        """
+        Column buffers of the tweets of a scrape, filled as the pages are parsed and turned
+        into an Arrow table or a pandas DataFrame at the end. Numbers are kept in typed
+        arrays, and usernames, names and dates are dictionary encoded. The distinct dates
+        are parsed at the end, all at once, by Arrow or pandas.
+        """
+        self._ints = {
+            name: array("q")
+            for name in ("id", "thread", "comments", "retweets", "quotes", "likes")
+        }
+        self._flags = {name: bytearray() for name in ("is_retweet", "is_pinned")}
+        self._strings = {
+            name: [] for name in ("link", "text", "external_link", "quoted_link")
+        }
+        self._lists = {name: [] for name in ("replying_to", "pictures", "videos", "gifs")}
+        self._codes = {name: array("i") for name in ("username", "name", "date")}
+        self._values = {name: {} for name in ("username", "name", "date")}
+
+    def __len__(self):
+        return len(self._ints["id"])
+
+    def _encode(self, name, value):
+        code = self._values[name].get(value)
+        if code is None:
+            code = self._values[name][value] = len(self._values[name])
+        self._codes[name].append(code)
+
+    def _add(self, tweet, thread):
+        tweet_id = tweet["id"]
+        self._ints["id"].append(int(tweet_id) if tweet_id.isdigit() else 0)
+        self._ints["thread"].append(thread)
+        stats = tweet["stats"]
+        for name in ("comments", "retweets", "quotes", "likes"):
+            self._ints[name].append(stats[name])
+        self._flags["is_retweet"].append(bool(tweet["is-retweet"]))
+        self._flags["is_pinned"].append(bool(tweet["is-pinned"]))
+        self._strings["link"].append(tweet["link"])
+        self._strings["text"].append(tweet["text"])
+        self._strings["external_link"].append(tweet["external-link"])
+        quoted = tweet["quoted-post"]
+        self._strings["quoted_link"].append(quoted["link"] if quoted else None)
+        for name, key in (("replying_to", "replying-to"), ("pictures", "pictures"), ("videos", "videos"), ("gifs", "gifs")):
+            self._lists[name].append(list(tweet[key]))
+        user = tweet["user"]
+        self._encode("username", user["username"])
+        self._encode("name", user["name"])
+        self._encode("date", tweet["date"])
+
+    def write(self, item):
+        """
+        Add a tweet or a thread to the table
+
+        :param item: tweet, or thread (list of tweets), as a dictionary or a record
+        """
+        if isinstance(item, list):
+            if not item:
+                return
+            head = item[0]["id"]
+            thread = int(head) if head.isdigit() else 0
+            for tweet in item:
+                self._add(tweet, thread)
+        else:
+            self._add(item, 0)
+
+    def to_pydict(self):
+        """
+        Get the columns as Python lists
+
+        :return: dictionary of the columns. Dates are timezone aware datetimes, and 'thread' is the ID of the first tweet of the thread, or 0
+        """
+        columns = {name: list(values) for name, values in self._ints.items()}
+        for name in ("is_retweet", "is_pinned"):
+            columns[name] = [bool(flag) for flag in self._flags[name]]
+        columns.update(self._strings)
+        columns.update(self._lists)
+        for name, codes in self._codes.items():
+            values = list(self._values[name])
+            if name == "date":
+                values = [
+                    datetime.fromtimestamp(date, timezone.utc) if date is not None else None
+                    for date in parse_dates(values)
+                ]
+            columns[name] = [values[code] for code in codes]
+        return {name: columns[name] for name in self.columns}
+
+    def to_arrow(self):
+        """
+        Build an Arrow table of the tweets
+
+        :return: pyarrow.Table, with int64 IDs and stats, a UTC timestamp column for the dates and dictionary encoded usernames and names
+        """
+        pa = _import("pyarrow", "arrow")
+        import pyarrow.compute as pc
+
+        size = len(self)
+
+        # The buffers are copied, so that they can still grow afterwards
+        def ints(name):
+            return pa.Array.from_buffers(
+                pa.int64(), size, [None, pa.py_buffer(self._ints[name].tobytes())]
+            )
+
+        def flags(name):
+            values = pa.Array.from_buffers(
+                pa.uint8(), size, [None, pa.py_buffer(bytes(self._flags[name]))]
+            )
+            return values.cast(pa.bool_())
+
+        def indices(name):
+            codes = self._codes[name]
+            return pa.Array.from_buffers(
+                pa.int32() if codes.itemsize == 4 else pa.int64(), size, [None, pa.py_buffer(codes.tobytes())]
+            )
+
+        def dictionary(name):
+            return pa.DictionaryArray.from_arrays(indices(name), pa.array(list(self._values[name]), pa.string()))
+
+        # The distinct dates are parsed by Arrow, then spread to the tweets
+        dates = pc.strptime(
+            pa.array(list(self._values["date"]), pa.string()),
+            format=date_format,
+            unit="s",
+            error_is_null=True,
+        ).take(indices("date"))
+        strings = pa.list_(pa.string())
+        columns = {
+            "id": ints("id"),
+            "thread": ints("thread"),
+            "link": pa.array(self._strings["link"], pa.string()),
+            "text": pa.array(self._strings["text"], pa.string()),
+            "username": dictionary("username"),
+            "name": dictionary("name"),
+            "date": dates.cast(pa.timestamp("s", tz="UTC")),
+            "is_retweet": flags("is_retweet"),
+            "is_pinned": flags("is_pinned"),
+            "external_link": pa.array(self._strings["external_link"], pa.string()),
+            "replying_to": pa.array(self._lists["replying_to"], strings),
+            "quoted_link": pa.array(self._strings["quoted_link"], pa.string()),
+            "comments": ints("comments"),
+            "retweets": ints("retweets"),
+            "quotes": ints("quotes"),
+            "likes": ints("likes"),
+            "pictures": pa.array(self._lists["pictures"], strings),
+            "videos": pa.array(self._lists["videos"], strings),
+            "gifs": pa.array(self._lists["gifs"], strings),
+        }
+        return pa.table(columns)
+
+    def to_pandas(self):
+        """
+        Build a pandas DataFrame of the tweets
+
+        :return: pandas.DataFrame, with int64 IDs and stats, a UTC datetime column for the dates and categorical usernames and names
+        """
+        pd = _import("pandas", "pandas")
+        import numpy as np
+
+        def ints(name):
+            return np.frombuffer(self._ints[name], dtype=np.int64).copy()
+
+        def flags(name):
+            return np.frombuffer(self._flags[name], dtype=np.bool_).copy()
+
+        def codes(name):
+            return np.frombuffer(self._codes[name], dtype=f"i{self._codes[name].itemsize}").copy()
+
+        def categorical(name):
+            return pd.Categorical.from_codes(codes(name), categories=list(self._values[name]))
+
+        # The distinct dates are parsed by pandas, then spread to the tweets
+        dates = pd.DatetimeIndex(
+            pd.to_datetime(list(self._values["date"]), format=date_format, errors="coerce", utc=True)
+        ).take(codes("date"))
+        columns = {
+            "id": ints("id"),
+            "thread": ints("thread"),
+            "link": self._strings["link"],
+            "text": self._strings["text"],
+            "username": categorical("username"),
+            "name": categorical("name"),
+            "date": dates,
+            "is_retweet": flags("is_retweet"),
+            "is_pinned": flags("is_pinned"),
+            "external_link": self._strings["external_link"],
+            "replying_to": self._lists["replying_to"],
+            "quoted_link": self._strings["quoted_link"],
+            "comments": ints("comments"),
+            "retweets": ints("retweets"),
+            "quotes": ints("quotes"),
+            "likes": ints("likes"),
+            "pictures": self._lists["pictures"],
+            "videos": self._lists["videos"],
+            "gifs": self._lists["gifs"],
+        }
+        return pd.DataFrame(columns, columns=self.columns)
+
+    def finish(self, result_type):
+        """
+        Build the table of the tweets
+
+        :param result_type: 'arrow' or 'pandas'
+        :return: pyarrow.Table or pandas.DataFrame
+        """
+        return self.to_arrow() if result_type == "arrow" else self.to_pandas()
+
+
+def tweet_table(tweets, result_type):
+    """
+    Build the table of a dictionary of tweets and threads
+
+    :param tweets: dictionary of tweets and threads, as returned by the scraper
+    :param result_type: 'arrow' or 'pandas'
+    :return: pyarrow.Table or pandas.DataFrame
+    """
+    table = TweetTable()
+    for item in tweets["tweets"] + tweets["threads"]:
+        table.write(item)
+    return table.finish(result_type)
@@ -0,0 +1,336 @@
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep, time
+
+# Twitter epoch of the snowflake IDs, in seconds
+SNOWFLAKE_EPOCH = 1288834974.657
+
+
+def snowflake_time(tweet_id):
+    """
+    Get the creation time encoded in a tweet ID
+
+    :param tweet_id: numeric ID of the tweet
+    :return: UNIX time the tweet was posted at
+    """
+    return (tweet_id >> 22) / 1000 + SNOWFLAKE_EPOCH
+
+
+class AccountState:
+    def __init__(
+        self, newest_id=0, rate=None, last_poll=0.0, next_poll=0.0, retweets=(), failures=0
+    ):
+        """
+        Polling state of a watched account
+
+        :param newest_id: ID of the newest tweet seen, 0 if the account was never polled
+        :param rate: estimated tweets per second, None if unknown
+        :param last_poll: UNIX time of the last successful poll
+        :param next_poll: UNIX time of the next poll
+        :param retweets: IDs of the latest retweets seen, newest last
+        :param failures: number of polls failed in a row
+        """
+        self.newest_id = newest_id
+        self.rate = rate
+        self.last_poll = last_poll
+        self.next_poll = next_poll
+        self.retweets = list(retweets)
+        self.failures = failures
+
+    def to_dict(self):
+        return {
+            "newest_id": self.newest_id,
+            "rate": self.rate,
+            "last_poll": self.last_poll,
+            "next_poll": self.next_poll,
+            "retweets": self.retweets,
+            "failures": self.failures,
+        }
+
+
+class Watcher:
+    def __init__(
+        self,
+        scraper,
+        users,
+        callback,
+        path=None,
+        number=20,
+        min_interval=60,
+        max_interval=24 * 60 * 60,
+        target=1,
+        alpha=0.3,
+        workers=8,
+        instance=None,
+        max_retries=5,
+        result_type="dict",
+    ):
+        """
+        Incremental watcher of user timelines. Every poll of an account stops paginating at
+        the newest tweet seen by the previous one, and the new tweets are passed to the
+        callback. The next poll of each account is scheduled from its posting rate, estimated
+        with an exponentially weighted moving average, so that about 'target' new tweets are
+        expected at every poll: active accounts are polled often, dormant ones rarely.
+        A poll that fails is retried with an exponential backoff, without changing the rate.
+
+        :param scraper: Nitter scraper to use
+        :param users: list of usernames to watch
+        :param callback: function called with the username and the list of its new tweets and threads, newest first. It is called from the worker threads of run_pending, so it must be thread-safe
+        :param path: JSON file where the state of the accounts is saved after every round of polls. Default is None (in memory only)
+        :param number: max number of tweets and threads scraped by the first poll of an account. The next polls scrape every tweet posted since the previous one. Default is 20
+        :param min_interval: min seconds between two polls of an account. Default is 60
+        :param max_interval: max seconds between two polls of an account. Default is 1 day
+        :param target: number of new tweets expected at each poll. Default is 1
+        :param alpha: weight of the newest poll in the posting rate. Default is 0.3
+        :param workers: max number of accounts polled at the same time. Default is 8
+        :param instance: Nitter instance to use. Default is None (random working instances)
+        :param max_retries: max retries to scrape a page. Default is 5
+        :param result_type: 'dict' or 'record'. Default is 'dict'
+        """
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("The intervals must satisfy 0 < min_interval <= max_interval")
+        if not 0 < alpha <= 1:
+            raise ValueError("Alpha must be between 0 (excluded) and 1")
+        if workers < 1:
+            raise ValueError("The number of workers must be at least 1")
+        self.scraper = scraper
+        self.callback = callback
+        self.path = path
+        self.number = number
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target = target
+        self.alpha = alpha
+        self.workers = workers
+        self.instance = instance
+        self.max_retries = max_retries
+        self.result_type = result_type
+        self.accounts = {}
+        if path is not None and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.accounts = {
+                    user: AccountState(**state) for user, state in json.load(f).items()
+                }
+        for user in users:
+            self.add(user)
+
+    def add(self, user):
+        """
+        Start watching an account. It is polled at the next round
+
+        :param user: username of the account
+        """
+        user = user.strip().lstrip("@")
+        if user not in self.accounts:
+            self.accounts[user] = AccountState()
+
+    def remove(self, user):
+        """
+        Stop watching an account
+
+        :param user: username of the account
+        """
+        self.accounts.pop(user.strip().lstrip("@"), None)
+
+    def save(self):
+        """
+        Save the state of the accounts to the file of the watcher
+        """
+        # tempfile is only imported here, since it is slow to import
+        import tempfile
+
+        if self.path is None:
+            raise ValueError("The watcher has no path to save to")
+        # Every save has its own temporary file, so that concurrent saves never replace
+        # the state with each other's half-written file
+        fd, temp = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(self.path)),
+            prefix=os.path.basename(self.path) + ".",
+            suffix=".tmp",
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({user: state.to_dict() for user, state in self.accounts.items()}, f)
+            os.replace(temp, self.path)
+        except BaseException:
+            os.remove(temp)
+            raise
+
+    def _is_new(self, tweet, state):
+        tweet_id = int(tweet["id"]) if tweet["id"].isdigit() else 0
+        if tweet["is-retweet"]:
+            # Retweets have the ID of the original tweet, which can be older than the newest one
+            return tweet_id not in state.retweets
+        return tweet_id > state.newest_id
+
+    def _reached_seen(self, item, state):
+        # Pinned tweets and retweets are out of order, so only the other tweets end the poll
+        tweets = [
+            tweet for tweet in (item if isinstance(item, list) else [item])
+            if not tweet["is-pinned"] and not tweet["is-retweet"] and tweet["id"].isdigit()
+        ]
+        return bool(tweets) and max(int(tweet["id"]) for tweet in tweets) <= state.newest_id
+
+    def _scrape(self, scraper, user, state):
+        """
+        Scrape the tweets of an account posted since its last poll
+
+        :param scraper: Nitter scraper to use
+        :param user: username of the account
+        :param state: AccountState of the account
+        :return: list of new tweets and threads, newest first, or None if a page could not be downloaded
+        """
+        new = []
+        # After the first poll, the pages are scraped until the newest tweet seen,
+        # so that no tweet is missed however many were posted in the meantime
+        items = scraper.iter_tweets(
+            user,
+            mode="user",
+            number=self.number if not state.newest_id else -1,
+            max_retries=self.max_retries,
+            instance=self.instance,
+            result_type=self.result_type,
+        )
+        while True:
+            try:
+                item = next(items)
+            except StopIteration as stop:
+                # The search returns False if a page could not be downloaded
+                return new if stop.value is not False else None
+            if state.newest_id and self._reached_seen(item, state):
+                items.close()
+                return new
+            if isinstance(item, list):
+                item = [tweet for tweet in item if self._is_new(tweet, state)]
+                if item:
+                    new.append(item)
+            elif self._is_new(item, state):
+                new.append(item)
+
+    def _update(self, state, new, now):
+        """
+        Update the state of an account after a poll
+
+        :param state: AccountState of the account
+        :param new: list of new tweets and threads
+        :param now: UNIX time of the poll
+        """
+        tweets = [tweet for item in new for tweet in (item if isinstance(item, list) else [item])]
+        own = [tweet for tweet in tweets if not tweet["is-retweet"] and tweet["id"].isdigit()]
+        # Pinned tweets can be much older than the others, so they are not used for the rate
+        posted = [int(tweet["id"]) for tweet in own if not tweet["is-pinned"]]
+        if state.newest_id:
+            sample = len(tweets) / max(now - state.last_poll, 1)
+        elif posted:
+            # First poll: estimate the rate from the age of the tweets, encoded in their IDs
+            sample = len(posted) / max(now - snowflake_time(min(posted)), 1)
+        else:
+            sample = 0.0
+        state.rate = sample if state.rate is None else (1 - self.alpha) * state.rate + self.alpha * sample
+        state.newest_id = max([state.newest_id] + [int(tweet["id"]) for tweet in own])
+        state.retweets = (
+            state.retweets
+            + [int(tweet["id"]) for tweet in tweets if tweet["is-retweet"] and tweet["id"].isdigit()]
+        )[-100:]
+        interval = self.target / state.rate if state.rate else self.max_interval
+        state.last_poll = now
+        state.next_poll = now + min(max(interval, self.min_interval), self.max_interval)
+        state.failures = 0
+
+    def _failed(self, state, now):
+        """
+        Schedule the next poll of an account after a failed poll, with an exponential backoff.
+        The posting rate and the newest tweet are left as they are, so the next poll scrapes
+        the tweets of the failed one too
+
+        :param state: AccountState of the account
+        :param now: UNIX time of the poll
+        """
+        state.failures += 1
+        backoff = self.min_interval * 2 ** min(state.failures - 1, 32)
+        state.next_poll = now + min(backoff, self.max_interval)
+
+    def poll(self, user, scraper=None, now=None):
+        """
+        Poll an account, passing its new tweets to the callback
+
+        :param user: username of the account
+        :param scraper: Nitter scraper to use. Default is None (the scraper of the watcher)
+        :param now: current UNIX time. Default is None (now)
+        :return: list of new tweets and threads, newest first, or None if the poll failed
+        """
+        state = self.accounts[user]
+        now = time() if now is None else now
+        new = self._scrape(scraper or self.scraper, user, state)
+        if new is None:
+            self._failed(state, now)
+            logging.warning(
+                f"Poll of {user} failed, next poll in {state.next_poll - now:.0f} seconds"
+            )
+            return None
+        self._update(state, new, now)
+        logging.info(
+            f"{len(new)} new tweets from {user}, next poll in {state.next_poll - state.last_poll:.0f} seconds"
+        )
+        if new:
+            self.callback(user, new)
+        return new
+
+    def _poll_in_thread(self, user):
+        scraper = self.scraper._clone()
+        try:
+            return self.poll(user, scraper)
+        except Exception as e:
+            # A failing account must not stop the others, it is polled again later
+            logging.warning(f"Error polling {user}: {e}")
+            self._failed(self.accounts[user], time())
+        finally:
+            scraper.close()
+
+    def due(self, now=None):
+        """
+        Get the accounts to poll
+
+        :param now: current UNIX time. Default is None (now)
+        :return: list of usernames, the most overdue first
+        """
+        now = time() if now is None else now
+        return sorted(
+            (user for user, state in self.accounts.items() if state.next_poll <= now),
+            key=lambda user: self.accounts[user].next_poll,
+        )
+
+    def run_pending(self):
+        """
+        Poll the accounts that are due, at most 'workers' at the same time.
+        The callback is called from the worker threads
+
+        :return: number of accounts polled
+        """
+        users = self.due()
+        if users:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(users))) as executor:
+                list(executor.map(self._poll_in_thread, users))
+            if self.path is not None:
+                self.save()
+        return len(users)
+
+    def run(self, rounds=None):
+        """
+        Poll the accounts forever, sleeping until the next one is due
+
+        :param rounds: number of rounds of polls to run. Default is None (forever)
+        """
+        while True:
+            self.run_pending()
+            if rounds is not None:
+                rounds -= 1
+                if rounds <= 0:
+                    return
+            next_poll = min(
+                (state.next_poll for state in self.accounts.values()),
+                default=time() + self.min_interval,
+            )
+            sleep(max(next_poll - time(), 0))
@@ -35,4 +35,9 @@ setup(
     packages=["ntscraper"],
     include_package_data=True,
     install_requires=["requests>=2.28", "beautifulsoup4>=4.11", "lxml>=4.9", "tqdm>=4.66"],
+    extras_require={
+        "async": ["aiohttp>=3.8"],
+        "tables": ["pyarrow>=10", "pandas>=1.5"],
+        "test": ["aiohttp>=3.8", "pyarrow>=10", "pandas>=1.5"],
+    },
 )
\ No newline at end of file
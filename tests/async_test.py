@@ -0,0 +1,130 @@
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+from ntscraper import AsyncNitter, Nitter
+from ntscraper.checkpoint import CheckpointStore
+from tests.server import StubNitter, StubTestCase
+
+
+class TestAsync(StubTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = patch("asyncio.sleep")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_scrape_users(self):
+        """
+        Test scraping multiple users concurrently
+        """
+        async def scrape():
+            async with AsyncNitter(self.stub.url, log_level=0, skip_instance_check=True) as nitter:
+                return await nitter.get_tweets(["jack", "bob"], mode='user', number=10, instance=self.stub.url)
+
+        results = asyncio.run(scrape())
+        self.assertEqual(len(results), 2)
+        for tweets, user in zip(results, ["jack", "bob"]):
+            self.assertEqual(len(tweets['tweets']) + len(tweets['threads']), 10)
+            self.assertEqual(tweets, self.nitter.get_tweets(user, mode='user', number=10, instance=self.stub.url))
+
+    def test_scrape_profile_info(self):
+        """
+        Test scraping profile info of a username
+        """
+        async def scrape():
+            async with AsyncNitter(self.stub.url, log_level=0, skip_instance_check=True) as nitter:
+                return await nitter.get_profile_info("jack", instance=self.stub.url)
+
+        profile = asyncio.run(scrape())
+        self.assertEqual(profile['username'], "@jack")
+        self.assertEqual(profile, self.nitter.get_profile_info("jack", instance=self.stub.url))
+
+
+class TestAsyncMethods(unittest.TestCase):
+    def test_public_methods(self):
+        """
+        Test that every public method of Nitter works on the asyncio scraper, or raises a TypeError
+        """
+        async def collect(results):
+            return [result async for result in results]
+
+        async def scrape(nitter, url):
+            return {
+                "get_random_instance": nitter.get_random_instance(),
+                "get_tweets": await nitter.get_tweets("foo", instance=url, number=5),
+                "get_tweet_by_id": await nitter.get_tweet_by_id("jack", "1", instance=url),
+                "get_tweets_by_ids": await collect(nitter.get_tweets_by_ids([("jack", "1")], instance=url)),
+                "get_profile_info": await nitter.get_profile_info("jack", instance=url),
+                "close": await nitter.close(),
+            }
+
+        unsupported = ["iter_tweets", "iter_follow_list", "iter_follow_graph"]
+        with StubNitter(pages=2, per_page=10) as stub, patch("asyncio.sleep"):
+            nitter = AsyncNitter(stub.url, log_level=0, skip_instance_check=True)
+            results = asyncio.run(scrape(nitter, stub.url))
+        public = {name for name in dir(Nitter) if not name.startswith("_")}
+        self.assertEqual(public, set(results) | set(unsupported))
+        self.assertEqual(results["get_random_instance"], stub.url)
+        self.assertEqual(len(results["get_tweets"]["tweets"]) + len(results["get_tweets"]["threads"]), 5)
+        self.assertEqual(results["get_tweet_by_id"]["link"].split("/")[-1].split("#")[0], "1")
+        self.assertEqual(results["get_tweets_by_ids"][0][3], None)
+        self.assertEqual(results["get_profile_info"]["username"], "@jack")
+        for name in unsupported:
+            with self.assertRaises(TypeError):
+                getattr(nitter, name)("foo")
+
+    def test_create(self):
+        """
+        Test that the instances are checked without blocking the event loop
+        """
+        async def create(url):
+            ticks = []
+
+            async def tick():
+                while True:
+                    ticks.append(None)
+                    await asyncio.sleep(0.01)
+
+            ticker = asyncio.ensure_future(tick())
+            nitter = await AsyncNitter.create(url, log_level=0)
+            ticker.cancel()
+            return nitter, len(ticks)
+
+        with StubNitter(pages=2, per_page=10, latency=0.2) as stub:
+            nitter, ticks = asyncio.run(create(stub.url))
+        self.assertEqual(nitter.working_instances, [stub.url])
+        self.assertGreater(ticks, 5)
+
+    def test_resume(self):
+        """
+        Test that the asyncio scraper resumes the follow lists and searches checkpointed by Nitter
+        """
+        async def scrape(url, store):
+            async with AsyncNitter(url, log_level=0, skip_instance_check=True) as nitter:
+                return (
+                    await nitter._get_follow_list("/jack/followers", 5, url, store),
+                    await nitter.get_tweets("foo", instance=url, resume=store),
+                )
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store = CheckpointStore(directory.name)
+        with StubNitter(pages=3, per_page=10) as stub, patch("ntscraper.nitter.sleep"), patch("asyncio.sleep"):
+            nitter = Nitter(stub.url, log_level=0, skip_instance_check=True)
+            nitter._initialize_session(stub.url)
+            followers = nitter._get_follow_list("/jack/followers", 5)
+            tweets = nitter.get_tweets("foo", instance=stub.url)
+            first = nitter._get_follow_list("/jack/followers", 5, store, max_users=15)
+            stub.dead_after = stub.requests + 1
+            nitter.get_tweets("foo", instance=stub.url, resume=store, max_retries=1)
+            stub.dead_after = None
+            rest, resumed = asyncio.run(scrape(stub.url, store))
+        self.assertEqual(first + rest, followers)
+        self.assertEqual(resumed["tweets"], tweets["tweets"][len(tweets["tweets"]) - len(resumed["tweets"]):])
+        self.assertGreater(len(resumed["tweets"]), 0)
+        self.assertLess(len(resumed["tweets"]), len(tweets["tweets"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
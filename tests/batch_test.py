@@ -0,0 +1,51 @@
+import asyncio
+import unittest
+from ntscraper import AsyncNitter
+from tests.server import StubTestCase
+
+PAIRS = [("jack", str(1000 + i)) for i in range(50)] + [("jack", "missing")]
+
+
+class TestTweetsByIds(StubTestCase):
+    stub_options = {"latency": 0.01}
+
+    def check(self, results):
+        self.assertEqual(sorted((username, tweet_id) for username, tweet_id, _, _ in results), sorted(PAIRS))
+        for username, tweet_id, tweet, error in results:
+            if tweet_id == "missing":
+                self.assertIsNone(tweet)
+                self.assertIsNotNone(error)
+            else:
+                self.assertIsNone(error)
+                self.assertEqual(tweet["id"], tweet_id)
+
+    def test_threads(self):
+        """
+        Test fetching tweets concurrently with threads, reporting the failures per ID
+        """
+        nitter = self.scraper(rate=1000, max_rate=1000, burst=100)
+        results = list(nitter.get_tweets_by_ids(iter(PAIRS), concurrency=8))
+        self.check(results)
+
+    def test_stop_early(self):
+        """
+        Test that the fetches not started yet are dropped when the consumer stops
+        """
+        nitter = self.scraper(rate=1000, max_rate=1000, burst=100)
+        for _ in nitter.get_tweets_by_ids(PAIRS * 100, concurrency=4):
+            break
+        self.assertLess(self.stub.requests, 20)
+
+    def test_async(self):
+        """
+        Test fetching tweets concurrently with asyncio
+        """
+        async def fetch():
+            async with AsyncNitter(self.stub.url, log_level=0, skip_instance_check=True, rate=1000, max_rate=1000, burst=100) as nitter:
+                return [result async for result in nitter.get_tweets_by_ids(PAIRS, concurrency=8, instance=self.stub.url)]
+
+        self.check(asyncio.run(fetch()))
+
+
+if __name__ == '__main__':
+    unittest.main()
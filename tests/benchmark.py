@@ -0,0 +1,191 @@
+"""
+End-to-end benchmark of the scraper against local stub Nitter servers, with injected
+latency and faults. Run it from the root of the repository with
+
+    python -m tests.benchmark
+
+and compare the numbers before and after a change to the request path. It also
+checks that importing ntscraper stays within its time budget, and exits with an
+error if it does not.
+"""
+import argparse
+import compileall
+import json
+import logging
+import os
+import subprocess
+import sys
+from time import perf_counter
+from ntscraper import Nitter
+from tests.server import RequestLog, StubNitter, dead_instance
+
+# Max time to import ntscraper in a new process, in seconds
+import_budget = 0.1
+
+# Modules that must only be imported when the scraper first needs them
+lazy_modules = ["requests", "bs4", "lxml", "tqdm", "multiprocessing", "asyncio", "aiohttp"]
+
+# Script run in a new process to time the import and to report its side effects
+import_script = """
+import json, logging, sys, threading
+from time import perf_counter
+start = perf_counter()
+import ntscraper
+elapsed = perf_counter() - start
+root = logging.getLogger()
+print(json.dumps({
+    "seconds": elapsed,
+    "modules": [module for module in %r if module in sys.modules],
+    "handlers": len(root.handlers),
+    "level": root.level,
+    "threads": threading.active_count(),
+}))
+"""
+
+# Name of each scenario, and the options of the stubs it runs on
+scenarios = {
+    "healthy": [{}],
+    "latency": [{"latency": 0.05}],
+    "rate limited": [{"rate_limit_every": 5, "error_every": 7}],
+    "failover": [{"dead_after": 4}, {"dead_after": 8}, {}],
+}
+
+
+def count_tweets(tweets):
+    return len(tweets["tweets"]) + sum(len(thread) for thread in tweets["threads"])
+
+
+def measure_import(runs=5):
+    """
+    Import ntscraper in new processes, with its bytecode already compiled, as in
+    the worker processes of a deployed scraper
+
+    :param runs: number of processes to run
+    :return: dictionary of the fastest import time in 'seconds' and of the side effects of the import
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    compileall.compile_dir(os.path.join(root, "ntscraper"), quiet=1)
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", import_script % (lazy_modules,)],
+            cwd=root,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        results.append(json.loads(output))
+    return min(results, key=lambda result: result["seconds"])
+
+
+def run_scenario(name, stubs, args):
+    """
+    Scrape a search and some profiles from a set of stubs
+
+    :param name: name of the scenario
+    :param stubs: list of options of the stubs
+    :param args: command line arguments
+    :return: list of rows of results, one for each function
+    """
+    log = RequestLog()
+    servers = [
+        StubNitter(pages=args.pages, per_page=args.per_page, log=log, **options)
+        for options in stubs
+    ]
+    try:
+        urls = [server.start() for server in servers]
+        if name == "failover":
+            urls.append(dead_instance())
+        nitter = Nitter(
+            urls,
+            log_level=0,
+            skip_instance_check=len(urls) == 1,
+            rate=args.rate,
+            max_rate=args.max_rate,
+            prefetch=args.prefetch,
+        )
+        instance = urls[0] if len(urls) == 1 else None
+        rows = []
+        for function in ("get_tweets", "get_profile_info"):
+            log.clear()
+            nitter.metrics.reset()
+            start = perf_counter()
+            if function == "get_tweets":
+                terms = [f"foo{i}" for i in range(args.terms)]
+                results = nitter.get_tweets(
+                    terms,
+                    instance=instance,
+                    workers=args.terms,
+                    parse_workers=args.parse_workers,
+                )
+                tweets = sum(
+                    count_tweets(result)
+                    for result in (results if isinstance(results, list) else [results])
+                )
+            else:
+                tweets = 0
+                for i in range(args.profiles):
+                    if nitter.get_profile_info(f"user{i}", instance=instance):
+                        tweets += 1
+            elapsed = perf_counter() - start
+            statuses = log.statuses()
+            rows.append(
+                (
+                    name,
+                    function,
+                    statuses[200],
+                    tweets,
+                    elapsed,
+                    sum(statuses.values()) - statuses[200],
+                    log.failovers(),
+                    nitter.metrics.get_histogram("request_seconds")[1],
+                    nitter.metrics.get_histogram("page_parse_seconds")[1],
+                )
+            )
+        nitter.close()
+        return rows
+    finally:
+        for server in servers:
+            server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--pages", type=int, default=10, help="pages of the search")
+    parser.add_argument("--per-page", type=int, default=20, help="tweets in a page")
+    parser.add_argument("--profiles", type=int, default=10, help="profiles to scrape")
+    parser.add_argument("--terms", type=int, default=1, help="terms searched at the same time")
+    parser.add_argument("--prefetch", type=int, default=0, help="pages of a search downloaded ahead")
+    parser.add_argument(
+        "--parse-workers", type=int, default=None, help="processes parsing the pages of the searches. Default is None (no pipeline)"
+    )
+    parser.add_argument("--rate", type=float, default=20, help="initial requests per second to each instance")
+    parser.add_argument("--max-rate", type=float, default=100, help="max requests per second to each instance")
+    parser.add_argument(
+        "--scenario", choices=list(scenarios), action="append", help="scenario to run, can be repeated. Default is all"
+    )
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    result = measure_import()
+    print(f"import: {result['seconds'] * 1000:.1f} ms (budget {import_budget * 1000:.0f} ms)\n")
+
+    print(
+        f"{'scenario':<14}{'function':<18}{'pages':>7}{'items':>7}{'seconds':>9}"
+        f"{'pages/s':>9}{'items/s':>9}{'retries':>9}{'failovers':>11}{'fetch s':>9}{'parse s':>9}"
+    )
+    for name in args.scenario or scenarios:
+        for name, function, pages, items, elapsed, retries, failovers, fetch, parse in run_scenario(
+            name, scenarios[name], args
+        ):
+            print(
+                f"{name:<14}{function:<18}{pages:>7}{items:>7}{elapsed:>9.2f}"
+                f"{pages / elapsed:>9.1f}{items / elapsed:>9.1f}{retries:>9}{failovers:>11}"
+                f"{fetch:>9.2f}{parse:>9.2f}"
+            )
+    if result["seconds"] > import_budget:
+        sys.exit(f"Importing ntscraper took longer than its budget of {import_budget * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
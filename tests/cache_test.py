@@ -0,0 +1,137 @@
+import os
+import tempfile
+import unittest
+from multiprocessing import Pool
+from unittest.mock import MagicMock, patch
+from ntscraper import Nitter
+from ntscraper.cache import ResponseCache, endpoint_type, normalize_endpoint
+from tests.fixtures import timeline_page, timeline_tweets
+
+INSTANCE = "http://localhost:8080"
+
+
+def fill_cache(path):
+    cache = ResponseCache(path)
+    for _ in range(50):
+        for i in range(5):
+            cache.set(f"/user{i}", b"page of user%d" % i)
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_keys(self):
+        """
+        Test that endpoints are normalized and typed
+        """
+        self.assertEqual(
+            normalize_endpoint("/Jack/?b=2&a=1"), normalize_endpoint("/jack?a=1&b=2")
+        )
+        self.assertEqual(endpoint_type("/search?f=tweets&q=foo"), "search")
+        self.assertEqual(endpoint_type("/jack/status/55"), "status")
+        self.assertEqual(endpoint_type("/jack/followers?cursor=1"), "follow")
+        self.assertEqual(endpoint_type("/jack"), "profile")
+        self.assertEqual(endpoint_type("/search?f=tweets&q=%23foo&cursor=1"), "search")
+        self.assertEqual(endpoint_type("/jack/search?f=tweets&q=&since=2024-08-01"), "search")
+        self.assertEqual(endpoint_type("/jack?cursor=DAABCgABGQ"), "search")
+        self.assertEqual(endpoint_type("/jack/with_replies"), "search")
+        self.assertEqual(endpoint_type("/jack/status/55?cursor=1"), "status")
+        self.assertEqual(endpoint_type("/jack/following?cursor=1"), "follow")
+
+    def test_ttl(self):
+        """
+        Test that pages expire after the TTL of their type, except in offline mode
+        """
+        cache = ResponseCache(self.directory.name, ttl={"search": 10})
+        cache.set("/search?q=foo", b"search page", now=100.0)
+        cache.set("/jack/status/55", b"status page", now=100.0)
+        self.assertEqual(cache.get("/search?q=foo", now=105.0), b"search page")
+        self.assertIsNone(cache.get("/search?q=foo", now=111.0))
+        cache.set("/jack/search?f=tweets&q=", b"user search page", now=100.0)
+        cache.set("/jack?cursor=1", b"timeline page", now=100.0)
+        self.assertIsNone(cache.get("/jack/search?f=tweets&q=", now=111.0))
+        self.assertIsNone(cache.get("/jack?cursor=1", now=111.0))
+        self.assertEqual(cache.get("/jack/status/55", now=111.0), b"status page")
+        offline = ResponseCache(self.directory.name, offline=True)
+        self.assertEqual(offline.get("/search?q=foo", now=1000000.0), b"search page")
+        self.assertRaises(ValueError, ResponseCache, self.directory.name, ttl={"page": 10})
+
+    def test_eviction(self):
+        """
+        Test that the least recently used pages are removed when the cache is full
+        """
+        content = os.urandom(1000)
+        cache = ResponseCache(self.directory.name, max_size=3500)
+        for i in range(3):
+            cache.set(f"/user{i}", content, now=100.0 + i)
+        cache.get("/user0", now=110.0)
+        cache.set("/user3", content, now=120.0)
+        self.assertIsNone(cache.get("/user1", now=130.0))
+        for i in (0, 2, 3):
+            self.assertEqual(cache.get(f"/user{i}", now=130.0), content)
+        self.assertLessEqual(cache._size, 3500)
+
+    def test_corrupt(self):
+        """
+        Test that truncated or corrupt pages are missing, and removed
+        """
+        cache = ResponseCache(self.directory.name)
+        for data in (b"", b"1234", cache.header.pack(100.0) + b"not compressed"):
+            cache.set("/jack", b"profile page", now=100.0)
+            with open(cache._file("/jack"), "wb") as f:
+                f.write(data)
+            self.assertIsNone(cache.get("/jack", now=101.0))
+            self.assertFalse(os.path.exists(cache._file("/jack")))
+
+    def test_shared_directory(self):
+        """
+        Test that processes can save pages to the same directory at the same time
+        """
+        with Pool(4) as pool:
+            pool.map(fill_cache, [self.directory.name] * 4)
+        cache = ResponseCache(self.directory.name)
+        for i in range(5):
+            self.assertEqual(cache.get(f"/user{i}"), b"page of user%d" % i)
+        self.assertEqual(len(os.listdir(self.directory.name)), 5)
+
+
+class TestCachedPage(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        patcher = patch("ntscraper.nitter.sleep")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_page(self):
+        """
+        Test that cached pages are not downloaded again, and that offline mode never downloads
+        """
+        response = MagicMock(status_code=200, ok=True, headers={})
+        response.content = timeline_page(timeline_tweets(0, per_page=2)).encode("utf-8")
+        nitter = Nitter(INSTANCE, log_level=0, skip_instance_check=True, cache=self.directory.name)
+        nitter._initialize_session(INSTANCE)
+        nitter.r = MagicMock()
+        nitter.r.get.return_value = response
+        first = nitter._get_page("/search?f=tweets&q=foo")
+        second = nitter._get_page("/search?q=foo&f=tweets")
+        self.assertEqual(nitter.r.get.call_count, 1)
+        self.assertEqual(str(first), str(second))
+
+        offline = Nitter(
+            INSTANCE,
+            log_level=0,
+            skip_instance_check=True,
+            cache=ResponseCache(self.directory.name, offline=True),
+        )
+        offline._initialize_session(INSTANCE)
+        offline.r = MagicMock()
+        self.assertEqual(str(offline._get_page("/search?f=tweets&q=foo")), str(first))
+        self.assertIsNone(offline._get_page("/search?f=tweets&q=bar"))
+        offline.r.get.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+from multiprocessing import Pool
+from unittest.mock import patch
+from ntscraper import Nitter
+from ntscraper.checkpoint import CheckpointStore
+from tests.fixtures import follow_page, timeline_page, timeline_tweets
+
+INSTANCE = "http://localhost:8080"
+PAGES = 5
+
+
+def save_checkpoints(path):
+    store = CheckpointStore(path)
+    for i in range(200):
+        store.save("search:/search?q=foo", {"pages": i, "endpoint": "/search?q=foo" * 100})
+
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.nitter = Nitter(INSTANCE, log_level=0, skip_instance_check=True)
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = CheckpointStore(self.directory.name)
+        self.requested = []
+        self.failing = None
+        patcher = patch("ntscraper.nitter.sleep")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.directory.cleanup)
+
+    def get_page(self, endpoint, max_retries=5):
+        """
+        Serve synthetic pages, numbered by their cursor, failing on self.failing
+        """
+        page = int(endpoint.split("cursor=")[-1]) if "cursor=" in endpoint else 0
+        self.requested.append(page)
+        if page == self.failing:
+            return None
+        next_page = page + 1 if page + 1 < PAGES else None
+        if "followers" in endpoint:
+            html = follow_page(
+                [f"user{page}_{i}" for i in range(3)],
+                f"/jack/followers?cursor={next_page}" if next_page else None,
+            )
+        else:
+            html = timeline_page(
+                timeline_tweets(page, per_page=3),
+                f"?f=tweets&q=foo&cursor={next_page}" if next_page else None,
+            )
+        return self.nitter.parser.parse(html.encode("utf-8"))
+
+    def links(self, tweets):
+        return [tweet["link"] for tweet in tweets["tweets"]]
+
+    def test_resume_search(self):
+        """
+        Test that a search stopped by an error resumes from the page that failed
+        """
+        with patch.object(self.nitter, "_get_page", self.get_page):
+            expected = self.links(self.nitter.get_tweets("foo", instance=INSTANCE))
+            self.failing = 3
+            self.requested = []
+            first = self.links(self.nitter.get_tweets("foo", resume=self.store, instance=INSTANCE))
+            self.assertEqual(self.requested, [0, 1, 2, 3])
+            self.failing = None
+            self.requested = []
+            second = self.links(self.nitter.get_tweets("foo", resume=self.store, instance=INSTANCE))
+            self.assertEqual(self.requested, [3, 4])
+        self.assertEqual(first + second, expected)
+        self.assertIsNone(self.store.load("search:" + self.nitter._build_search_endpoint(
+            "foo", "term", None, None, None, None, None, False, None, None
+        )))
+
+    def test_resume_interrupted_stream(self):
+        """
+        Test that a stream stopped by the consumer resumes from its last checkpoint
+        """
+        store = CheckpointStore(self.directory.name, every=2)
+        with patch.object(self.nitter, "_get_page", self.get_page):
+            expected = list(self.nitter.iter_tweets("foo", instance=INSTANCE))
+            consumed = []
+            for tweet in self.nitter.iter_tweets("foo", resume=store, instance=INSTANCE):
+                consumed.append(tweet)
+                if len(consumed) == 10:
+                    break
+            self.requested = []
+            rest = list(self.nitter.iter_tweets("foo", resume=store, instance=INSTANCE))
+        # The last checkpoint was saved after the second page, so the third one is scraped again
+        self.assertEqual(self.requested, [2, 3, 4])
+        self.assertEqual(consumed[:6] + rest, expected)
+
+    def test_resume_follow_list(self):
+        """
+        Test that a follow list stopped by an error resumes from the page that failed
+        """
+        with patch.object(self.nitter, "_get_page", self.get_page):
+            expected = self.nitter._get_follow_list("/jack/followers", 5)
+            self.failing = 2
+            first = self.nitter._get_follow_list("/jack/followers", 5, self.store)
+            self.failing = None
+            self.requested = []
+            second = self.nitter._get_follow_list("/jack/followers", 5, self.store)
+        self.assertEqual(self.requested, [2, 3, 4])
+        self.assertEqual(first + second, expected)
+
+    def test_concurrent_saves(self):
+        """
+        Test that processes can save the same checkpoint at the same time
+        """
+        with Pool(4) as pool:
+            pool.map(save_checkpoints, [self.directory.name] * 4)
+        self.assertEqual(self.store.load("search:/search?q=foo")["pages"], 199)
+        self.assertEqual(len(os.listdir(self.directory.name)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
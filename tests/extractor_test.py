@@ -0,0 +1,40 @@
+import json
+import unittest
+from os import path
+from bs4 import BeautifulSoup
+from ntscraper import Nitter
+from tests.fixtures import timeline_page, timeline_tweets
+
+DATA = path.join(path.dirname(__file__), "data")
+
+
+class TestExtractor(unittest.TestCase):
+    def setUp(self):
+        self.nitter = Nitter("http://localhost:8080", log_level=0, skip_instance_check=True)
+        with open(path.join(DATA, "extracted_tweets.json"), encoding="utf-8") as f:
+            self.expected = json.load(f)
+
+    def extract(self, encrypted):
+        soup = BeautifulSoup(timeline_page(timeline_tweets(0, encrypted, per_page=20)), "lxml")
+        is_encrypted = self.nitter._is_page_encrypted(soup)
+        self.assertEqual(is_encrypted, encrypted)
+        return [
+            self.nitter._extract_tweet(tweet, is_encrypted).to_dict()
+            for tweet in soup.find_all("div", class_="timeline-item")
+        ]
+
+    def test_extract_tweets(self):
+        """
+        Test that tweets are extracted exactly like the reference output
+        """
+        self.assertEqual(self.extract(False), self.expected["plain"])
+
+    def test_extract_encrypted_tweets(self):
+        """
+        Test that tweets with encrypted media are extracted exactly like the reference output
+        """
+        self.assertEqual(self.extract(True), self.expected["encrypted"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,208 @@
+"""
+Synthetic Nitter pages, used to test the extractors without hitting a live instance
+"""
+from base64 import b64encode
+from urllib.parse import quote
+
+
+def _encrypt(path):
+    return b64encode(path.encode("utf-8")).decode("utf-8")
+
+
+def _pic_src(path, encrypted):
+    return "/pic/enc/" + _encrypt(path) if encrypted else "/pic/" + quote(path, safe="")
+
+
+def avatar(user, encrypted=False):
+    return _pic_src(f"profile_images/{user}id/{user}_bigger.jpg", encrypted)
+
+
+def attachments(tweet_id, kind, encrypted=False):
+    """
+    Build the attachments of a tweet
+
+    :param tweet_id: ID of the tweet
+    :param kind: 'image', 'video', 'video-classless' or 'gif'
+    :param encrypted: True if the instance uses encrypted media
+    :return: HTML of the attachments
+    """
+    if kind == "image":
+        src = _pic_src(f"media/{tweet_id}.jpg?name=small", encrypted)
+        media = f'<div class="gallery-row"><div class="attachment image"><a class="still-image" href="/pic/orig/media%2F{tweet_id}.jpg"><img src="{src}" alt=""></a></div></div>'
+    elif kind in ("video", "video-classless"):
+        url = f"https://video.twimg.com/ext_tw_video/{tweet_id}/pu/pl/video.m3u8"
+        data_url = "/video/enc/" + _encrypt(url) if encrypted else "/video/key/" + quote(url, safe="")
+        video_class = ' class=""' if kind == "video" else ""
+        media = f'<div class="gallery-video"><div class="attachment video-container"><video{video_class} poster="/pic/poster" data-url="{data_url}"></video></div></div>'
+    elif kind == "gif":
+        src = _pic_src(f"video.twimg.com/tweet_video/{tweet_id}.mp4", encrypted)
+        media = f'<div class="gallery-gif"><div class="attachment"><video class="gif" poster="/pic/poster" autoplay muted loop><source src="{src}" type="video/mp4"></video></div></div>'
+    else:
+        raise ValueError(f"Unknown media kind {kind}")
+    return f'<div class="attachments">{media}</div>'
+
+
+def tweet(
+    tweet_id,
+    user="jack",
+    encrypted=False,
+    classes="timeline-item ",
+    media=None,
+    quote_id=None,
+    quote_deleted=False,
+    retweet=False,
+    pinned=False,
+    replying_to=None,
+    card=False,
+    stats=(1234, 5, 0, 99),
+):
+    """
+    Build a timeline item
+
+    :return: HTML of the tweet
+    """
+    html = [
+        f'<div class="{classes}" data-username="{user}"><a class="tweet-link" href="/{user}/status/{tweet_id}#m"></a><div class="tweet-body"><div>'
+    ]
+    if retweet:
+        html.append('<div class="retweet-header"><span><div class="icon-container"><span class="icon-retweet"></span> someone retweeted</div></span></div>')
+    if pinned:
+        html.append('<div class="pinned"><span><div class="icon-container"><span class="icon-pin"></span> Pinned Tweet</div></span></div>')
+    html.append(
+        f'<div class="tweet-header"><a class="tweet-avatar" href="/{user}"><img class="avatar round" src="{avatar(user, encrypted)}" alt=""></a>'
+        f'<div class="tweet-name-row"><div class="fullname-and-username"><a class="fullname" href="/{user}" title="{user}">{user.title()} Name</a>'
+        f'<a class="username" href="/{user}" title="@{user}">@{user}</a></div>'
+        f'<span class="tweet-date"><a href="/{user}/status/{tweet_id}#m" title="Aug 16, 2024 · 6:03 PM UTC">Aug 16</a></span></div></div></div>'
+    )
+    if replying_to:
+        html.append('<div class="replying-to">Replying to ' + "".join(f'<a href="/{u}">@{u}</a> ' for u in replying_to) + "</div>")
+    html.append(
+        f'<div class="tweet-content media-body" dir="auto">tweet {tweet_id}\nwith <a href="https://example.com/{tweet_id}">example.com/{tweet_id}</a> and <a href="/search?q=%23tag">#tag</a></div>'
+    )
+    if card:
+        html.append(f'<div class="card large"><a class="card-container" href="https://t.co/{tweet_id}"><div class="card-content">card</div></a></div>')
+    if media:
+        html.append(attachments(tweet_id, media, encrypted))
+    if quote_id and quote_deleted:
+        html.append('<div class="quote unavailable"><div class="unavailable-quote">This tweet is unavailable</div></div>')
+    elif quote_id:
+        html.append(
+            f'<div class="quote quote-big"><a class="quote-link" href="/bob/status/{quote_id}#m"></a><div class="tweet-name-row"><div class="fullname-and-username">'
+            f'<img class="avatar round mini" src="{avatar("bob", encrypted)}" alt=""><a class="fullname" href="/bob" title="bob">Bob</a><a class="username" href="/bob" title="@bob">@bob</a></div>'
+            f'<span class="tweet-date"><a href="/bob/status/{quote_id}#m" title="Aug 15, 2024 · 1:00 AM UTC">Aug 15</a></span></div>'
+            f'<div class="quote-text" dir="auto">quoted {quote_id}</div><div class="quote-media-container">{attachments(quote_id, "image", encrypted)}</div></div>'
+        )
+    html.append('<div class="tweet-stats">')
+    for icon, count in zip(("comment", "retweet", "quote", "heart"), stats):
+        html.append(f'<span class="tweet-stat"><div class="icon-container"><span class="icon-{icon}"></span> {format(count, ",") if count else ""}</div></span>')
+    html.append("</div></div></div>")
+    return "".join(html)
+
+
+def timeline_tweets(page, encrypted=False, per_page=10, base_id=1):
+    """
+    Build a page worth of timeline items covering every kind of tweet
+
+    :param page: number of the page, used to make the IDs unique
+    :return: list of HTML timeline items
+    """
+    kinds = ["image", "video", "gif", None, "video-classless"]
+    items = []
+    for i in range(per_page):
+        tweet_id = base_id * 1000000 + page * per_page + i
+        media = kinds[i % len(kinds)]
+        if i % 10 in (3, 4, 5):
+            classes = "timeline-item thread" + (" thread-last" if i % 10 == 5 else "")
+            items.append(tweet(tweet_id, encrypted=encrypted, classes=classes, media=media))
+        else:
+            items.append(
+                tweet(
+                    tweet_id,
+                    user="jack" if i % 2 else "alice",
+                    encrypted=encrypted,
+                    media=media,
+                    quote_id=tweet_id + 500000 if i % 10 in (1, 8) else None,
+                    quote_deleted=i % 10 == 8,
+                    retweet=i % 10 == 2,
+                    pinned=i == 0 and page == 0,
+                    replying_to=["a", "b"] if i % 10 == 6 else None,
+                    card=i % 10 == 7,
+                    stats=(i * 1001, i, 0, i * 7),
+                )
+            )
+    return items
+
+
+def _page(body):
+    return (
+        '<!DOCTYPE html><html><head><title>nitter</title><script>var x = 1;</script></head><body>'
+        '<nav><div class="inner-nav"><a href="/">nitter</a><a href="/about"><img src="/logo.png" alt=""></a></div></nav><div class="container">'
+        + body
+        + "</div></body></html>"
+    )
+
+
+def _show_more(href):
+    return f'<div class="show-more"><a href="{href}">Load more</a></div>' if href else ""
+
+
+def timeline_page(items, next_href=None):
+    """
+    Build a search or status page
+
+    :param items: list of HTML timeline items
+    :param next_href: href of the 'Load more' link, or None if this is the last page
+    :return: HTML of the page
+    """
+    return _page(f'<div class="timeline-container"><div class="timeline">{"".join(items)}{_show_more(next_href)}</div></div>')
+
+
+def profile_page(user="jack", encrypted=False, items=(), next_href=None):
+    """
+    Build the profile page of a user
+
+    :return: HTML of the page
+    """
+    banner = _pic_src(f"pbs.twimg.com/profile_banners/{user}id/1646075315/1500x500", encrypted)
+    image = _pic_src(f"pbs.twimg.com/profile_images/{user}id/{user}_400x400.jpg", encrypted)
+    card = (
+        f'<div class="profile-tabs"><div class="profile-banner"><a href="/pic/banner"><img src="{banner}" alt=""></a></div>'
+        f'<div class="profile-tab sticky"><div class="profile-card"><div class="profile-card-info"><a class="profile-card-avatar" href="/pic/avatar"><img src="{image}" alt=""></a>'
+        f'<div class="profile-card-tabs-name"><a class="profile-card-fullname" href="/{user}" title="{user}">{user.title()}</a><a class="profile-card-username" href="/{user}" title="@{user}">@{user}</a></div></div>'
+        f'<div class="profile-card-extra"><div class="profile-bio"><p dir="auto">What\'s happening?!</p></div>'
+        '<div class="profile-location"><span><span class="icon-location"></span></span><span>everywhere</span></div>'
+        '<div class="profile-website"><span><span class="icon-link"></span><a href="https://about.twitter.com/">about.twitter.com</a></span></div>'
+        '<div class="profile-joindate"><span title="2:35 PM - 20 Feb 2007"><span class="icon-calendar"></span> Joined February 2007</span></div>'
+        '<div class="profile-card-extra-links"><ul class="profile-statlist">'
+        '<li class="posts"><span class="profile-stat-header">Tweets</span><span class="profile-stat-num">15,000</span></li>'
+        '<li class="following"><span class="profile-stat-header">Following</span><span class="profile-stat-num">12</span></li>'
+        '<li class="followers"><span class="profile-stat-header">Followers</span><span class="profile-stat-num">1,234,567</span></li>'
+        '<li class="likes"><span class="profile-stat-header">Likes</span><span class="profile-stat-num">4</span></li></ul></div></div></div>'
+        f'<div class="photo-rail-card"><div class="photo-rail-header"><a href="/{user}/media"><div class="icon-container"><span class="icon-picture"></span> 2,345 Photos and videos</div></a></div></div></div>'
+    )
+    return _page(card + f'<div class="timeline-container"><div class="timeline">{"".join(items)}{_show_more(next_href)}</div></div></div>')
+
+
+def follow_page(users, next_href=None):
+    """
+    Build a page of a followers/following list
+
+    :param users: list of usernames
+    :return: HTML of the page
+    """
+    items = [
+        f'<div class="timeline-item"><div class="tweet-body profile-result"><div class="tweet-header"><a class="tweet-avatar" href="/{u}"><img class="avatar round" src="{avatar(u)}" alt=""></a>'
+        f'<div class="tweet-name-row"><div class="fullname-and-username"><a class="fullname" href="/{u}" title="{u}">{u}</a><a class="username" href="/{u}" title="@{u}">@{u}</a></div></div></div></div></div>'
+        for u in users
+    ]
+    return timeline_page(items, next_href)
+
+
+def error_page(message):
+    """
+    Build an error page
+
+    :param message: error message
+    :return: HTML of the page
+    """
+    return _page(f'<div class="error-panel"><span>{message}</span></div>')
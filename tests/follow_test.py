@@ -0,0 +1,92 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+from ntscraper import Nitter
+from ntscraper.checkpoint import CheckpointStore
+from tests.server import StubTestCase
+
+
+class TestFollowLists(StubTestCase):
+    def test_profile_detail(self):
+        """
+        Test that both follow lists of a profile are scraped in full
+        """
+        profile = self.nitter.get_profile_info(
+            "jack", mode="detail", instance=self.stub.url
+        )
+        self.assertEqual(profile["following_list"], [f"@following{p}_{i}" for p in range(3) for i in range(10)])
+        self.assertEqual(profile["followers_list"], [f"@followers{p}_{i}" for p in range(3) for i in range(10)])
+
+    def test_graph(self):
+        """
+        Test that the follow lists of many users are streamed
+        """
+        rows = list(
+            self.nitter.iter_follow_graph(["jack", "bob"], instance=self.stub.url, workers=3)
+        )
+        self.assertEqual(len(rows), 120)
+        for username in ("jack", "bob"):
+            for list_type in ("following", "followers"):
+                users = [user for name, kind, user in rows if name == username and kind == list_type]
+                self.assertEqual(users, [f"@{list_type}{p}_{i}" for p in range(3) for i in range(10)])
+
+    def test_limits(self):
+        """
+        Test that the limits stop a list, and that the next run resumes from there
+        """
+        with tempfile.TemporaryDirectory() as path:
+            checkpoint = CheckpointStore(path)
+            first = list(
+                self.nitter.iter_follow_list(
+                    "jack", instance=self.stub.url, resume=checkpoint, max_users=15
+                )
+            )
+            self.assertEqual(first, [f"@followers0_{i}" for i in range(10)] + [f"@followers1_{i}" for i in range(5)])
+            second = list(
+                self.nitter.iter_follow_list(
+                    "jack", instance=self.stub.url, resume=checkpoint, max_pages=1
+                )
+            )
+            # The page cut short by the limit is resumed after its last user
+            self.assertEqual(second, [f"@followers1_{i}" for i in range(5, 10)])
+            third = list(self.nitter.iter_follow_list("jack", instance=self.stub.url, resume=checkpoint))
+            self.assertEqual(third, [f"@followers2_{i}" for i in range(10)])
+            self.assertIsNone(checkpoint.load("follow:/jack/followers"))
+        with self.assertRaises(ValueError):
+            list(self.nitter.iter_follow_graph("jack", max_pages=0))
+
+    def test_limit_in_resumed_page(self):
+        """
+        Test that a page cut short twice by the limit is resumed after the users of both runs
+        """
+        with tempfile.TemporaryDirectory() as path:
+            checkpoint = CheckpointStore(path)
+            users = []
+            for _ in range(4):
+                users += self.nitter.iter_follow_list("jack", instance=self.stub.url, resume=checkpoint, max_users=4)
+            self.assertEqual(users, [f"@followers{p}_{i}" for p in range(2) for i in range(10)][:16])
+
+    def test_error(self):
+        """
+        Test that an error scraping a list is raised to the consumer
+        """
+        with patch.object(Nitter, "_iter_follow_list", side_effect=RuntimeError("broken page")):
+            with self.assertRaises(RuntimeError):
+                list(self.nitter.iter_follow_graph(["jack", "bob"], instance=self.stub.url))
+            with self.assertRaises(RuntimeError):
+                self.nitter.get_profile_info("jack", mode="detail", instance=self.stub.url)
+
+    def test_stop_early(self):
+        """
+        Test that the threads stop when the consumer stops early
+        """
+        rows = self.nitter.iter_follow_graph(
+            [f"user{i}" for i in range(10)], instance=self.stub.url, workers=2
+        )
+        self.assertEqual(len([row for _, row in zip(range(5), rows)]), 5)
+        rows.close()
+        self.assertLess(self.stub.requests, 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
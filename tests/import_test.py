@@ -0,0 +1,32 @@
+import logging
+import unittest
+from ntscraper import Nitter
+from tests.benchmark import import_budget, measure_import
+
+
+class TestImport(unittest.TestCase):
+    def test_import(self):
+        """
+        Test that importing the scraper is fast and has no side effects
+        """
+        result = measure_import(runs=3)
+        self.assertEqual(result["modules"], [])
+        self.assertEqual(result["handlers"], 0)
+        self.assertEqual(result["level"], logging.WARNING)
+        self.assertEqual(result["threads"], 1)
+        self.assertLess(result["seconds"], import_budget)
+
+    def test_log_level(self):
+        """
+        Test that the logging configuration is untouched without a log level
+        """
+        root = logging.getLogger()
+        level, handlers = root.level, list(root.handlers)
+        Nitter("http://localhost:8080", log_level=None, skip_instance_check=True)
+        self.assertEqual((root.level, root.handlers), (level, handlers))
+        with self.assertRaises(ValueError):
+            Nitter("http://localhost:8080", log_level=2, skip_instance_check=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
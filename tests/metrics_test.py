@@ -0,0 +1,90 @@
+import pickle
+import unittest
+from unittest.mock import patch
+from urllib.request import urlopen
+from ntscraper import Nitter
+from ntscraper.metrics import Metrics, serve_prometheus
+from tests.server import StubNitter
+
+
+class TestMetrics(unittest.TestCase):
+    def test_registry(self):
+        """
+        Test the counters, the histograms and the callbacks
+        """
+        events = []
+        metrics = Metrics(buckets={"request_seconds": (0.1, 1)}, callbacks=[lambda *event: events.append(event)])
+        metrics.inc("requests", instance="a", status="200")
+        metrics.inc("requests", 2, instance="b", status="429")
+        metrics.observe("request_seconds", 0.05, instance="a")
+        metrics.observe("request_seconds", 3, instance="a")
+        self.assertEqual(metrics.get("requests"), 3)
+        self.assertEqual(metrics.get("requests", status="429"), 2)
+        self.assertEqual(metrics.get("retries"), 0)
+        self.assertEqual(metrics.get_histogram("request_seconds", instance="a"), (2, 3.05))
+        self.assertEqual(events[1], ("requests", 2, {"instance": "b", "status": "429"}))
+        histogram = metrics.snapshot()["histograms"]["request_seconds"][0]["value"]
+        self.assertEqual(histogram["buckets"], {0.1: 1, 1: 0, float("inf"): 1})
+        metrics.reset()
+        self.assertEqual(metrics.get("requests"), 0)
+
+    def test_prometheus(self):
+        """
+        Test the Prometheus text format and its HTTP exporter
+        """
+        metrics = Metrics(buckets={"request_seconds": (0.1, 1)})
+        metrics.inc("requests", instance='say "hi"', status="200")
+        metrics.observe("request_seconds", 0.5, instance="a")
+        text = metrics.to_prometheus()
+        self.assertIn('ntscraper_requests_total{instance="say \\"hi\\"",status="200"} 1\n', text)
+        self.assertIn("# TYPE ntscraper_request_seconds histogram\n", text)
+        self.assertIn('ntscraper_request_seconds_bucket{instance="a",le="0.1"} 0\n', text)
+        self.assertIn('ntscraper_request_seconds_bucket{instance="a",le="1"} 1\n', text)
+        self.assertIn('ntscraper_request_seconds_bucket{instance="a",le="+Inf"} 1\n', text)
+        self.assertIn('ntscraper_request_seconds_count{instance="a"} 1\n', text)
+        server = serve_prometheus(metrics, port=0)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        with urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+            self.assertEqual(response.read().decode("utf-8"), text)
+
+    def test_scrape(self):
+        """
+        Test the metrics recorded by a scrape with rate limited and failed pages
+        """
+        with patch("ntscraper.nitter.sleep"), StubNitter(pages=3, per_page=10, rate_limit_every=3, error_every=4) as stub:
+            nitter = Nitter(stub.url, log_level=0, skip_instance_check=True)
+            nitter.get_tweets("foo", instance=stub.url)
+            statuses = stub.log.statuses()
+        metrics = nitter.metrics
+        self.assertEqual(metrics.get("requests"), sum(statuses.values()))
+        self.assertEqual(metrics.get("requests", status="200"), 3)
+        self.assertEqual(metrics.get("cooldowns", instance=stub.url), statuses[429])
+        self.assertEqual(metrics.get("retries"), statuses[429] + statuses[503])
+        self.assertGreater(metrics.get("response_bytes", instance=stub.url), 0)
+        self.assertEqual(metrics.get_histogram("request_seconds")[0], sum(statuses.values()))
+        self.assertEqual(metrics.get_histogram("page_parse_seconds")[0], sum(statuses.values()))
+        self.assertEqual(metrics.get_histogram("tweet_parse_seconds")[0], 30)
+
+    def test_multiple_terms(self):
+        """
+        Test that the metrics of a scrape of multiple terms are recorded in the registry of the scraper
+        """
+        values = []
+        metrics = Metrics(callbacks=[lambda name, value, labels: values.append(name)])
+        with patch("ntscraper.nitter.sleep"), StubNitter(pages=3, per_page=10) as stub:
+            nitter = Nitter(stub.url, log_level=0, skip_instance_check=True, metrics=metrics)
+            nitter.get_tweets(["foo", "bar"], instance=stub.url, workers=2)
+            self.assertEqual(metrics.get("requests"), 6)
+            self.assertEqual(metrics.get_histogram("tweet_parse_seconds")[0], 60)
+            nitter.get_tweets(["foo", "bar"], instance=stub.url, workers=2, parse_workers=1)
+        self.assertEqual(metrics.get("requests", status="200"), 12)
+        self.assertEqual(metrics.get_histogram("page_parse_seconds")[0], 12)
+        self.assertEqual(metrics.get_histogram("tweet_parse_seconds")[0], 120)
+        self.assertEqual(values.count("requests"), 12)
+        # The copy handed to the parse processes can be pickled, as when they are spawned
+        pickle.dumps(nitter._worker_copy())
+
+
+if __name__ == "__main__":
+    unittest.main()
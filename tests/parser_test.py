@@ -0,0 +1,105 @@
+import unittest
+from ntscraper import Nitter
+from tests.fixtures import (
+    error_page,
+    follow_page,
+    profile_page,
+    timeline_page,
+    timeline_tweets,
+)
+
+BACKENDS = [("bs4", False), ("bs4", True), ("lxml", False)]
+
+
+class TestParsers(unittest.TestCase):
+    def setUp(self):
+        self.reference = Nitter("http://localhost:8080", log_level=0, skip_instance_check=True)
+        self.backends = [
+            Nitter(
+                "http://localhost:8080",
+                log_level=0,
+                skip_instance_check=True,
+                parser=parser,
+                partial_parse=partial,
+            )
+            for parser, partial in BACKENDS
+        ]
+
+    def parse_all(self, html):
+        """
+        Parse a page with the reference backend and with every other backend
+        """
+        content = html.encode("utf-8")
+        reference = self.reference.parser.parse(content)
+        for nitter in self.backends:
+            with self.subTest(parser=nitter.parser.name, partial=nitter.parser.partial):
+                yield reference, nitter, nitter.parser.parse(content)
+
+    def extract(self, nitter, soup):
+        is_encrypted = nitter._is_page_encrypted(soup)
+        return is_encrypted, [
+            nitter._extract_tweet(tweet, is_encrypted).to_dict()
+            for tweet in soup.find_all("div", class_="timeline-item")
+        ]
+
+    def test_timeline(self):
+        """
+        Test that every backend extracts the same tweets and next page
+        """
+        for encrypted in (False, True):
+            html = timeline_page(
+                timeline_tweets(0, encrypted, per_page=20), "?f=tweets&q=x&cursor=abc"
+            )
+            for reference, nitter, soup in self.parse_all(html):
+                self.assertEqual(
+                    self.extract(nitter, soup), self.extract(self.reference, reference)
+                )
+                self.assertIsNotNone(nitter._check_error_page(soup))
+                self.assertEqual(
+                    nitter._get_next_page(soup, "x", "term", None, None),
+                    self.reference._get_next_page(reference, "x", "term", None, None),
+                )
+
+    def test_profile(self):
+        """
+        Test that every backend extracts the same profile
+        """
+        for encrypted in (False, True):
+            html = profile_page("jack", encrypted, timeline_tweets(0, encrypted))
+            for reference, nitter, soup in self.parse_all(html):
+                self.assertEqual(
+                    nitter._parse_profile(soup, nitter._is_page_encrypted(soup)).to_dict(),
+                    self.reference._parse_profile(reference, encrypted).to_dict(),
+                )
+
+    def test_follow_list(self):
+        """
+        Test that every backend extracts the same followers and cursor
+        """
+        html = follow_page(["alice", "bob", "carol"], "/jack/followers?cursor=xyz")
+        for reference, nitter, soup in self.parse_all(html):
+            self.assertEqual(
+                nitter._parse_follow_list(soup),
+                self.reference._parse_follow_list(reference),
+            )
+            self.assertEqual(nitter._parse_follow_list(soup), (["@alice", "@bob", "@carol"], "xyz"))
+
+    def test_error_page(self):
+        """
+        Test that every backend detects error pages
+        """
+        with self.assertLogs(level="WARNING") as logs:
+            for _, nitter, soup in self.parse_all(error_page("User not found")):
+                self.assertIsNone(nitter._check_error_page(soup))
+        self.assertTrue(all("User not found" in line for line in logs.output))
+
+    def test_invalid_parser(self):
+        """
+        Test that an unknown backend is refused
+        """
+        with self.assertRaises(ValueError):
+            Nitter("http://localhost:8080", log_level=0, skip_instance_check=True, parser="html5")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from unittest.mock import patch
+from tests.fixtures import error_page
+from tests.server import StubTestCase
+
+
+class TestPipeline(StubTestCase):
+    def test_search(self):
+        """
+        Test that pages parsed by worker processes give the same results as the scraper
+        """
+        terms = ["foo", "bar", "baz"]
+        expected = [self.nitter.get_tweets(term, instance=self.stub.url) for term in terms]
+        self.nitter.metrics.reset()
+        tweets = self.nitter.get_tweets(terms, instance=self.stub.url, workers=3, parse_workers=2)
+        self.assertEqual(tweets, expected)
+        self.assertEqual(self.nitter.metrics.get_histogram("page_parse_seconds")[0], 9)
+        self.assertEqual(self.nitter.metrics.get_histogram("tweet_parse_seconds")[0], 90)
+
+    def test_records(self):
+        """
+        Test that the users of the tweets parsed by worker processes are shared
+        """
+        tweets = self.nitter.get_tweets("foo", instance=self.stub.url, result_type="record", parse_workers=1)
+        users = {}
+        for tweet in tweets["tweets"]:
+            self.assertIs(users.setdefault(tweet.user.username, tweet.user), tweet.user)
+        self.assertEqual(
+            [tweet.to_dict() for tweet in tweets["tweets"]],
+            self.nitter.get_tweets("foo", instance=self.stub.url)["tweets"],
+        )
+
+    def test_raw_page(self):
+        """
+        Test that pages handed to worker processes are only parsed by the fetcher if they look like errors
+        """
+        self.nitter._initialize_session(self.stub.url)
+        with patch.object(self.nitter, "_parse_page", wraps=self.nitter._parse_page) as parse:
+            content = self.nitter._get_page("/search?f=tweets&q=foo", raw=True)
+            self.assertIsInstance(content, bytes)
+            parse.assert_not_called()
+            self.assertIsNone(self.nitter._read_page(error_page("Not found").encode("utf-8"), True))
+            parse.assert_called_once()
+        with self.assertRaises(ValueError):
+            self.nitter.get_tweets("foo", instance=self.stub.url, parse_workers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
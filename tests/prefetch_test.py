@@ -0,0 +1,65 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+from ntscraper.checkpoint import CheckpointStore
+from tests.server import StubTestCase
+
+
+class TestPrefetch(StubTestCase):
+    stub_options = {"pages": 5, "per_page": 10}
+
+    def setUp(self):
+        super().setUp()
+        self.prefetching = self.scraper(prefetch=2)
+
+    def test_search(self):
+        """
+        Test that prefetching gives the same tweets with the same requests
+        """
+        for term, mode in (("foo", "term"), ("jack", "user")):
+            expected = self.nitter.get_tweets(term, mode=mode, instance=self.stub.url)
+            self.stub.log.clear()
+            tweets = self.prefetching.get_tweets(term, mode=mode, instance=self.stub.url)
+            self.assertEqual(tweets, expected)
+            self.assertEqual(len(self.stub.log.requests), 5)
+
+    def test_early_stop(self):
+        """
+        Test that no more than the prefetched pages are downloaded when a search stops early
+        """
+        tweets = self.prefetching.get_tweets("foo", instance=self.stub.url, number=5)
+        self.assertEqual(len(tweets["tweets"]) + len(tweets["threads"]), 5)
+        self.assertLessEqual(len(self.stub.log.requests), 1 + 2)
+        self.stub.log.clear()
+        for _ in self.prefetching.iter_tweets("foo", instance=self.stub.url):
+            break
+        self.assertLessEqual(len(self.stub.log.requests), 1 + 2)
+
+    def test_misread_cursor(self):
+        """
+        Test that the pages downloaded ahead are dropped if the next page was misread
+        """
+        expected = self.nitter.get_tweets("foo", instance=self.stub.url)
+        with patch.object(self.prefetching, "_scan_next_page", return_value="/search?f=tweets&q=foo&cursor=4"):
+            self.assertEqual(self.prefetching.get_tweets("foo", instance=self.stub.url), expected)
+
+    def test_failure(self):
+        """
+        Test that a page that cannot be downloaded is saved as the checkpoint of the search
+        """
+        self.stub.pages = 10
+        self.stub.dead_after = 4
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store = CheckpointStore(directory.name)
+        tweets = self.prefetching.get_tweets("foo", instance=self.stub.url, max_retries=2, resume=store)
+        state = store.load("search:/search?f=tweets&q=foo&scroll=false")
+        self.assertEqual(state["pages"], 4)
+        self.assertTrue(state["endpoint"].endswith("cursor=4"))
+        self.assertEqual(state["counts"], {key: len(items) for key, items in tweets.items()})
+        with self.assertRaises(ValueError):
+            self.scraper(prefetch=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
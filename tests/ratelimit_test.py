@@ -0,0 +1,105 @@
+import time
+import unittest
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+from ntscraper import Nitter
+from ntscraper.ratelimit import RateLimiter, parse_retry_after
+from tests.fixtures import timeline_page, timeline_tweets
+from tests.server import StubTestCase
+
+INSTANCE = "http://localhost:8080"
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_spacing(self):
+        """
+        Test that requests beyond the burst are spaced out by the rate
+        """
+        limiter = RateLimiter(rate=2, burst=2)
+        delays = [limiter.reserve(INSTANCE, now=100.0) for _ in range(4)]
+        self.assertEqual(delays, [0.0, 0.0, 0.5, 1.0])
+        self.assertEqual(limiter.reserve("http://other", now=100.0), 0.0)
+
+    def test_adapt(self):
+        """
+        Test that the rate grows with healthy responses and shrinks after failures, within its bounds
+        """
+        limiter = RateLimiter(rate=1, min_rate=0.25, max_rate=1.5, increase=0.2)
+        for _ in range(10):
+            limiter.record_success(INSTANCE)
+        self.assertEqual(limiter.stats()[INSTANCE]["rate"], 1.5)
+        for _ in range(10):
+            limiter.record_backoff(INSTANCE, now=100.0)
+        self.assertEqual(limiter.stats()[INSTANCE]["rate"], 0.25)
+
+    def test_retry_after(self):
+        """
+        Test that a Retry-After header delays the next request, and spaces out the following ones
+        """
+        limiter = RateLimiter(rate=1)
+        limiter.reserve(INSTANCE, now=100.0)
+        limiter.record_backoff(INSTANCE, retry_after=30, now=100.0)
+        self.assertAlmostEqual(limiter.reserve(INSTANCE, now=100.0), 30.0)
+        self.assertAlmostEqual(limiter.reserve(INSTANCE, now=100.0), 32.0)
+
+    def test_parse_retry_after(self):
+        """
+        Test that Retry-After headers are parsed both as seconds and as HTTP dates
+        """
+        self.assertEqual(parse_retry_after("120"), 120.0)
+        date = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+        self.assertAlmostEqual(parse_retry_after(date), 60, delta=2)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+
+
+class TestRateLimitedPage(unittest.TestCase):
+    def response(self, status_code, headers=None):
+        response = MagicMock()
+        response.status_code = status_code
+        response.ok = status_code < 400
+        response.headers = headers or {}
+        response.content = timeline_page(timeline_tweets(0, per_page=2)).encode("utf-8")
+        return response
+
+    def test_get_page(self):
+        """
+        Test that a rate limited page is fetched again after the time asked by the instance
+        """
+        nitter = Nitter(INSTANCE, log_level=0, skip_instance_check=True, rate=1)
+        nitter._initialize_session(INSTANCE)
+        nitter.r = MagicMock()
+        nitter.r.get.side_effect = [
+            self.response(429, {"Retry-After": "30"}),
+            self.response(200),
+        ]
+        with patch("ntscraper.nitter.sleep") as sleep:
+            soup = nitter._get_page("/search?f=tweets&q=foo&cursor=1")
+        self.assertIsNotNone(soup)
+        self.assertEqual(nitter.r.get.call_count, 2)
+        self.assertEqual(sleep.call_count, 1)
+        self.assertGreater(sleep.call_args[0][0], 29)
+        self.assertEqual(nitter.rate_limiter.stats()[INSTANCE]["rate"], 0.6)
+
+
+class TestRateLimitedScrape(StubTestCase):
+    def test_multiple_terms(self):
+        """
+        Test that the terms of a scrape share the rate limit of their instance
+        """
+        nitter = self.scraper(rate=10, max_rate=10)
+        terms = ["foo", "bar", "baz", "qux"]
+        # Wait for real, so that the requests are spaced out by the limiter
+        with patch("ntscraper.nitter.sleep", time.sleep):
+            start = time.monotonic()
+            tweets = nitter.get_tweets(terms, instance=self.stub.url, workers=4)
+            elapsed = time.monotonic() - start
+        self.assertEqual(len(self.stub.log.requests), 12)
+        # The first request uses the burst, the other ones are sent at 10 per second
+        self.assertGreaterEqual(elapsed, 11 / 10)
+        self.assertEqual(tweets, [self.nitter.get_tweets(term, instance=self.stub.url) for term in terms])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import gc
+import json
+import pickle
+import unittest
+from os import path
+from ntscraper import Nitter
+from ntscraper.records import Record, Tweet, convert
+from ntscraper.seen import SeenIndex
+from tests.fixtures import timeline_page, timeline_tweets
+
+DATA = path.join(path.dirname(__file__), "data")
+
+
+class TestRecords(unittest.TestCase):
+    def setUp(self):
+        self.nitter = Nitter("http://localhost:8080", log_level=0, skip_instance_check=True)
+        with open(path.join(DATA, "extracted_tweets.json"), encoding="utf-8") as f:
+            self.expected = json.load(f)
+        self.soup = self.nitter.parser.parse(
+            timeline_page(timeline_tweets(0, per_page=20)).encode("utf-8")
+        )
+        self.tweets = [
+            self.nitter._extract_tweet(tweet, False)
+            for tweet in self.soup.find_all("div", class_="timeline-item")
+        ]
+
+    def test_to_dict(self):
+        """
+        Test that records convert to the same dictionaries as before
+        """
+        self.assertTrue(all(isinstance(tweet, Tweet) for tweet in self.tweets))
+        self.assertEqual(convert(self.tweets, "dict"), self.expected["plain"])
+
+    def test_shared_users(self):
+        """
+        Test that the records of the same user share the same user, which is only kept while a record refers to it
+        """
+        items = list(self.nitter._parse_timeline(self.soup, SeenIndex(), {"tweets": 0, "threads": 0}, 100, "record"))
+        users = {}
+        for tweet in [tweet for item in items for tweet in (item if isinstance(item, list) else [item])]:
+            users.setdefault(tweet.user.username, tweet.user)
+            self.assertIs(tweet.user, users[tweet.user.username])
+        self.assertGreaterEqual(len(self.nitter._users), len(users))
+        del items, users, tweet
+        gc.collect()
+        self.assertEqual(len(self.nitter._users), 0)
+        list(self.nitter._parse_timeline(self.soup, SeenIndex(), {"tweets": 0, "threads": 0}, 100, "dict"))
+        self.assertEqual(len(self.nitter._users), 0)
+
+    def test_dict_access(self):
+        """
+        Test that records can be read with the keys of the dictionaries
+        """
+        for tweet, expected in zip(self.tweets, self.expected["plain"]):
+            self.assertEqual(tweet["link"], expected["link"])
+            self.assertEqual(tweet["is-retweet"], expected["is-retweet"])
+            self.assertEqual(tweet["user"]["username"], expected["user"]["username"])
+
+    def test_pickle(self):
+        """
+        Test that records survive pickling, as done by the process pool
+        """
+        self.assertEqual(
+            convert(pickle.loads(pickle.dumps(self.tweets)), "dict"),
+            self.expected["plain"],
+        )
+
+    def test_abstract(self):
+        """
+        Test that the base record cannot be instantiated
+        """
+        with self.assertRaises(TypeError):
+            Record()
+
+    def test_invalid_result_type(self):
+        """
+        Test that an unknown result type is refused
+        """
+        with self.assertRaises(ValueError):
+            self.nitter.get_tweets("foo", result_type="json")
+
+
+if __name__ == '__main__':
+    unittest.main()
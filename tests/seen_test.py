@@ -0,0 +1,209 @@
+import os
+import pickle
+import random
+import tempfile
+import unittest
+from multiprocessing import Pool
+from os import path
+from unittest.mock import patch
+from ntscraper import Nitter
+from ntscraper.checkpoint import CheckpointStore
+from ntscraper.seen import BloomSeenIndex, SeenIndex
+from tests.fixtures import timeline_page, timeline_tweets
+from tests.server import StubTestCase
+
+INSTANCE = "http://localhost:8080"
+
+
+def save_ids(args):
+    file, ids = args
+    for start in range(0, len(ids), 100):
+        seen = SeenIndex(file, ids[start : start + 100])
+        seen.save()
+        seen.close()
+
+
+class TestSeenIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.ids = random.Random(0).sample(range(2 ** 62), 5000)
+
+    def test_add(self):
+        """
+        Test that IDs are only reported as new the first time they are added
+        """
+        seen = SeenIndex(buffer_size=64)
+        self.assertTrue(all(seen.add(tweet_id) for tweet_id in self.ids))
+        self.assertFalse(any(seen.add(tweet_id) for tweet_id in self.ids))
+        self.assertEqual(len(seen), len(self.ids))
+        self.assertEqual(list(seen), sorted(self.ids))
+
+    def test_save(self):
+        """
+        Test that saved IDs are found by later runs, and that saves from different runs are merged
+        """
+        file = path.join(self.directory.name, "seen.bin")
+        first = SeenIndex(file, self.ids[:3000])
+        second = SeenIndex(file, self.ids[2000:])
+        first.save()
+        second.save()
+        seen = SeenIndex(file)
+        self.assertEqual(list(seen), sorted(self.ids))
+        self.assertFalse(seen.add(self.ids[0]))
+        self.assertEqual(list(pickle.loads(pickle.dumps(seen))), sorted(self.ids))
+        seen.close()
+        first.close()
+        second.close()
+
+    def test_concurrent_saves(self):
+        """
+        Test that processes saving to the same file at the same time keep all the IDs
+        """
+        file = path.join(self.directory.name, "seen.bin")
+        with Pool(8) as pool:
+            pool.map(save_ids, [(file, self.ids[i::8]) for i in range(8)])
+        seen = SeenIndex(file)
+        self.assertEqual(list(seen), sorted(self.ids))
+        seen.close()
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ["seen.bin", "seen.bin.lock"])
+
+    def test_snapshot(self):
+        """
+        Test that checkpoints hold the unsaved IDs, and that the file is only saved when they are many
+        """
+        file = path.join(self.directory.name, "seen.bin")
+        seen = SeenIndex(file, self.ids[:100], buffer_size=64, snapshot_size=1000)
+        seen.save()
+        for tweet_id in self.ids[100:600]:
+            seen.add(tweet_id)
+        self.assertEqual(sorted(seen.snapshot()), sorted(self.ids[100:600]))
+        self.assertEqual(os.path.getsize(file), len(SeenIndex.magic) + 8 * 100)
+        for tweet_id in self.ids[600:]:
+            seen.add(tweet_id)
+        self.assertIsNone(seen.snapshot())
+        self.assertEqual(os.path.getsize(file), len(SeenIndex.magic) + 8 * len(self.ids))
+        self.assertEqual(seen.snapshot(), [])
+        seen.close()
+        # In memory, every snapshot holds the IDs added since the previous one
+        seen = SeenIndex(ids=self.ids[:100])
+        self.assertEqual(sorted(seen.snapshot()), sorted(self.ids[:100]))
+        for tweet_id in self.ids[50:150]:
+            seen.add(tweet_id)
+        self.assertEqual(sorted(seen.snapshot()), sorted(self.ids[100:150]))
+        self.assertEqual(seen.snapshot(), [])
+
+    def test_bloom(self):
+        """
+        Test that a Bloom filter finds every ID added to it, with few false positives
+        """
+        file = path.join(self.directory.name, "seen.bloom")
+        seen = BloomSeenIndex(file, capacity=5000, error_rate=0.01)
+        self.assertTrue(all(seen.add(tweet_id) for tweet_id in self.ids[:2500]))
+        seen.close()
+        seen = BloomSeenIndex(file)
+        self.assertTrue(all(tweet_id in seen for tweet_id in self.ids[:2500]))
+        false_positives = sum(tweet_id in seen for tweet_id in self.ids[2500:])
+        self.assertLess(false_positives, 2500 * 0.01)
+        seen.close()
+
+
+class TestSeenScrape(unittest.TestCase):
+    def setUp(self):
+        self.nitter = Nitter(INSTANCE, log_level=0, skip_instance_check=True)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        patcher = patch("ntscraper.nitter.sleep")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_page(self, endpoint, max_retries=5):
+        """
+        Serve two overlapping pages: the second one repeats the last tweets of the first one
+        """
+        page = int(endpoint.split("cursor=")[-1]) if "cursor=" in endpoint else 0
+        html = timeline_page(
+            timeline_tweets(0, per_page=3)[page:] + timeline_tweets(1, per_page=3)[:page],
+            "?f=tweets&q=foo&cursor=1" if page == 0 else None,
+        )
+        return self.nitter.parser.parse(html.encode("utf-8"))
+
+    def test_dedupe_across_runs(self):
+        """
+        Test that tweets already in a seen index file are skipped by the next scrapes
+        """
+        file = path.join(self.directory.name, "seen.bin")
+        with patch.object(self.nitter, "_get_page", self.get_page):
+            first = self.nitter.get_tweets("foo", instance=INSTANCE, seen=file)
+            second = self.nitter.get_tweets("foo", instance=INSTANCE, seen=file)
+        self.assertEqual(len(first["tweets"]), 4)
+        self.assertEqual(second["tweets"], [])
+        self.assertEqual(len(SeenIndex(file)), 4)
+
+
+class TestSeenResume(StubTestCase):
+    stub_options = {"pages": 5, "per_page": 10}
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.store = CheckpointStore(self.directory.name)
+        self.key = "search:" + self.nitter._build_search_endpoint(
+            "foo", "term", None, None, None, None, None, False, None, None
+        )
+        self.expected = self.nitter.get_tweets("foo", instance=self.stub.url)
+
+    def scrape_twice(self, seen=None):
+        """
+        Scrape a search that fails after three pages, then resume it
+
+        :return: tweets and threads of both runs, and the checkpoint saved by the first one
+        """
+        self.stub.dead_after = self.stub.requests + 3
+        first = self.nitter.get_tweets("foo", instance=self.stub.url, max_retries=1, resume=self.store, seen=seen)
+        state = self.store.load(self.key)
+        self.stub.dead_after = None
+        second = self.nitter.get_tweets("foo", instance=self.stub.url, resume=self.store, seen=seen)
+        return {key: first[key] + second[key] for key in first}, state
+
+    def test_journal(self):
+        """
+        Test that the checkpoints of a search append the new IDs to a journal, which is truncated when resuming
+        """
+        self.stub.dead_after = self.stub.requests + 3
+        self.nitter.get_tweets("foo", instance=self.stub.url, max_retries=1, resume=self.store)
+        state = self.store.load(self.key)
+        self.assertIsNone(state["seen"])
+        journal = self.store.load_seen(self.key, state["journal"])
+        self.assertEqual(len(journal), len(set(journal)))
+        # IDs appended by a checkpoint that was not saved are dropped
+        rest = [int(tweet["id"]) for tweet in self.expected["tweets"] if int(tweet["id"]) not in journal]
+        self.assertGreater(len(rest), 0)
+        self.assertEqual(self.store.append_seen(self.key, rest), len(journal) + len(rest))
+        self.stub.dead_after = None
+        second = self.nitter.get_tweets("foo", instance=self.stub.url, resume=self.store)
+        self.assertEqual([int(tweet["id"]) for tweet in second["tweets"]][-len(rest):], rest)
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_resume(self):
+        """
+        Test that resumed searches skip the same tweets with every type of index
+        """
+        tweets, state = self.scrape_twice()
+        self.assertEqual(tweets, self.expected)
+        self.assertEqual(state["pages"], 3)
+        for seen in (
+            path.join(self.directory.name, "seen.bin"),
+            BloomSeenIndex(path.join(self.directory.name, "seen.bloom"), capacity=1000),
+        ):
+            tweets, state = self.scrape_twice(seen)
+            self.assertEqual(tweets, self.expected)
+            self.assertEqual(state["pages"], 3)
+        for seen in (SeenIndex(), BloomSeenIndex(capacity=1000)):
+            with self.assertRaises(ValueError):
+                self.nitter.get_tweets("foo", instance=self.stub.url, resume=self.store, seen=seen)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,249 @@
+"""
+Local stub Nitter server, serving synthetic pages with real cursor pagination and
+optional faults, used to test and benchmark the scraper without a live instance
+"""
+import socket
+import unittest
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from time import sleep
+from unittest.mock import patch
+from urllib.parse import parse_qs, quote, urlparse
+from ntscraper import Nitter
+from tests.fixtures import (
+    error_page,
+    follow_page,
+    profile_page,
+    timeline_page,
+    timeline_tweets,
+    tweet,
+)
+
+
+class RequestLog:
+    def __init__(self):
+        """
+        Log of the requests served by one or more stub servers, in order
+        """
+        self.requests = []
+        self._lock = Lock()
+
+    def add(self, url, path, status):
+        with self._lock:
+            self.requests.append((url, path, status))
+
+    def clear(self):
+        """
+        Forget the requests logged so far
+        """
+        with self._lock:
+            self.requests = []
+
+    def statuses(self):
+        """
+        :return: Counter of the status codes served, None for dropped connections
+        """
+        return Counter(status for _, _, status in self.requests)
+
+    def failovers(self):
+        """
+        :return: number of failed requests followed by a request to a different server
+        """
+        return sum(
+            previous[2] != 200 and previous[0] != current[0]
+            for previous, current in zip(self.requests, self.requests[1:])
+        )
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        stub = self.server.stub
+        number = stub._count()
+        if stub.latency:
+            sleep(stub.latency)
+        if stub.dead_after is not None and number > stub.dead_after:
+            # A dead instance drops the connection without answering
+            stub.log.add(stub.url, self.path, None)
+            self.close_connection = True
+            return
+        headers = {}
+        if stub.rate_limit_every and number % stub.rate_limit_every == 0:
+            status = 429
+            headers["Retry-After"] = str(stub.retry_after)
+            body = error_page("Instance has been rate limited.")
+        elif stub.error_every and number % stub.error_every == 0:
+            status = 503
+            body = error_page("Instance has no auth tokens, or is fully rate limited.")
+        else:
+            status, body = stub.page(self.path)
+        stub.log.add(stub.url, self.path, status)
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StubNitter:
+    def __init__(
+        self,
+        pages=5,
+        per_page=20,
+        encrypted=False,
+        latency=0.0,
+        rate_limit_every=0,
+        retry_after=0,
+        error_every=0,
+        dead_after=None,
+        log=None,
+    ):
+        """
+        Stub Nitter instance
+
+        :param pages: number of pages of every timeline and follow list. Default is 5
+        :param per_page: number of tweets or users in a page. Default is 20
+        :param encrypted: True if the media URLs should be encrypted. Default is False
+        :param latency: seconds to wait before answering each request. Default is 0
+        :param rate_limit_every: answer every n-th request with a 429. Default is 0 (never)
+        :param retry_after: value of the Retry-After header of the 429s, in seconds. Default is 0
+        :param error_every: answer every n-th request with a 503 error panel. Default is 0 (never)
+        :param dead_after: number of requests after which every connection is dropped. Default is None (never)
+        :param log: RequestLog shared with other stubs. Default is None (a new log)
+        """
+        self.pages = pages
+        self.per_page = per_page
+        self.encrypted = encrypted
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.error_every = error_every
+        self.dead_after = dead_after
+        self.log = log or RequestLog()
+        self.requests = 0
+        self.url = None
+        self._lock = Lock()
+        self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        """
+        Start serving on a free local port
+
+        :return: URL of the stub
+        """
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    def stop(self):
+        """
+        Stop serving
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _count(self):
+        with self._lock:
+            self.requests += 1
+            return self.requests
+
+    def _next(self, href, cursor):
+        return f"{href}cursor={cursor + 1}" if cursor + 1 < self.pages else None
+
+    def page(self, path):
+        """
+        Build the page of an endpoint
+
+        :param path: endpoint of the request
+        :return: status code and HTML of the page
+        """
+        url = urlparse(path)
+        query = parse_qs(url.query)
+        cursor = int(query.get("cursor", ["0"])[0])
+        parts = [part for part in url.path.split("/") if part]
+        if cursor >= self.pages:
+            return 404, error_page("Invalid cursor")
+        if url.path == "/search":
+            term = quote(query.get("q", [""])[0], safe="")
+            items = timeline_tweets(cursor, self.encrypted, self.per_page, base_id=1)
+            return 200, timeline_page(items, self._next(f"?f=tweets&q={term}&", cursor))
+        if len(parts) in (1, 2) and parts[-1] != "following" and parts[-1] != "followers":
+            items = timeline_tweets(cursor, self.encrypted, self.per_page, base_id=2)
+            href = self._next(f"/{'/'.join(parts)}?", cursor)
+            return 200, profile_page(parts[0], self.encrypted, items, href)
+        if len(parts) == 3 and parts[1] == "status" and parts[2].isdigit():
+            return 200, timeline_page(
+                [tweet(int(parts[2]), user=parts[0], encrypted=self.encrypted, media="image", quote_id=7)]
+            )
+        if len(parts) == 2:
+            users = [f"{parts[1]}{cursor}_{i}" for i in range(self.per_page)]
+            return 200, follow_page(users, self._next(f"/{parts[0]}/{parts[1]}?", cursor))
+        return 404, error_page("Page not found")
+
+
+def dead_instance():
+    """
+    Get the URL of a local port nobody listens on
+
+    :return: URL of the dead instance
+    """
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+class StubTestCase(unittest.TestCase):
+    # Options of the stub started before each test, or None to start no stub
+    stub_options = {"pages": 3, "per_page": 10}
+
+    def setUp(self):
+        """
+        Skip the waits of the scraper, and start a stub with a scraper of it
+        """
+        patcher = patch("ntscraper.nitter.sleep")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        if self.stub_options is not None:
+            self.stub = self.start_stub(**self.stub_options)
+            self.nitter = self.scraper()
+
+    def start_stub(self, **options):
+        """
+        Start a stub, stopped at the end of the test
+
+        :param options: options of StubNitter
+        :return: StubNitter
+        """
+        stub = StubNitter(**options)
+        stub.start()
+        self.addCleanup(stub.stop)
+        return stub
+
+    def scraper(self, stub=None, **options):
+        """
+        Build a scraper of a stub, without checking the instances
+
+        :param stub: StubNitter to scrape. Default is None (the stub of the test)
+        :param options: other parameters of Nitter
+        :return: Nitter scraper
+        """
+        return Nitter((stub or self.stub).url, log_level=0, skip_instance_check=True, **options)
@@ -0,0 +1,59 @@
+import unittest
+from ntscraper import Nitter
+from tests.server import RequestLog, StubTestCase, dead_instance
+
+
+class TestStubServer(StubTestCase):
+    # Every test starts its own stubs
+    stub_options = None
+
+    def start(self, **options):
+        return self.start_stub(pages=3, per_page=10, **options)
+
+    def test_scrape(self):
+        """
+        Test a search, a profile and a follow list end to end over HTTP
+        """
+        stub = self.start()
+        nitter = self.scraper(stub)
+        tweets = nitter.get_tweets("foo", instance=stub.url)
+        self.assertEqual(len(tweets["tweets"]) + sum(map(len, tweets["threads"])), 30)
+        profile = nitter.get_profile_info("jack", instance=stub.url)
+        self.assertEqual(profile["username"], "@jack")
+        followers = nitter._get_follow_list("/jack/followers", 5)
+        self.assertEqual(len(followers), 30)
+        self.assertEqual(stub.log.statuses(), {200: 7})
+
+    def test_rate_limited(self):
+        """
+        Test that rate limited and failed pages are fetched again
+        """
+        stub = self.start(rate_limit_every=3, error_every=4)
+        nitter = self.scraper(stub)
+        tweets = nitter.get_tweets("foo", instance=stub.url)
+        self.assertEqual(len(tweets["tweets"]) + sum(map(len, tweets["threads"])), 30)
+        statuses = stub.log.statuses()
+        self.assertEqual(statuses[200], 3)
+        self.assertGreater(statuses[429], 0)
+        self.assertGreater(statuses[503], 0)
+
+    def test_failover(self):
+        """
+        Test that a search continues on another instance when its instance dies
+        """
+        log = RequestLog()
+        first = self.start(dead_after=1, log=log)
+        second = self.start(log=log)
+        # The health check sends one request to each instance, so the first one dies right after it
+        nitter = Nitter([first.url, second.url, dead_instance()], log_level=0)
+        self.assertEqual(sorted(nitter.working_instances), sorted([first.url, second.url]))
+        tweets = nitter.get_tweets("foo", instance=first.url)
+        self.assertEqual(len(tweets["tweets"]) + sum(map(len, tweets["threads"])), 30)
+        self.assertGreaterEqual(log.failovers(), 1)
+        # Two health checks and three pages
+        self.assertEqual(log.statuses()[200], 5)
+        self.assertEqual(log.statuses()[None], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from datetime import datetime, timezone
+from threading import Lock
+from unittest.mock import patch
+from ntscraper import Nitter
+from tests.fixtures import timeline_page, timeline_tweets
+
+INSTANCE = "http://localhost:8080"
+DAYS = ["2024-08-10", "2024-08-11", "2024-08-12"]
+
+
+class TestShard(unittest.TestCase):
+    def setUp(self):
+        self.nitter = Nitter(INSTANCE, log_level=0, skip_instance_check=True)
+        self.requested = []
+        self.lock = Lock()
+        patcher = patch("ntscraper.nitter.sleep")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_page(self, endpoint, max_retries=5):
+        """
+        Serve one page for each day, repeating the first tweet of the next day
+        """
+        day = endpoint.split("&since=")[-1].split("&")[0]
+        with self.lock:
+            self.requested.append(day)
+        page = DAYS.index(day)
+        html = timeline_page(
+            timeline_tweets(page, per_page=3) + timeline_tweets(page + 1, per_page=3)[:1]
+        )
+        return self.nitter.parser.parse(html.encode("utf-8"))
+
+    def test_windows(self):
+        """
+        Test that date ranges are split in windows from the newest to the oldest
+        """
+        self.assertEqual(
+            self.nitter._get_windows("2024-08-10", "2024-08-12", "day"),
+            [("2024-08-11", "2024-08-12"), ("2024-08-10", "2024-08-11")],
+        )
+        windows = self.nitter._get_windows("2024-08-10", "2024-08-11", "hour")
+        self.assertEqual(len(windows), 24)
+        self.assertEqual(windows[0][1], datetime(2024, 8, 11, tzinfo=timezone.utc))
+        self.assertEqual(windows[-1][0], datetime(2024, 8, 10, tzinfo=timezone.utc))
+        self.assertRaises(ValueError, self.nitter._get_windows, "2024-08-10", None, "week")
+        self.assertRaises(ValueError, self.nitter._get_windows, None, "2024-08-11", "day")
+        self.assertRaises(ValueError, self.nitter._get_windows, "2024-08-11", "2024-08-10", "day")
+
+    def test_hour_endpoint(self):
+        """
+        Test that hour windows are searched with the since_time and until_time operators
+        """
+        start, end = self.nitter._get_windows("2024-08-10", "2024-08-11", "hour")[-1]
+        endpoint = self.nitter._build_search_endpoint(
+            "foo", "term", start, end, None, None, None, False, None, None
+        )
+        self.assertIn("+since_time%3A1723248000+until_time%3A1723251600", endpoint)
+        self.assertNotIn("&since=", endpoint)
+
+    def test_sharded_search(self):
+        """
+        Test that the windows are merged from the newest to the oldest, without duplicates
+        """
+        with patch.object(self.nitter, "_get_page", self.get_page):
+            tweets = self.nitter.get_tweets(
+                "foo", since=DAYS[0], until="2024-08-13", instance=INSTANCE, shard="day", workers=3
+            )
+            limited = self.nitter.get_tweets(
+                ["foo", "bar"], since=DAYS[0], until="2024-08-13", instance=INSTANCE, shard="day", number=4
+            )
+        self.assertEqual(sorted(self.requested), sorted(DAYS * 3))
+        links = [tweet["link"] for tweet in tweets["tweets"]]
+        links += [tweet["link"] for thread in tweets["threads"] for tweet in thread]
+        ids = [int(link.split("/")[-1].split("#")[0]) for link in links]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(sorted(ids), list(range(1000000, 1000010)))
+        self.assertEqual(ids[0], 1000006)
+        self.assertEqual(len(limited), 2)
+        for result in limited:
+            self.assertEqual(len(result["tweets"]) + len(result["threads"]), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import asyncio
+import csv
+import json
+import os
+import tempfile
+import unittest
+from importlib.util import find_spec
+from unittest.mock import patch
+from ntscraper import AsyncNitter
+from ntscraper.sinks import CsvSink, JsonlSink, ParquetSink, Sink, get_sink, tweet_columns
+from tests.server import StubTestCase
+
+
+class TestSinks(StubTestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.tweets = self.nitter.get_tweets("foo", instance=self.stub.url)
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def read_jsonl(self, path):
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_jsonl(self):
+        """
+        Test that the JSONL sink writes the items as returned, rotating the files
+        """
+        items = self.tweets["tweets"] + self.tweets["threads"]
+        with JsonlSink(self.path("tweets.jsonl"), max_items=10, buffer_size=3) as sink:
+            for item in items:
+                sink.write(item)
+        self.assertEqual(len(sink.files), -(-len(items) // 10))
+        self.assertEqual([line for file in sink.files for line in self.read_jsonl(file)], items)
+        # A second run starts a new file instead of appending to the previous ones
+        with JsonlSink(self.path("tweets.jsonl"), max_items=10) as sink:
+            sink.write(items[0])
+        self.assertEqual(sink.files, [self.path(f"tweets-{len(items) // 10 + 1:05d}.jsonl")])
+
+    def test_csv(self):
+        """
+        Test that the CSV sink flattens the tweets, and writes the header only once
+        """
+        thread = self.tweets["threads"][0]
+        for _ in range(2):
+            with CsvSink(self.path("tweets.csv"), buffer_size=1) as sink:
+                sink.write(self.tweets["tweets"][0])
+                sink.write(thread)
+        with open(self.path("tweets.csv"), encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(list(rows[0]), tweet_columns)
+        self.assertEqual(len(rows), 2 * (1 + len(thread)))
+        tweet = self.tweets["tweets"][0]
+        self.assertEqual(rows[0]["thread"], "")
+        self.assertEqual(rows[0]["user.username"], tweet["user"]["username"])
+        self.assertEqual(rows[0]["stats.likes"], str(tweet["stats"]["likes"]))
+        self.assertEqual(json.loads(rows[0]["pictures"]), tweet["pictures"])
+        self.assertEqual({row["thread"] for row in rows[1 : 1 + len(thread)]}, {thread[0]["id"]})
+
+    @unittest.skipIf(find_spec("pyarrow") is None, "pyarrow is not installed")
+    def test_parquet(self):
+        """
+        Test that the Parquet sink writes a row group for each batch of rows
+        """
+        import pyarrow.parquet
+
+        with ParquetSink(self.path("tweets.parquet"), row_group_size=8) as sink:
+            for item in self.tweets["tweets"] + self.tweets["threads"]:
+                sink.write(item)
+        file = pyarrow.parquet.ParquetFile(self.path("tweets.parquet"))
+        self.assertEqual(file.metadata.num_rows, 30)
+        self.assertEqual(file.schema_arrow.names, tweet_columns)
+        self.assertGreater(file.metadata.num_row_groups, 1)
+
+    def test_get_sink(self):
+        """
+        Test that sinks are picked by file extension
+        """
+        self.assertIsInstance(get_sink(self.path("a.jsonl")), JsonlSink)
+        self.assertIsInstance(get_sink(self.path("a.csv")), CsvSink)
+        self.assertIsNone(get_sink(None))
+        with self.assertRaises(ValueError):
+            get_sink(self.path("a.txt"))
+
+    def test_abstract(self):
+        """
+        Test that the base sink cannot be instantiated
+        """
+        with self.assertRaises(TypeError):
+            Sink()
+
+    def test_scrape(self):
+        """
+        Test that the scraper writes to a sink instead of returning the tweets
+        """
+        path = self.path("tweets.jsonl")
+        counts = self.nitter.get_tweets(["foo", "bar"], instance=self.stub.url, sink=path)
+        items = self.read_jsonl(path)
+        self.assertEqual(counts, [{"tweets": len(self.tweets["tweets"]), "threads": len(self.tweets["threads"])}] * 2)
+        self.assertEqual(len(items), 2 * (len(self.tweets["tweets"]) + len(self.tweets["threads"])))
+        profiles = self.nitter.get_profile_info("jack", instance=self.stub.url, sink=self.path("profiles.csv"))
+        with open(self.path("profiles.csv"), encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row["username"] for row in rows], [profiles["username"]])
+
+    def test_profiles(self):
+        """
+        Test that each profile is written as soon as it is scraped
+        """
+        sink = JsonlSink(self.path("profiles.jsonl"))
+        requests = []
+        self.stub.log.clear()
+        with patch.object(sink, "write", side_effect=lambda profile: requests.append(len(self.stub.log.requests))):
+            profiles = self.nitter.get_profile_info(["jack", "bob", "alice"], instance=self.stub.url, sink=sink, workers=1)
+        self.assertEqual([profile["username"] for profile in profiles], ["@jack", "@bob", "@alice"])
+        self.assertEqual(requests, [1, 2, 3])
+
+    def test_threads_share_seen(self):
+        """
+        Test that terms scraped by threads into a sink skip the tweets seen by the other terms
+        """
+        path = self.path("tweets.jsonl")
+        seen = self.path("seen.bin")
+        terms = [f"term{i}" for i in range(8)]
+        counts = self.nitter.get_tweets(terms, instance=self.stub.url, workers=8, sink=path, seen=seen)
+        # Every term gets the same tweets, so they are written once in all
+        def tweet_ids(items):
+            return sorted(tweet["id"] for item in items for tweet in (item if isinstance(item, list) else [item]))
+
+        self.assertEqual(tweet_ids(self.read_jsonl(path)), tweet_ids(self.tweets["tweets"] + self.tweets["threads"]))
+        self.assertEqual(sum(count["tweets"] for count in counts), len(self.tweets["tweets"]))
+
+    def test_async(self):
+        """
+        Test that the asyncio scraper writes to a sink too
+        """
+        path = self.path("tweets.jsonl")
+
+        async def scrape():
+            async with AsyncNitter(self.stub.url, log_level=0, skip_instance_check=True) as nitter:
+                return await nitter.get_tweets("foo", instance=self.stub.url, sink=path)
+
+        with patch("asyncio.sleep"):
+            counts = asyncio.run(scrape())
+        self.assertEqual(counts, {"tweets": len(self.tweets["tweets"]), "threads": len(self.tweets["threads"])})
+        items = self.read_jsonl(path)
+        # Items are written in the order they are scraped, so tweets and threads are interleaved
+        self.assertEqual([item for item in items if isinstance(item, dict)], self.tweets["tweets"])
+        self.assertEqual([item for item in items if isinstance(item, list)], self.tweets["threads"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import asyncio
+import unittest
+from datetime import datetime, timezone
+from importlib.util import find_spec
+from unittest.mock import patch
+from ntscraper import AsyncNitter
+from ntscraper.tables import TweetTable, parse_date, parse_dates
+from tests.server import StubTestCase
+
+
+class TestTables(StubTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tweets = self.nitter.get_tweets("foo", instance=self.stub.url)
+        self.table = TweetTable()
+        for item in self.tweets["tweets"] + self.tweets["threads"]:
+            self.table.write(item)
+
+    def test_parse_date(self):
+        """
+        Test the parsing of the dates shown by Nitter
+        """
+        self.assertEqual(
+            parse_date("Aug 16, 2024 · 6:03 PM UTC"),
+            datetime(2024, 8, 16, 18, 3, tzinfo=timezone.utc).timestamp(),
+        )
+        self.assertEqual(parse_date("Jan 1, 2024 · 12:00 AM UTC") % 86400, 0)
+        self.assertEqual(parse_date("Jan 1, 2024 · 12:30 PM UTC") % 86400, 12 * 3600 + 30 * 60)
+        self.assertIsNone(parse_date("Foo 1, 2024 · 12:00 AM UTC"))
+        self.assertIsNone(parse_date(""))
+        self.assertEqual(
+            parse_dates(["", "Jan 1, 1970 · 12:01 AM UTC", ""]), [None, 60, None]
+        )
+
+    def test_columns(self):
+        """
+        Test that the columns hold the scraped tweets, with typed values
+        """
+        columns = self.table.to_pydict()
+        self.assertEqual(list(columns), TweetTable.columns)
+        self.assertEqual(len(self.table), 30)
+        tweets = self.tweets["tweets"]
+        self.assertEqual(columns["id"][: len(tweets)], [int(tweet["id"]) for tweet in tweets])
+        self.assertEqual(columns["username"][0], tweets[0]["user"]["username"])
+        self.assertEqual(columns["likes"][0], tweets[0]["stats"]["likes"])
+        self.assertEqual(columns["date"][0], datetime.fromtimestamp(parse_date(tweets[0]["date"]), timezone.utc))
+        self.assertEqual(set(columns["thread"][: len(tweets)]), {0})
+        thread = self.tweets["threads"][0]
+        self.assertEqual(
+            columns["thread"][len(tweets) : len(tweets) + len(thread)],
+            [int(thread[0]["id"])] * len(thread),
+        )
+
+    @unittest.skipIf(find_spec("pyarrow") is None, "pyarrow is not installed")
+    def test_arrow(self):
+        """
+        Test the Arrow table of a scrape
+        """
+        import pyarrow as pa
+
+        table = self.nitter.get_tweets("foo", instance=self.stub.url, result_type="arrow")
+        self.assertEqual(table.num_rows, 30)
+        self.assertEqual(table.column_names, TweetTable.columns)
+        self.assertEqual(table.schema.field("likes").type, pa.int64())
+        self.assertEqual(table.schema.field("date").type, pa.timestamp("s", tz="UTC"))
+        self.assertTrue(pa.types.is_dictionary(table.schema.field("username").type))
+        # The table is filled in scrape order, where tweets and threads are interleaved
+        columns = self.table.to_pydict()
+        self.assertEqual(
+            sorted(zip(table.column("id").to_pylist(), table.column("date").to_pylist())),
+            sorted(zip(columns["id"], columns["date"])),
+        )
+        self.table.write({**self.tweets["tweets"][0], "date": "Foo 1, 2024 · 12:00 AM UTC"})
+        self.assertIsNone(self.table.to_arrow().column("date")[-1].as_py())
+
+    @unittest.skipIf(find_spec("pandas") is None, "pandas is not installed")
+    def test_pandas(self):
+        """
+        Test the DataFrame of a scrape, also from the asyncio scraper
+        """
+
+        async def scrape():
+            async with AsyncNitter(self.stub.url, log_level=0, skip_instance_check=True) as nitter:
+                return await nitter.get_tweets("foo", instance=self.stub.url, result_type="pandas")
+
+        df = self.nitter.get_tweets("foo", instance=self.stub.url, result_type="pandas")
+        self.assertEqual(list(df.columns), TweetTable.columns)
+        self.assertEqual(len(df), 30)
+        self.assertEqual(str(df["likes"].dtype), "int64")
+        self.assertEqual(str(df["username"].dtype), "category")
+        self.assertEqual(str(df["date"].dt.tz), "UTC")
+        columns = self.table.to_pydict()
+        self.assertEqual(
+            sorted(zip(df["id"].tolist(), df["date"].dt.to_pydatetime().tolist())),
+            sorted(zip(columns["id"], columns["date"])),
+        )
+        self.table.write({**self.tweets["tweets"][0], "date": ""})
+        self.assertTrue(self.table.to_pandas()["date"].isna().iloc[-1])
+        with patch("asyncio.sleep"):
+            self.assertEqual(asyncio.run(scrape())["id"].tolist(), df["id"].tolist())
+
+    def test_invalid(self):
+        """
+        Test that tables are only returned by get_tweets, without a sink
+        """
+        with self.assertRaises(ValueError):
+            self.nitter.get_tweets("foo", instance=self.stub.url, result_type="arrow", sink="tweets.jsonl")
+        with self.assertRaises(ValueError):
+            self.nitter.iter_tweets("foo", instance=self.stub.url, result_type="pandas")
+
+
+if __name__ == "__main__":
+    unittest.main()
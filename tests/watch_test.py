@@ -0,0 +1,147 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from os import path
+from unittest.mock import patch
+from ntscraper import Nitter
+from ntscraper.watch import SNOWFLAKE_EPOCH, Watcher
+from tests.fixtures import profile_page, tweet
+
+INSTANCE = "http://localhost:8080"
+NOW = 1723800000.0
+
+
+def snowflake(seconds_ago):
+    return int((NOW - seconds_ago - SNOWFLAKE_EPOCH) * 1000) << 22
+
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        self.nitter = Nitter(INSTANCE, log_level=0, skip_instance_check=True)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.requested = []
+        self.received = []
+        # Newest first: an old pinned tweet, then one tweet per hour
+        self.timeline = [tweet(snowflake(10 ** 7), pinned=True)] + [
+            tweet(snowflake(hours * 3600)) for hours in range(1, 7)
+        ]
+        patcher = patch("ntscraper.nitter.sleep")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_page(self, endpoint, max_retries=5):
+        """
+        Serve the timeline in pages of three tweets
+        """
+        page = int(endpoint.split("cursor=")[-1]) if "cursor=" in endpoint else 0
+        self.requested.append(page)
+        items = self.timeline[page * 3 : page * 3 + 3]
+        next_href = f"/jack?cursor={page + 1}" if page * 3 + 3 < len(self.timeline) else None
+        return self.nitter.parser.parse(profile_page("jack", items=items, next_href=next_href).encode("utf-8"))
+
+    def callback(self, user, tweets):
+        self.received.append((user, [tweet["id"] for tweet in tweets]))
+
+    def test_poll(self):
+        """
+        Test that a poll stops at the newest tweet of the previous one
+        """
+        watcher = Watcher(self.nitter, ["jack"], self.callback, instance=INSTANCE)
+        with patch.object(self.nitter, "_get_page", self.get_page):
+            first = watcher.poll("jack", now=NOW)
+            self.assertEqual(len(first), 7)
+            self.assertEqual(self.requested, [0, 1, 2])
+            self.requested = []
+            self.timeline.insert(1, tweet(snowflake(-60)))
+            second = watcher.poll("jack", now=NOW + 600)
+        # The first page ends with the newest tweet of the first poll, so the poll stops there
+        self.assertEqual(self.requested, [0])
+        self.assertEqual([tweet["id"] for tweet in second], [str(snowflake(-60))])
+        self.assertEqual(self.received, [("jack", [t["id"] for t in first]), ("jack", [t["id"] for t in second])])
+        self.assertEqual(watcher.accounts["jack"].newest_id, snowflake(-60))
+
+    def test_many_new(self):
+        """
+        Test that a poll paginates until the newest tweet seen, even beyond the tweets of the first poll
+        """
+        watcher = Watcher(self.nitter, ["jack"], self.callback, number=2, instance=INSTANCE)
+        with patch.object(self.nitter, "_get_page", self.get_page):
+            self.assertEqual(len(watcher.poll("jack", now=NOW)), 2)
+            self.timeline[1:1] = [tweet(snowflake(-60 * minutes)) for minutes in range(5, 0, -1)]
+            second = watcher.poll("jack", now=NOW + 600)
+        self.assertEqual([tweet["id"] for tweet in second], [str(snowflake(-60 * minutes)) for minutes in range(5, 0, -1)])
+
+    def test_failure(self):
+        """
+        Test that a failed poll is retried with a backoff, without losing tweets or changing the rate
+        """
+        watcher = Watcher(self.nitter, ["jack"], self.callback, min_interval=60, instance=INSTANCE)
+        with patch.object(self.nitter, "_get_page", self.get_page):
+            watcher.poll("jack", now=NOW)
+        state = watcher.accounts["jack"]
+        before = state.to_dict()
+        self.timeline[1:1] = [tweet(snowflake(-60 * minutes)) for minutes in range(5, 0, -1)]
+
+        def failing_page(endpoint, max_retries=5):
+            return None if "cursor=1" in endpoint else self.get_page(endpoint, max_retries)
+
+        with patch.object(self.nitter, "_get_page", failing_page):
+            self.assertIsNone(watcher.poll("jack", now=NOW + 600))
+            self.assertIsNone(watcher.poll("jack", now=NOW + 700))
+        self.assertEqual((state.newest_id, state.rate, state.last_poll), (before["newest_id"], before["rate"], before["last_poll"]))
+        self.assertEqual((state.failures, state.next_poll), (2, NOW + 700 + 120))
+        with patch.object(self.nitter, "_get_page", self.get_page):
+            self.assertEqual(len(watcher.poll("jack", now=NOW + 900)), 5)
+        self.assertEqual(state.failures, 0)
+
+    def test_schedule(self):
+        """
+        Test that active accounts are polled more often than dormant ones
+        """
+        watcher = Watcher(
+            self.nitter, ["jack", "dormant"], self.callback, min_interval=60, max_interval=86400, instance=INSTANCE
+        )
+        with patch.object(self.nitter, "_get_page", self.get_page):
+            watcher.poll("jack", now=NOW)
+        watcher._update(watcher.accounts["dormant"], [], NOW)
+        # Six tweets in six hours: about one tweet an hour
+        self.assertAlmostEqual(watcher.accounts["jack"].next_poll - NOW, 3600, delta=300)
+        self.assertEqual(watcher.accounts["dormant"].next_poll, NOW + 86400)
+        self.assertEqual(watcher.due(now=NOW + 4000), ["jack"])
+
+    def test_run_pending(self):
+        """
+        Test that due accounts are polled concurrently and that their state is saved
+        """
+        file = path.join(self.directory.name, "watch.json")
+        watcher = Watcher(self.nitter, ["jack", "@jack", "alice"], self.callback, path=file, instance=INSTANCE)
+        with patch.object(self.nitter, "_get_page", self.get_page):
+            self.assertEqual(watcher.run_pending(), 2)
+            self.assertEqual(watcher.run_pending(), 0)
+        self.assertEqual(sorted(user for user, _ in self.received), ["alice", "jack"])
+        restored = Watcher(self.nitter, [], self.callback, path=file)
+        self.assertEqual(
+            restored.accounts["jack"].to_dict(), watcher.accounts["jack"].to_dict()
+        )
+
+    def test_concurrent_saves(self):
+        """
+        Test that watchers can save their state to the same file at the same time
+        """
+        file = path.join(self.directory.name, "watch.json")
+        watchers = [Watcher(self.nitter, [f"user{i}"], self.callback, path=file) for i in range(4)]
+
+        def save(watcher):
+            for _ in range(100):
+                watcher.save()
+
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(save, watchers))
+        self.assertEqual(len(Watcher(self.nitter, [], self.callback, path=file).accounts), 1)
+        self.assertEqual(os.listdir(self.directory.name), ["watch.json"])
+
+
+if __name__ == '__main__':
+    unittest.main()